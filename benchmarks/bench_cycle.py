@@ -0,0 +1,191 @@
+"""Ejecuta un ciclo del monitor contra un servidor ArgoCD falso y mide su rendimiento.
+
+Lanza tests/fake_argocd.py en un proceso aparte con una flota sintética, recibe las
+notificaciones en un webhook de Slack local y escribe en stdout un JSON con: tiempo del
+ciclo, latencia por aplicación (p50/p99), RSS máximo, solicitudes por segundo y bytes
+transferidos.
+
+Uso: python benchmarks/bench_cycle.py --apps 1000 --engine threads --workers 5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "cronjob"))
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def start_fake_argocd(args):
+    command = [
+        sys.executable, "-m", "tests.fake_argocd",
+        "--apps", str(args.apps),
+        "--health-mix", args.health_mix,
+        "--sync-mix", args.sync_mix,
+        "--payload-bytes", str(args.payload_bytes),
+        "--latency", str(args.latency),
+        "--error-rate", str(args.error_rate),
+    ]
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    port = int(process.stdout.readline().split()[1])
+    return process, f"http://127.0.0.1:{port}"
+
+
+def fetch_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/_stats") as response:
+        return json.load(response)
+
+
+class LatencyRecorder:
+    """Mide, por aplicación, desde que empieza a procesarse hasta que termina su última operación."""
+
+    def __init__(self):
+        self.started = {}
+        self.finished = {}
+        self.lock = threading.Lock()
+
+    def start(self, app_name):
+        with self.lock:
+            self.started.setdefault(app_name, time.perf_counter())
+
+    def finish(self, app_name):
+        with self.lock:
+            self.finished[app_name] = max(self.finished.get(app_name, 0), time.perf_counter())
+
+    def latencies(self):
+        return [self.finished[name] - start for name, start in self.started.items() if name in self.finished]
+
+
+def instrument(monitor, async_engine, recorder):
+    process_application = monitor.process_application
+    execute_action = monitor.execute_action
+    process_application_async = async_engine.process_application_async
+
+    def timed_process(app):
+        app_name = app.get("metadata", {}).get("name")
+        recorder.start(app_name)
+        try:
+            return process_application(app)
+        finally:
+            recorder.finish(app_name)
+
+    def timed_execute(app_name, action):
+        try:
+            return execute_action(app_name, action)
+        finally:
+            recorder.finish(app_name)
+
+    async def timed_process_async(app, *args, **kwargs):
+        app_name = app.get("metadata", {}).get("name")
+        recorder.start(app_name)
+        try:
+            return await process_application_async(app, *args, **kwargs)
+        finally:
+            recorder.finish(app_name)
+
+    monitor.process_application = timed_process
+    monitor.execute_action = timed_execute
+    async_engine.process_application_async = timed_process_async
+
+
+def run(args):
+    from tests.fake_slack import FakeSlackWebhook
+
+    fake_process, base_url = start_fake_argocd(args)
+    try:
+        with FakeSlackWebhook() as slack:
+            os.environ.setdefault("CONFIG_FILE", os.path.join(ROOT, "cronjob", "config.yaml"))
+            os.environ["ARGOCD_TOKEN"] = "benchmark"
+            os.environ["SLACK_WEBHOOK_URL"] = slack.url
+
+            from script_py import async_engine, monitor
+            from script_py.config import CONFIG, Config
+            from script_py.slack_notifier import get_dispatcher
+
+            Config.ARGOCD_API = f"{base_url}/api/v1"
+            Config.SLACK_WEBHOOK_URL = slack.url
+            CONFIG.update({
+                "max_workers": args.workers,
+                "http_pool_size": max(args.workers, 10),
+                "async_concurrency": args.workers,
+                "async_connection_limit": args.workers,
+                "async_limit_per_host": args.workers,
+                "action_rate": args.action_rate,
+                "action_burst": args.action_rate,
+                "action_workers": args.workers,
+                "slack_max_messages_per_cycle": 1000,
+                # Las aplicaciones del servidor falso no cambian: la verificación tras sync solo esperaría el plazo
+                "sync_verification": False,
+            })
+            recorder = LatencyRecorder()
+            instrument(monitor, async_engine, recorder)
+            run_cycle = monitor.run_async_cycle if args.engine == "async" else monitor.run_threaded_cycle
+
+            before = fetch_stats(base_url)
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_cycle()
+                get_dispatcher().flush(wait=True, timeout=60)
+            wall_time = time.perf_counter() - started
+            after = fetch_stats(base_url)
+    finally:
+        fake_process.terminate()
+        fake_process.wait()
+
+    latencies = recorder.latencies()
+    requests_made = after["requests"] - before["requests"] - 1  # sin contar la consulta a /_stats
+    return {
+        "apps": args.apps,
+        "engine": args.engine,
+        "workers": args.workers,
+        "payload_bytes": args.payload_bytes,
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "cycle_seconds": round(wall_time, 4),
+        "app_latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "app_latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "requests": requests_made,
+        "requests_per_second": round(requests_made / wall_time, 1) if wall_time else 0,
+        "bytes_sent_by_server": after["bytes_sent"] - before["bytes_sent"],
+        "bytes_received_by_server": after["bytes_received"] - before["bytes_received"],
+        "slack_messages": len(slack.messages),
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, default=1000)
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads")
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument("--health-mix", default="Healthy=0.9,Degraded=0.05,Progressing=0.05")
+    parser.add_argument("--sync-mix", default="Synced=0.9,OutOfSync=0.1")
+    parser.add_argument("--payload-bytes", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.005, help="Latencia simulada por solicitud (segundos)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--action-rate", type=float, default=100000, help="Límite de refresh/sync por segundo")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    print(json.dumps(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Mide el historial de transiciones (HealthHistory) con un mes de datos de una flota grande.
+
+Cada `--interval` horas cambia de estado una fracción `--churn` de las aplicaciones. Se mide:
+- registrar las observaciones de todos los ciclos (solo las transiciones añaden filas);
+- escribir el fichero (un bloque por ciclo), cargarlo de nuevo y compactarlo;
+- las consultas de toda la flota (flapping y MTTR del mes) y la escalada de cada aplicación.
+Termina con código 1 si alguna consulta supera el presupuesto (--budget-ms).
+
+Uso: python benchmarks/bench_history.py [--apps 5000] [--days 30] [--interval 1] [--churn 0.2]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+from script_py.history import HealthHistory
+
+HEALTHS = ["Healthy", "Degraded", "Progressing", "Missing", "Error"]
+QUERY_BUDGET_MS = 1000
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--interval", type=float, default=1, help="Horas entre ciclos")
+    parser.add_argument("--churn", type=float, default=0.2, help="Fracción de aplicaciones que cambian por ciclo")
+    parser.add_argument("--budget-ms", type=float, default=QUERY_BUDGET_MS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    names = [f"app-{i:05d}" for i in range(args.apps)]
+    cycles = int(args.days * 24 / args.interval)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "history.bin")
+        clock = FakeClock()
+        # Sin compactación durante la carga: se mide aparte
+        history = HealthHistory(path=path, retention=args.days * 24 * 3600, compact_chunks=cycles + 2, clock=clock)
+        current = {name: "Healthy" for name in names}
+
+        def record_all():
+            for cycle in range(cycles):
+                clock.now = cycle * args.interval * 3600
+                history.start_cycle()
+                for name in rng.sample(names, int(args.apps * args.churn)):
+                    current[name] = rng.choice(HEALTHS)
+                for name in names:
+                    history.record(name, current[name], "Synced")
+                history.flush()
+
+        _, record_ms = timed(record_all)
+        size = os.path.getsize(path)
+        reloaded, load_ms = timed(lambda: HealthHistory(path=path, retention=args.days * 24 * 3600, clock=clock))
+        window = args.days * 24 * 3600
+        flapping, flapping_ms = timed(lambda: reloaded.flapping(window, min_changes=4))
+        mttr, mttr_ms = timed(lambda: reloaded.mean_time_to_recovery(window))
+        _, escalation_ms = timed(lambda: [reloaded.unhealthy_cycles(name) for name in names])
+        clock.now += window / 2
+        dropped, compact_ms = timed(reloaded.compact)
+
+    print(f"Historial: {args.apps} aplicaciones, {cycles} ciclos, {len(history)} transiciones, {size / 1e6:.1f} MB en disco")
+    print(f"  registrar + escribir       {record_ms:9.1f} ms ({record_ms / cycles:.1f} ms por ciclo)")
+    print(f"  cargar                     {load_ms:9.1f} ms")
+    print(f"  flapping (mes)             {flapping_ms:9.1f} ms ({len(flapping)} aplicaciones)")
+    print(f"  MTTR (mes)                 {mttr_ms:9.1f} ms ({mttr / 3600 if mttr else 0:.1f} h)")
+    print(f"  escalada (todas)           {escalation_ms:9.1f} ms")
+    print(f"  compactar (medio mes)      {compact_ms:9.1f} ms ({dropped} filas descartadas)")
+    slowest = max(flapping_ms, mttr_ms, escalation_ms)
+    print(f"Presupuesto por consulta: {args.budget_ms:.0f} ms ({'OK' if slowest <= args.budget_ms else 'SUPERADO'})")
+    return 0 if slowest <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Mide el coste del logging por cada 10.000 aplicaciones procesadas.
+
+Compara los print() anteriores (con get_current_time() en cada llamada) con el logger
+estructurado: con el nivel por defecto (INFO, los mensajes de depuración se descartan sin
+formatear) y con DEBUG (todos los registros se formatean como JSON en el hilo de escritura).
+Por aplicación se emiten los mismos mensajes que una aplicación Healthy/Synced con refresh.
+
+Uso: python benchmarks/bench_logging.py [--apps 10000] [--threads 5]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+os.environ.setdefault("CONFIG_FILE", os.path.join(os.path.dirname(__file__), "../cronjob/config.yaml"))
+
+from script_py import logger
+
+
+def get_current_time():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def chatter_print(app_name):
+    print(f"{get_current_time()} 🔄 Procesando la aplicación: {app_name}")
+    print(f"{get_current_time()} ✅ '{app_name}' está en estado Healthy y Synced.")
+    print(f"🔍 Enviando solicitud de actualización para la aplicación {app_name}")  # Depuración
+    print(f"🔍 Respuesta del servidor: 200")  # Depuración
+
+
+def chatter_logger(app_name, log=logger.get_logger("bench")):
+    log.debug("🔄 Procesando la aplicación: %s", app_name, extra={"app": app_name})
+    log.debug("✅ '%s' está en estado Healthy y Synced.", app_name, extra={"app": app_name})
+    log.debug("🔍 Enviando solicitud de actualización para la aplicación %s", app_name, extra={"app": app_name})
+    log.debug("🔍 Respuesta del servidor: %s", 200, extra={"app": app_name, "status": 200})
+
+
+def no_chatter(app_name):
+    pass
+
+
+def run(chatter, apps, threads):
+    names = [f"app-{i:05d}" for i in range(apps)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(chatter, names))
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    # Referencia: el mismo reparto de trabajo entre hilos sin ningún mensaje
+    results = {"sin logging": run(no_chatter, args.apps, args.threads)}
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            results["print"] = run(chatter_print, args.apps, args.threads)
+
+        for level in ("INFO", "DEBUG"):
+            logger.setup_logging(config={}, level=level, stream=devnull, max_queue=args.apps * 4 + 1)
+            started = time.perf_counter()
+            results[f"logger {level} (hilos de trabajo)"] = run(chatter_logger, args.apps, args.threads)
+            # El total incluye vaciar la cola: el coste del hilo de escritura, no solo el de quien registra
+            logger.shutdown_logging()
+            results[f"logger {level} (total)"] = time.perf_counter() - started
+
+    scale = 10000 / args.apps
+    print(f"Coste del logging por 10.000 aplicaciones ({args.threads} hilos):")
+    for name, seconds in results.items():
+        print(f"  {name:<32} {seconds * scale * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
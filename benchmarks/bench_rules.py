@@ -0,0 +1,84 @@
+"""Compara la cadena if/elif original de process_application con el motor de reglas compilado.
+
+Para cada tamaño de lista de exclusión se evalúan las mismas aplicaciones con:
+- la cadena original (excluded_apps como lista, recorrida en cada aplicación);
+- el RuleEngine con las reglas por defecto, las exclusiones y unas reglas con patrones.
+Se mide solo la decisión (sin estado, logging ni llamadas a ArgoCD).
+
+Uso: python benchmarks/bench_rules.py [--apps 10000] [--excluded 10,100,1000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+os.environ.setdefault("CONFIG_FILE", os.path.join(os.path.dirname(__file__), "../cronjob/config.yaml"))
+
+from script_py.rules import DEFAULT_RULES, RuleEngine
+
+HEALTHS = ["Healthy"] * 8 + ["Progressing", "Degraded", "Error", "Missing"]
+SYNCS = ["Synced"] * 4 + ["OutOfSync"]
+
+
+def chain_decision(app_name, health_status, sync_status, excluded_apps):
+    """Decisión de la cadena if/elif anterior al motor de reglas."""
+    if app_name in excluded_apps:
+        return None
+    actions = []
+    if health_status != "Healthy":
+        actions.append("refresh")
+    if health_status == "Healthy" and sync_status == "Synced":
+        pass
+    elif sync_status == "OutOfSync":
+        actions.append("sync")
+    elif health_status in ["Degraded", "Error"]:
+        actions.append("notify")
+    return actions
+
+
+def make_fleet(count, seed=0):
+    rng = random.Random(seed)
+    return [(f"app-{i:05d}", f"project-{i % 20}", rng.choice(HEALTHS), rng.choice(SYNCS)) for i in range(count)]
+
+
+def timed(function, fleet, rounds=3):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for app in fleet:
+            function(*app)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, default=10000)
+    parser.add_argument("--excluded", default="10,100,1000")
+    args = parser.parse_args(argv)
+
+    fleet = make_fleet(args.apps)
+    print(f"Decisión por aplicación ({args.apps} aplicaciones, mejor de 3 vueltas):")
+    print(f"  {'excluidas':>9} {'if/elif':>10} {'reglas (1ª)':>12} {'reglas':>10}")
+    for size in (int(value) for value in args.excluded.split(",")):
+        excluded = [f"excluded-{i}" for i in range(size)]
+        chain = timed(lambda name, project, health, sync: chain_decision(name, health, sync, excluded), fleet)
+
+        specs = [{"name": "excluded-apps", "apps": excluded, "actions": ["ignore"]}]
+        specs += [{"name": f"team-{i}", "apps": f"team-{i}-*", "health": "Degraded", "actions": ["notify"]} for i in range(20)]
+        specs += [{"name": "canary", "projects": "re:^canary-", "actions": ["ignore"]}]
+        specs += DEFAULT_RULES
+        engine = RuleEngine.from_config({"rules": specs})
+        evaluate = lambda name, project, health, sync: engine.evaluate(name, project, health, sync)
+        # La primera vuelta incluye resolver los selectores de cada nombre; las siguientes usan la caché
+        first = timed(evaluate, fleet, rounds=1)
+        warm = timed(evaluate, fleet)
+        scale = 1e9 / args.apps
+        print(f"  {size:>9} {chain * scale:>8.0f}ns {first * scale:>10.0f}ns {warm * scale:>8.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
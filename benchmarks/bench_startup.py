@@ -0,0 +1,78 @@
+"""Mide el arranque del monitor: coste de importar script_py.monitor y de cargar la configuración.
+
+Cada medición es un proceso nuevo (como cada ejecución del CronJob):
+- import: tiempo acumulado de `import script_py.monitor` según `python -X importtime`;
+- config yaml / config caché: importar el monitor y leer una clave de la configuración,
+  parseando config.yaml o usando la caché precompilada (CONFIG_CACHE);
+- --help: el punto de entrada completo hasta procesar los argumentos.
+Termina con código 1 si la mediana del import supera el presupuesto (--budget-ms).
+
+Uso: python benchmarks/bench_startup.py [--runs 7] [--budget-ms 200]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+CRONJOB_DIR = os.path.join(ROOT, "cronjob")
+CONFIG_FILE = os.path.join(CRONJOB_DIR, "config.yaml")
+# Presupuesto de `import script_py.monitor` (mediana, milisegundos). Con requests, urllib3,
+# yaml y dotenv importados al cargar los módulos costaba ~270 ms; ahora ~90-150 ms, casi todo
+# prometheus_client, que el monitor necesita desde el primer ciclo.
+IMPORT_BUDGET_MS = 200
+
+
+def run(code_or_args, env, capture_stderr=False):
+    command = [sys.executable] + (code_or_args if isinstance(code_or_args, list) else ["-c", code_or_args])
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=CRONJOB_DIR, env=env, capture_output=True, text=True, check=True)
+    return time.perf_counter() - started, result.stderr if capture_stderr else result.stdout
+
+
+def import_time_ms(env):
+    """Tiempo acumulado (ms) de script_py.monitor en la salida de -X importtime."""
+    _, stderr = run(["-X", "importtime", "-c", "import script_py.monitor"], env, capture_stderr=True)
+    for line in stderr.splitlines():
+        if line.rstrip().endswith("| script_py.monitor"):
+            return int(line.split("|")[1]) / 1000
+    raise RuntimeError("script_py.monitor no aparece en la salida de -X importtime")
+
+
+def median_ms(measure, runs):
+    return statistics.median(measure() for _ in range(runs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, CONFIG_FILE=CONFIG_FILE, PYTHONPATH=CRONJOB_DIR)
+    env.pop("CONFIG_CACHE", None)
+    read_config = "from script_py import monitor; monitor.CONFIG.get('engine')"
+    with tempfile.TemporaryDirectory() as directory:
+        cached_env = dict(env, CONFIG_CACHE=os.path.join(directory, "config.json"))
+        run(["-m", "script_py.config", "--compile"], cached_env)
+        results = {
+            "import script_py.monitor": median_ms(lambda: import_time_ms(env), args.runs),
+            "proceso: python vacío": median_ms(lambda: run("pass", env)[0] * 1000, args.runs),
+            "proceso: config yaml": median_ms(lambda: run(read_config, env)[0] * 1000, args.runs),
+            "proceso: config caché": median_ms(lambda: run(read_config, cached_env)[0] * 1000, args.runs),
+            "proceso: monitor --help": median_ms(lambda: run(["-m", "script_py.monitor", "--help"], cached_env)[0] * 1000, args.runs),
+        }
+
+    print(f"Arranque del monitor (mediana de {args.runs} procesos):")
+    for name, milliseconds in results.items():
+        print(f"  {name:<28} {milliseconds:8.1f} ms")
+    spent = results["import script_py.monitor"]
+    print(f"Presupuesto de import: {args.budget_ms:.0f} ms ({'OK' if spent <= args.budget_ms else 'SUPERADO'})")
+    return 0 if spent <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
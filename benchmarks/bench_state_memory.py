@@ -0,0 +1,83 @@
+"""Compara la memoria por aplicación de AppStateStore con el antiguo diccionario app_versions.
+
+Uso: python benchmarks/bench_state_memory.py [--apps 10000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+from script_py.state import AppStateStore
+
+HEALTH = ["Healthy", "Degraded", "Progressing", "Missing"]
+SYNC = ["Synced", "OutOfSync"]
+
+
+def sample(count):
+    # Cadenas construidas en tiempo de ejecución, como las que llegan decodificadas del JSON de ArgoCD
+    for i in range(count):
+        yield (
+            "".join(["app-", str(i)]),
+            "".join(HEALTH[i % len(HEALTH)]),
+            "".join(SYNC[i % len(SYNC)]),
+            "".join(["rev-", str(i % 50)]),
+        )
+
+
+def measure(build, count):
+    records = list(sample(count))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    container = build(records)
+    elapsed = time.perf_counter() - started
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return container, used, elapsed
+
+
+def build_dict(records):
+    # Estructura anterior: dict de dicts con los mismos campos que AppState
+    app_versions = {}
+    for name, health, sync, revision in records:
+        app_versions[name] = {
+            "health_status": health, "sync_status": sync, "version": revision,
+            "first_seen": time.time(), "last_seen": time.time(), "last_change": time.time(),
+            "sync_attempts": 0, "refresh_attempts": 0, "last_action": None, "last_action_at": 0.0,
+        }
+    return app_versions
+
+
+def build_store(records):
+    store = AppStateStore()
+    for name, health, sync, revision in records:
+        store.observe(name, health, sync, revision)
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apps", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    _, dict_bytes, dict_time = measure(build_dict, args.apps)
+    store, store_bytes, store_time = measure(build_store, args.apps)
+
+    started = time.perf_counter()
+    snapshot = store.snapshot()
+    snapshot_time = time.perf_counter() - started
+    started = time.perf_counter()
+    AppStateStore.diff(snapshot, store.snapshot())
+    diff_time = time.perf_counter() - started
+
+    print(f"Aplicaciones: {args.apps}")
+    print(f"dict app_versions: {dict_bytes / args.apps:8.1f} bytes/app  ({dict_time * 1000:.1f} ms)")
+    print(f"AppStateStore:     {store_bytes / args.apps:8.1f} bytes/app  ({store_time * 1000:.1f} ms)")
+    print(f"snapshot: {snapshot_time * 1000:.1f} ms, diff: {diff_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
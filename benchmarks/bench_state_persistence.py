@@ -0,0 +1,52 @@
+"""Mide el tiempo de carga y guardado del estado persistido en SQLite.
+
+Uso: python benchmarks/bench_state_persistence.py [--apps 5000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+from script_py.persistence import SQLiteBackend
+from script_py.state import AppStateStore
+
+HEALTH = ["Healthy", "Degraded", "Progressing", "Missing"]
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--apps", type=int, default=5000)
+    parser.add_argument("--changed", type=float, default=0.05, help="Fracción de aplicaciones que cambian por ciclo")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.db")
+        store = AppStateStore(backend=SQLiteBackend(path))
+        for i in range(args.apps):
+            store.observe(f"app-{i}", HEALTH[i % len(HEALTH)], "Synced", f"rev-{i % 50}")
+        written, full_save = timed(store.flush)
+
+        # Ejecución siguiente del CronJob: carga perezosa y guardado incremental
+        store = AppStateStore(backend=SQLiteBackend(path))
+        _, load = timed(lambda: len(store))
+        for i in range(int(args.apps * args.changed)):
+            store.observe(f"app-{i}", "Degraded", "OutOfSync", "rev-new")
+        changed, incremental_save = timed(store.flush)
+
+    print(f"Aplicaciones: {args.apps}")
+    print(f"guardado completo:    {full_save:7.1f} ms ({written} registros)")
+    print(f"carga:                {load:7.1f} ms")
+    print(f"guardado incremental: {incremental_save:7.1f} ms ({changed} registros)")
+
+
+if __name__ == "__main__":
+    main()
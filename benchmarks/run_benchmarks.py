@@ -0,0 +1,66 @@
+"""Ejecuta bench_cycle.py para una matriz de tamaños de flota, motores y número de workers.
+
+Cada combinación se ejecuta en un proceso nuevo (el RSS máximo no se mezcla entre casos) y los
+resultados se guardan en un fichero JSON para poder comparar ejecuciones y detectar regresiones.
+
+Uso: python benchmarks/run_benchmarks.py [--apps 100 1000 5000 20000] [--output benchmarks/results.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+BENCH_CYCLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_cycle.py")
+
+
+def run_case(apps, engine, workers, extra_args, timeout):
+    command = [sys.executable, BENCH_CYCLE, "--apps", str(apps), "--engine", engine, "--workers", str(workers)] + extra_args
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"apps": apps, "engine": engine, "workers": workers, "error": f"timeout ({timeout}s)"}
+    if completed.returncode != 0:
+        return {"apps": apps, "engine": engine, "workers": workers, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--engines", nargs="+", choices=["threads", "async"], default=["threads", "async"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--timeout", type=int, default=900, help="Tiempo máximo por caso (segundos)")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(BENCH_CYCLE), "results.json"))
+    args, extra_args = parser.parse_known_args(argv)
+
+    results = []
+    for apps, engine, workers in itertools.product(args.apps, args.engines, args.workers):
+        result = run_case(apps, engine, workers, extra_args, args.timeout)
+        results.append(result)
+        if "error" in result:
+            print(f"❌ apps={apps} engine={engine} workers={workers}: {result['error']}")
+        else:
+            print(
+                f"✅ apps={apps:>6} engine={engine:<7} workers={workers:>3} "
+                f"ciclo={result['cycle_seconds']:.2f}s p50={result['app_latency_p50_ms']:.1f}ms "
+                f"p99={result['app_latency_p99_ms']:.1f}ms rss={result['peak_rss_mb']}MB "
+                f"rps={result['requests_per_second']}"
+            )
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "options": extra_args,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
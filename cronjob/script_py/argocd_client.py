@@ -1,64 +1,413 @@
-import requests
-import urllib3
-from script_py.config import Config
+import json
+import threading
+from collections import namedtuple
+from script_py.config import Config, CONFIG
+from script_py.http_cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, DEFAULT_TTL, CachedResponse, ResponseCache, SingleFlight, cache_key
+from script_py.json_stream import ItemStreamParser
+from script_py.lazy import lazy_import
+from script_py.logger import get_logger
+from script_py.metrics import RequestTimer, observe_cache
+
+# requests y urllib3 se importan al crear el primer cliente, no al importar el módulo
+requests = lazy_import("requests")
+urllib3 = lazy_import("urllib3")
+
+log = get_logger("argocd_client")
+
+# Timeouts por defecto (en segundos) para cada endpoint de la API de ArgoCD
+DEFAULT_TIMEOUTS = {
+    "applications": 10,
+    "sync": 10,
+    "refresh": 10,
+    "status": 10,
+    "projects": 10,
+    "resource_tree": 30,
+    "managed_resources": 15,
+    "stream": 300,
+}
+# Endpoints a los que no se aplica request_timeout: el stream permanece abierto y el
+# resource-tree y managed-resources de una aplicación grande tardan más que una llamada normal
+LONG_TIMEOUT_ENDPOINTS = ("stream", "resource_tree", "managed_resources")
+DEFAULT_POOL_SIZE = 10
+
+# Campos que el monitor necesita de cada aplicación (parámetro fields= de ArgoCD)
+APPLICATION_FIELDS = ",".join([
+    "items.metadata.name",
+    "items.metadata.resourceVersion",
+    "items.metadata.annotations",
+    "items.spec.project",
+    "items.status.health.status",
+    "items.status.sync.status",
+    "items.status.operationState.phase",
+])
+# Campos mínimos para verificar el estado de un lote de aplicaciones (p. ej. tras un sync)
+STATUS_FIELDS = ",".join([
+    "items.metadata.name",
+    "items.status.health.status",
+    "items.status.sync.status",
+    "items.status.operationState.phase",
+])
+# refresh=true solo interesa por su efecto: ArgoCD refresca igualmente la aplicación y la
+# respuesta se limita a estos campos en lugar del documento completo (status.resources, history...)
+REFRESH_FIELDS = ",".join([
+    "metadata.name",
+    "metadata.resourceVersion",
+    "status.health.status",
+    "status.sync.status",
+])
+REVISION_ANNOTATION = "argocd.argoproj.io/revision"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def compact_application(app):
+    """Reduce una aplicación de ArgoCD a los campos que usa el monitor, con la misma estructura."""
+    metadata = app.get("metadata") or {}
+    status = app.get("status") or {}
+    annotations = metadata.get("annotations") or {}
+    compact = {
+        "metadata": {"name": metadata.get("name"), "resourceVersion": metadata.get("resourceVersion")},
+        "spec": {"project": (app.get("spec") or {}).get("project")},
+        "status": {
+            "health": {"status": (status.get("health") or {}).get("status")},
+            "sync": {"status": (status.get("sync") or {}).get("status")},
+        },
+    }
+    if REVISION_ANNOTATION in annotations:
+        compact["metadata"]["annotations"] = {REVISION_ANNOTATION: annotations[REVISION_ANNOTATION]}
+    phase = (status.get("operationState") or {}).get("phase")
+    if phase:
+        compact["status"]["operationState"] = {"phase": phase}
+    return compact
+
+
+def operation_in_progress(app):
+    """True si ArgoCD ya está ejecutando una operación (p. ej. un sync) sobre la aplicación."""
+    return (app.get("status", {}).get("operationState") or {}).get("phase") == "Running"
+
+
+def application_params(projects=None):
+    """Parámetros de /applications: campos proyectados y, opcionalmente, filtro por proyectos."""
+    params = {"fields": APPLICATION_FIELDS}
+    if projects is not None:
+        params["projects"] = list(projects)
+    return params
+
+
+# Estado de una aplicación devuelto por get_statuses (operation: fase de la última operación o None)
+AppStatus = namedtuple("AppStatus", ["health", "sync", "operation"])
+
+
+def status_params(app_names=None, selector=None, projects=None):
+    """Parámetros de /applications para consultar el estado de un lote de aplicaciones.
+
+    ArgoCD solo filtra por un nombre (name=) o por etiquetas (selector=): con varios nombres
+    se piden los campos de estado de todas (o de `projects`) y se filtra en el cliente.
+    """
+    params = {"fields": STATUS_FIELDS}
+    if selector:
+        params["selector"] = selector
+    elif app_names is not None and len(app_names) == 1:
+        params["name"] = next(iter(app_names))
+    if projects is not None:
+        params["projects"] = list(projects)
+    return params
+
+
+def timeouts_from_config(config):
+    """Combina request_timeout y los timeouts por endpoint definidos en config.yaml."""
+    default_timeout = config.get("request_timeout")
+    timeouts = {endpoint: default_timeout for endpoint in DEFAULT_TIMEOUTS if endpoint not in LONG_TIMEOUT_ENDPOINTS} if default_timeout else {}
+    timeouts.update(config.get("timeouts") or {})
+    return timeouts
+
+
+def pool_size_from_config(config):
+    """Tamaño del pool HTTP: http_pool_size, ampliado hasta concurrency_max con concurrencia adaptativa.
+
+    Con pool_block=True, un pool menor que el límite del AIMDController haría esperar a los
+    hilos por una conexión y esa espera se mediría como latencia de ArgoCD.
+    """
+    pool_size = config.get("http_pool_size", DEFAULT_POOL_SIZE)
+    if config.get("adaptive_concurrency", False):
+        pool_size = max(pool_size, config.get("concurrency_max", 20))
+    return pool_size
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class ArgoCDClient:
-    @staticmethod
-    def get_applications(timeout=10):
-        headers = {"Authorization": f"Bearer {Config.ARGOCD_TOKEN}"}
-        print(f"🔍 Enviando solicitud a {Config.ARGOCD_API}/applications con headers {headers}")  # Depuración
+    """Cliente de la API de ArgoCD con un pool de conexiones compartido y keep-alive.
+
+    Las lecturas de estado de una aplicación (get_application_status) pasan por una caché HTTP
+    (`cache`, None la desactiva) y las peticiones concurrentes idénticas se agrupan en una sola.
+    """
+
+    def __init__(self, api=None, token=None, pool_size=DEFAULT_POOL_SIZE, timeouts=None, verify=False, cache=None):
+        self.api = api or Config.ARGOCD_API
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.verify = verify
+        self.cache = cache
+        self.flights = SingleFlight()
+        if not verify:
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        # Una única sesión: reutiliza conexiones TCP/TLS entre hilos (keep-alive)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {token or Config.ARGOCD_TOKEN}",
+            "Connection": "keep-alive",
+        })
+        self.adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Crea un cliente con el tamaño de pool y los timeouts definidos en config.yaml."""
+        config = CONFIG if config is None else config
+        cache = None
+        if config.get("http_cache", True):
+            cache = ResponseCache(
+                max_entries=config.get("http_cache_size", DEFAULT_MAX_ENTRIES),
+                max_bytes=config.get("http_cache_max_bytes", DEFAULT_MAX_BYTES),
+                ttl=config.get("http_cache_ttl", DEFAULT_TTL),
+            )
+        return cls(
+            pool_size=pool_size_from_config(config),
+            timeouts=timeouts_from_config(config),
+            cache=cache,
+        )
+
+    def _timeout(self, endpoint, timeout):
+        return timeout if timeout is not None else self.timeouts[endpoint]
+
+    def pool_stats(self):
+        """Devuelve los aciertos (conexiones reutilizadas) y fallos (conexiones nuevas) del pool."""
+        requests_made = 0
+        connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            requests_made += pool.num_requests
+            connections += pool.num_connections
+        return {"hits": requests_made - connections, "misses": connections, "requests": requests_made}
+
+    def close(self):
+        self.session.close()
+
+    def _send_get(self, endpoint, url, params, timeout, headers=None):
+        with RequestTimer(endpoint) as request:
+            response = self.session.get(url, params=params, headers=headers, verify=self.verify, timeout=self._timeout(endpoint, timeout))
+            request.status = response.status_code
+        return response
+
+    def _cached_get(self, endpoint, path, params=None, timeout=None):
+        """GET de un documento a través de la caché HTTP (solo lo usa get_application_status).
+
+        Dentro del TTL se responde desde la caché; después se
+        revalida con If-None-Match si ArgoCD envió un ETag. Las peticiones concurrentes a la
+        misma URL esperan a la primera en lugar de repetirla.
+        """
+        url = f"{self.api}{path}"
+        params = dict(params or {})
+        if self.cache is None:
+            return self._send_get(endpoint, url, params or None, timeout)
+
+        key = cache_key(url, params)
+        entry, fresh = self.cache.lookup(key)
+        if fresh:
+            observe_cache("hit", len(entry.content))
+            return CachedResponse(url, entry.content, entry.etag)
+        response, shared = self.flights.do(key, lambda: self._revalidate(endpoint, url, params or None, key, timeout))
+        if shared:
+            observe_cache("collapsed")
+        return response
+
+    def _revalidate(self, endpoint, url, params, key, timeout):
+        entry, _ = self.cache.lookup(key)
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else None
+        response = self._send_get(endpoint, url, params, timeout, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key)
+            observe_cache("revalidated", len(entry.content))
+            return CachedResponse(url, entry.content, entry.etag)
+        observe_cache("miss")
+        if response.status_code == 200:
+            self.cache.store(key, response.content, response.headers.get("ETag"))
+        return response
+
+    def iter_applications(self, timeout=None, projects=None):
+        """Genera las aplicaciones una a una, ya compactadas, sin cargar la respuesta completa en memoria.
+
+        Solo se piden a ArgoCD los campos de APPLICATION_FIELDS (y, con `projects`, solo las
+        aplicaciones de esos proyectos). Los errores se propagan.
+        """
+        log.debug("🔍 Enviando solicitud a %s/applications", self.api)
+        # La latencia registrada incluye la descarga completa de la respuesta
+        with RequestTimer("applications") as request:
+            response = self.session.get(f"{self.api}/applications", params=application_params(projects), stream=True, verify=self.verify, timeout=self._timeout("applications", timeout))
+            request.status = response.status_code
+            try:
+                log.debug("🔍 Respuesta del servidor: %s", response.status_code, extra={"endpoint": "applications", "status": response.status_code})
+                response.raise_for_status()
+                parser = ItemStreamParser()
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    for app in parser.feed(chunk):
+                        yield compact_application(app)
+                parser.close()
+            finally:
+                response.close()
+
+    def get_applications(self, timeout=None, projects=None):
         try:
-            response = requests.get(f"{Config.ARGOCD_API}/applications", headers=headers, verify=False, timeout=timeout)
-            print(f"🔍 Respuesta del servidor: {response.status_code}")  # Depuración
-            response.raise_for_status()
-            return response.json().get("items", [])
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error al obtener aplicaciones: {e}")
+            return list(self.iter_applications(timeout=timeout, projects=projects))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            log.error("❌ Error al obtener aplicaciones: %s", e)
         return []
 
-    @staticmethod
-    def sync_app(app_name, timeout=10):
-        headers = {"Authorization": f"Bearer {Config.ARGOCD_TOKEN}", "Content-Type": "application/json"}
-        print(f"🔍 Enviando solicitud de sincronización para la aplicación {app_name}")  # Depuración
+    def get_projects(self, timeout=None):
+        """Nombres de los AppProject de ArgoCD, o None si no se pudieron obtener."""
+        log.debug("🔍 Enviando solicitud a %s/projects", self.api)
+        try:
+            with RequestTimer("projects") as request:
+                response = self.session.get(f"{self.api}/projects", verify=self.verify, timeout=self._timeout("projects", timeout))
+                request.status = response.status_code
+            response.raise_for_status()
+            return [item.get("metadata", {}).get("name") for item in response.json().get("items") or []]
+        except (requests.exceptions.RequestException, ValueError) as e:
+            log.error("❌ Error al obtener los proyectos: %s", e)
+        return None
+
+    def get_statuses(self, app_names=None, selector=None, projects=None, timeout=None):
+        """Estado (AppStatus) de un lote de aplicaciones con una sola solicitud a /applications.
+
+        Devuelve {nombre: AppStatus} limitado a `app_names` si se indican (las que no existen
+        no aparecen), o None si la solicitud falla.
+        """
+        wanted = set(app_names) if app_names is not None else None
+        log.debug("🔍 Consultando el estado de %s aplicaciones", len(wanted) if wanted is not None else "todas las")
         try:
-            response = requests.post(f"{Config.ARGOCD_API}/applications/{app_name}/sync", headers=headers, verify=False, json={}, timeout=timeout)
-            print(f"🔍 Respuesta del servidor: {response.status_code}")  # Depuración
+            # Etiqueta propia: el listado de la flota no debe llegar al AIMDController como "status"
+            with RequestTimer("statuses") as request:
+                response = self.session.get(f"{self.api}/applications", params=status_params(wanted, selector, projects), verify=self.verify, timeout=self._timeout("status", timeout))
+                request.status = response.status_code
+            response.raise_for_status()
+            statuses = {}
+            for app in response.json().get("items") or []:
+                name = (app.get("metadata") or {}).get("name")
+                if wanted is not None and name not in wanted:
+                    continue
+                status = app.get("status") or {}
+                statuses[name] = AppStatus(
+                    (status.get("health") or {}).get("status", "Unknown"),
+                    (status.get("sync") or {}).get("status", "Unknown"),
+                    (status.get("operationState") or {}).get("phase"),
+                )
+            return statuses
+        except (requests.exceptions.RequestException, ValueError) as e:
+            log.error("❌ Error al obtener el estado de las aplicaciones: %s", e)
+        return None
+
+    def watch_applications(self, resource_version=None, timeout=None):
+        """Genera (tipo, aplicación) por cada evento de /stream/applications hasta que se cierre la conexión.
+
+        Los errores de red se propagan para que el llamador decida cómo reconectar.
+        """
+        params = {"resourceVersion": resource_version} if resource_version else {}
+        log.debug("🔍 Abriendo stream %s/stream/applications %s", self.api, params)
+        with self.session.get(f"{self.api}/stream/applications", params=params, stream=True, verify=self.verify, timeout=self._timeout("stream", timeout)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                result = json.loads(line).get("result", {})
+                yield result.get("type"), result.get("application", {})
+
+    def iter_resource_tree(self, app_name, timeout=None, on_chunk=None):
+        """Genera los nodos de /applications/{nombre}/resource-tree a medida que llegan.
+
+        El árbol no se carga entero en memoria. `on_chunk(bytes)` se llama con el tamaño de
+        cada fragmento recibido; si devuelve False se deja de leer. Los errores se propagan.
+        """
+        log.debug("🔍 Obteniendo el árbol de recursos de %s", app_name, extra={"app": app_name})
+        with RequestTimer("resource_tree") as request:
+            response = self.session.get(f"{self.api}/applications/{app_name}/resource-tree", stream=True, verify=self.verify, timeout=self._timeout("resource_tree", timeout))
+            request.status = response.status_code
+            try:
+                response.raise_for_status()
+                # orphanedNodes y hosts no se usan: se descartan en lugar de guardarse
+                parser = ItemStreamParser(key="nodes", keep_extra=False)
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    if on_chunk is not None and on_chunk(len(chunk)) is False:
+                        return
+                    yield from parser.feed(chunk)
+                parser.close()
+            finally:
+                response.close()
+
+    def get_managed_resources(self, app_name, kind=None, name=None, namespace=None, group=None, timeout=None):
+        """Recursos gestionados de una aplicación filtrados por kind/name/namespace/group (errores propagados)."""
+        params = {key: value for key, value in (("kind", kind), ("resourceName", name), ("namespace", namespace), ("group", group)) if value}
+        with RequestTimer("managed_resources") as request:
+            response = self.session.get(f"{self.api}/applications/{app_name}/managed-resources", params=params, verify=self.verify, timeout=self._timeout("managed_resources", timeout))
+            request.status = response.status_code
+        response.raise_for_status()
+        return response.json().get("items") or []
+
+    def sync_app(self, app_name, timeout=None):
+        log.debug("🔍 Enviando solicitud de sincronización para la aplicación %s", app_name, extra={"app": app_name})
+        try:
+            with RequestTimer("sync") as request:
+                response = self.session.post(f"{self.api}/applications/{app_name}/sync", verify=self.verify, json={}, timeout=self._timeout("sync", timeout))
+                request.status = response.status_code
+            log.debug("🔍 Respuesta del servidor: %s", response.status_code, extra={"app": app_name, "status": response.status_code})
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
-            print(f"❌ Error al sincronizar la aplicación '{app_name}': {e}")
+            log.error("❌ Error al sincronizar la aplicación '%s': %s", app_name, e, extra={"app": app_name})
 
-    @staticmethod
-    def refresh_app(app_name, timeout=10):
-        headers = {"Authorization": f"Bearer {Config.ARGOCD_TOKEN}"}
-        print(f"🔍 Enviando solicitud de actualización para la aplicación {app_name}")  # Depuración
+    def refresh_app(self, app_name, timeout=None):
+        log.debug("🔍 Enviando solicitud de actualización para la aplicación %s", app_name, extra={"app": app_name})
         try:
-            response = requests.get(f"{Config.ARGOCD_API}/applications/{app_name}?refresh=true", headers=headers, verify=False, timeout=timeout)
-            print(f"🔍 Respuesta del servidor: {response.status_code}")  # Depuración
+            url = f"{self.api}/applications/{app_name}"
+            response = self._send_get("refresh", url, {"refresh": "true", "fields": REFRESH_FIELDS}, timeout)
+            # La entrada guardada por get_application_status ya no refleja el estado refrescado
+            if self.cache is not None:
+                self.cache.discard(cache_key(url))
+            log.debug("🔍 Respuesta del servidor: %s", response.status_code, extra={"app": app_name, "status": response.status_code})
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
-            print(f"❌ Error al actualizar la aplicación '{app_name}': {e}")
+            log.error("❌ Error al actualizar la aplicación '%s': %s", app_name, e, extra={"app": app_name})
 
-    @staticmethod
-    def get_application_status(app_name, timeout=10):
-        headers = {"Authorization": f"Bearer {Config.ARGOCD_TOKEN}"}
-        print(f"🔍 Enviando solicitud para obtener el estado de la aplicación {app_name}")  # Depuración
+    def get_application_status(self, app_name, timeout=None):
+        log.debug("🔍 Enviando solicitud para obtener el estado de la aplicación %s", app_name, extra={"app": app_name})
         try:
-            response = requests.get(f"{Config.ARGOCD_API}/applications/{app_name}", headers=headers, verify=False, timeout=timeout)
-            print(f"🔍 Respuesta del servidor: {response.status_code}")  # Depuración
+            response = self._cached_get("status", f"/applications/{app_name}", timeout=timeout)
+            log.debug("🔍 Respuesta del servidor: %s", response.status_code, extra={"app": app_name, "status": response.status_code})
             response.raise_for_status()
             app_info = response.json()
             health_status = app_info.get("status", {}).get("health", {}).get("status", "Unknown")
             sync_status = app_info.get("status", {}).get("sync", {}).get("status", "Unknown")
-            print(f"🔍 Estado de salud: {health_status}, Estado de sincronización: {sync_status}")  # Depuración
+            log.debug("🔍 Estado de salud: %s, Estado de sincronización: %s", health_status, sync_status, extra={"app": app_name})
             return health_status, sync_status
         except requests.exceptions.HTTPError as http_err:
-            print(f"❌ HTTP error: {http_err}")
+            log.error("❌ HTTP error: %s", http_err, extra={"app": app_name})
         except requests.exceptions.ConnectionError as conn_err:
-            print(f"❌ Connection error: {conn_err}")
+            log.error("❌ Connection error: %s", conn_err, extra={"app": app_name})
         except requests.exceptions.Timeout as timeout_err:
-            print(f"❌ Timeout error: {timeout_err}")
+            log.error("❌ Timeout error: %s", timeout_err, extra={"app": app_name})
         except Exception as e:
-            print(f"❌ Error desconocido: {e}")
-        return "Unknown", "Unknown"
\ No newline at end of file
+            log.error("❌ Error desconocido: %s", e, extra={"app": app_name})
+        return "Unknown", "Unknown"
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """Devuelve el cliente compartido por todos los hilos del proceso (se crea una sola vez)."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = ArgoCDClient.from_config()
+    return _default_client
@@ -0,0 +1,107 @@
+import asyncio
+import aiohttp
+from script_py.argocd_client import APPLICATION_FIELDS, DEFAULT_TIMEOUTS, REFRESH_FIELDS, STREAM_CHUNK_SIZE, compact_application, timeouts_from_config
+from script_py.config import Config, CONFIG
+from script_py.json_stream import ItemStreamParser
+from script_py.logger import get_logger
+from script_py.metrics import RequestTimer
+
+log = get_logger("async_argocd_client")
+
+DEFAULT_CONNECTION_LIMIT = 100
+DEFAULT_LIMIT_PER_HOST = 50
+
+
+class AsyncArgoCDClient:
+    """Cliente asíncrono de la API de ArgoCD (aiohttp) con límite de conexiones por host."""
+
+    def __init__(self, api=None, token=None, limit=DEFAULT_CONNECTION_LIMIT, limit_per_host=DEFAULT_LIMIT_PER_HOST, timeouts=None, verify=False):
+        self.api = api or Config.ARGOCD_API
+        self.token = token or Config.ARGOCD_TOKEN
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.verify = verify
+        self.session = None
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Crea un cliente con los límites de conexión y los timeouts definidos en config.yaml."""
+        config = CONFIG if config is None else config
+        return cls(
+            limit=config.get("async_connection_limit", DEFAULT_CONNECTION_LIMIT),
+            limit_per_host=config.get("async_limit_per_host", DEFAULT_LIMIT_PER_HOST),
+            timeouts=timeouts_from_config(config),
+        )
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host, ssl=None if self.verify else False)
+        self.session = aiohttp.ClientSession(connector=connector, headers={"Authorization": f"Bearer {self.token}"})
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+        self.session = None
+
+    def _timeout(self, endpoint, timeout):
+        return aiohttp.ClientTimeout(total=timeout if timeout is not None else self.timeouts[endpoint])
+
+    async def get_applications(self, timeout=None, projects=None):
+        log.debug("🔍 Enviando solicitud a %s/applications", self.api)
+        # aiohttp no acepta listas como valor: cada proyecto va como un parámetro projects= repetido
+        params = [("fields", APPLICATION_FIELDS)] + [("projects", project) for project in projects or []]
+        try:
+            with RequestTimer("applications") as request:
+                async with self.session.get(f"{self.api}/applications", params=params, timeout=self._timeout("applications", timeout)) as response:
+                    request.status = response.status
+                    log.debug("🔍 Respuesta del servidor: %s", response.status, extra={"endpoint": "applications", "status": response.status})
+                    response.raise_for_status()
+                    apps = []
+                    parser = ItemStreamParser()
+                    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                        apps.extend(compact_application(app) for app in parser.feed(chunk))
+                    parser.close()
+                    return apps
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            log.error("❌ Error al obtener aplicaciones: %s", e)
+        return []
+
+    async def sync_app(self, app_name, timeout=None):
+        log.debug("🔍 Enviando solicitud de sincronización para la aplicación %s", app_name, extra={"app": app_name})
+        try:
+            with RequestTimer("sync") as request:
+                async with self.session.post(f"{self.api}/applications/{app_name}/sync", json={}, timeout=self._timeout("sync", timeout)) as response:
+                    request.status = response.status
+                    log.debug("🔍 Respuesta del servidor: %s", response.status, extra={"app": app_name, "status": response.status})
+                    response.raise_for_status()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            log.error("❌ Error al sincronizar la aplicación '%s': %s", app_name, e, extra={"app": app_name})
+
+    async def refresh_app(self, app_name, timeout=None):
+        log.debug("🔍 Enviando solicitud de actualización para la aplicación %s", app_name, extra={"app": app_name})
+        try:
+            with RequestTimer("refresh") as request:
+                async with self.session.get(f"{self.api}/applications/{app_name}", params={"refresh": "true", "fields": REFRESH_FIELDS}, timeout=self._timeout("refresh", timeout)) as response:
+                    request.status = response.status
+                    log.debug("🔍 Respuesta del servidor: %s", response.status, extra={"app": app_name, "status": response.status})
+                    response.raise_for_status()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            log.error("❌ Error al actualizar la aplicación '%s': %s", app_name, e, extra={"app": app_name})
+
+    async def get_application_status(self, app_name, timeout=None):
+        log.debug("🔍 Enviando solicitud para obtener el estado de la aplicación %s", app_name, extra={"app": app_name})
+        try:
+            with RequestTimer("status") as request:
+                async with self.session.get(f"{self.api}/applications/{app_name}", timeout=self._timeout("status", timeout)) as response:
+                    request.status = response.status
+                    log.debug("🔍 Respuesta del servidor: %s", response.status, extra={"app": app_name, "status": response.status})
+                    response.raise_for_status()
+                    app_info = await response.json()
+            health_status = app_info.get("status", {}).get("health", {}).get("status", "Unknown")
+            sync_status = app_info.get("status", {}).get("sync", {}).get("status", "Unknown")
+            log.debug("🔍 Estado de salud: %s, Estado de sincronización: %s", health_status, sync_status, extra={"app": app_name})
+            return health_status, sync_status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            log.error("❌ Error al obtener el estado de la aplicación '%s': %s", app_name, e, extra={"app": app_name})
+        return "Unknown", "Unknown"
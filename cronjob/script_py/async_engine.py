@@ -0,0 +1,121 @@
+import asyncio
+import time
+from script_py.argocd_client import operation_in_progress
+from script_py.async_argocd_client import AsyncArgoCDClient
+from script_py.logger import get_logger
+from script_py.metrics import observe_queue_wait
+from script_py.diagnosis import notify_unhealthy
+
+log = get_logger("async_engine")
+
+DEFAULT_CONCURRENCY = 100
+DEFAULT_CYCLE_DEADLINE = 5 * 60
+
+
+async def run_action(client, app_name, action, scheduler=None):
+    """Ejecuta refresh/sync respetando los límites del ActionScheduler, si se proporciona."""
+    if scheduler is not None and not scheduler.admit(app_name, action):
+        return
+    try:
+        if scheduler is not None:
+            await scheduler.bucket.acquire_async()
+        if action == "refresh":
+            await client.refresh_app(app_name)
+        elif action == "sync":
+            await client.sync_app(app_name)
+    finally:
+        if scheduler is not None:
+            scheduler.complete(app_name, action)
+
+
+async def process_application_async(app, client, evaluate, scheduler=None):
+    """Versión asíncrona de process_application: misma decisión, llamadas a ArgoCD sin bloquear hilos.
+
+    Devuelve False si la aplicación se omitió (excluida) y True en otro caso.
+    """
+    app_name = app.get("metadata", {}).get("name", "Desconocido")
+    try:
+        app_name, health_status, actions = evaluate(app)
+        if health_status is None:
+            return False
+        for action in actions:
+            if action == "sync" and operation_in_progress(app):
+                log.info("⏭️ '%s' ya tiene una operación en curso: se omite el sync.", app_name, extra={"app": app_name})
+            elif action in ("refresh", "sync"):
+                await run_action(client, app_name, action, scheduler)
+            elif action == "notify":
+                notify_unhealthy(app_name, health_status)
+
+    except Exception as e:
+        log.error("❌ Error al procesar la aplicación '%s': %s", app_name, e, extra={"app": app_name})
+    return True
+
+
+async def run_cycle_async(apps, client, evaluate, concurrency=DEFAULT_CONCURRENCY, deadline=DEFAULT_CYCLE_DEADLINE, scheduler=None, limiter=None, carry_over=()):
+    """Procesa las aplicaciones con concurrencia acotada; cancela lo pendiente al vencer el plazo del ciclo.
+
+    La concurrencia es fija (`concurrency`) o, con un `limiter` (concurrency.AsyncAdaptiveLimiter),
+    adaptativa. Con un `scheduler`, las aplicaciones arrastradas del ciclo anterior (`carry_over`)
+    y después las más graves se procesan primero, y refresh/sync respetan su límite de tasa,
+    intentos y backoff.
+    Devuelve un resumen con el número de aplicaciones completadas, omitidas y fuera de plazo,
+    y en `carry_over` los nombres de estas últimas.
+    """
+    gate = limiter if limiter is not None else asyncio.Semaphore(concurrency)
+    if scheduler is not None:
+        apps = scheduler.order(apps, carry_over)
+
+    submitted = time.monotonic()
+
+    async def bounded(app):
+        async with gate:
+            observe_queue_wait("applications", time.monotonic() - submitted)
+            return await process_application_async(app, client, evaluate, scheduler)
+
+    tasks = {asyncio.ensure_future(bounded(app)): app.get("metadata", {}).get("name") for app in apps}
+    if not tasks:
+        return {"completed": 0, "skipped": 0, "timed_out": 0, "carry_over": []}
+
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+        log.warning("⏰ Plazo del ciclo agotado (%ss): %s aplicaciones canceladas.", deadline, len(pending))
+
+    processed = sum(1 for task in done if task.result())
+    return {
+        "completed": processed,
+        "skipped": len(done) - processed,
+        "timed_out": len(pending),
+        "carry_over": [name for task, name in tasks.items() if task in pending],
+    }
+
+
+async def run_async_cycle(evaluate, config, select=None, scheduler=None, projects=None, limiter=None, carry_over=()):
+    """Ejecuta un ciclo completo (listar + procesar) con el cliente asíncrono.
+
+    `select` permite filtrar la lista de aplicaciones antes de procesarla (modo incremental, sharding)
+    y `projects` limita la consulta a ArgoCD a esos proyectos. El plazo del ciclo (cycle_deadline)
+    incluye el listado.
+    """
+    started = time.monotonic()
+    deadline = config.get("cycle_deadline", DEFAULT_CYCLE_DEADLINE)
+    async with AsyncArgoCDClient.from_config(config) as client:
+        apps = await client.get_applications(projects=projects)
+        if not apps:
+            return None
+        if select is not None:
+            apps = select(apps)
+        summary = await run_cycle_async(
+            apps,
+            client,
+            evaluate,
+            concurrency=config.get("async_concurrency", DEFAULT_CONCURRENCY),
+            deadline=max(0, deadline - (time.monotonic() - started)),
+            scheduler=scheduler,
+            limiter=limiter,
+            carry_over=carry_over,
+        )
+    summary["duration"] = time.monotonic() - started
+    return summary
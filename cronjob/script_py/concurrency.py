@@ -0,0 +1,155 @@
+import threading
+from script_py.logger import get_logger
+from script_py.metrics import CONCURRENCY_LIMIT, add_request_listener
+
+log = get_logger("concurrency")
+
+# Solo las llamadas por aplicación reflejan la carga que el monitor impone a ArgoCD
+# (el listado de /applications, "applications" o "statuses", es lento por tamaño, no por saturación)
+CONTROLLED_ENDPOINTS = ("refresh", "sync", "status")
+
+
+def is_error(status):
+    """Errores que indican saturación de ArgoCD: sin respuesta, 429 o 5xx."""
+    return status == "error" or (isinstance(status, int) and (status == 429 or status >= 500))
+
+
+class AIMDController:
+    """Límite de concurrencia adaptativo (AIMD) según la latencia y los errores observados.
+
+    Cada `window` llamadas se evalúa la ventana: si el percentil 90 de la latencia supera
+    `target_latency` o la tasa de errores supera `max_error_rate`, el límite se multiplica
+    por `decrease`; si no, crece en `increase`. Siempre queda entre `min_limit` y `max_limit`.
+    """
+
+    def __init__(self, initial=5, min_limit=1, max_limit=20, target_latency=1.0, max_error_rate=0.05, increase=1, decrease=0.5, window=20):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self._limit = min(max(initial, self.min_limit), self.max_limit)
+        self._latencies = []
+        self._errors = 0
+        self._lock = threading.Lock()
+        self._listeners = []
+        CONCURRENCY_LIMIT.set(self._limit)
+
+    @classmethod
+    def from_config(cls, config, initial):
+        return cls(
+            initial=initial,
+            min_limit=config.get("concurrency_min", 1),
+            max_limit=max(initial, config.get("concurrency_max", 20)),
+            target_latency=config.get("concurrency_target_latency", 1.0),
+            max_error_rate=config.get("concurrency_max_error_rate", 0.05),
+            window=config.get("concurrency_window", 20),
+        )
+
+    @property
+    def limit(self):
+        return self._limit
+
+    def subscribe(self, listener):
+        """`listener()` se llama cada vez que cambia el límite."""
+        self._listeners.append(listener)
+
+    def record(self, latency, error=False):
+        with self._lock:
+            self._latencies.append(latency)
+            self._errors += bool(error)
+            if len(self._latencies) < self.window:
+                return
+            latencies = sorted(self._latencies)
+            p90 = latencies[int(0.9 * (len(latencies) - 1))]
+            error_rate = self._errors / len(latencies)
+            self._latencies = []
+            self._errors = 0
+            previous = self._limit
+            if error_rate > self.max_error_rate or p90 > self.target_latency:
+                self._limit = max(self.min_limit, int(self._limit * self.decrease))
+            else:
+                self._limit = min(self.max_limit, self._limit + self.increase)
+            limit = self._limit
+        if limit != previous:
+            CONCURRENCY_LIMIT.set(limit)
+            log.debug("🎚️ Concurrencia %s -> %s (p90 %.2fs, errores %.0f%%).", previous, limit, p90, error_rate * 100)
+            for listener in self._listeners:
+                listener()
+
+    def on_request(self, endpoint, status, seconds):
+        if endpoint in CONTROLLED_ENDPOINTS:
+            self.record(seconds, is_error(status))
+
+    def observe_requests(self):
+        """Alimenta el controlador con todas las llamadas a ArgoCD registradas por metrics.RequestTimer."""
+        add_request_listener(self.on_request)
+        return self
+
+
+class AdaptiveLimiter:
+    """Semáforo para hilos cuyo número de permisos sigue el límite de un AIMDController."""
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.active = 0
+        self._condition = threading.Condition()
+        controller.subscribe(self._wake)
+
+    def _wake(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    def __enter__(self):
+        with self._condition:
+            while self.active >= self.controller.limit:
+                self._condition.wait()
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+
+class AsyncAdaptiveLimiter:
+    """Equivalente de AdaptiveLimiter para corrutinas (un solo bucle de eventos)."""
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.active = 0
+        self._waiters = []
+
+    def _wake(self):
+        while self._waiters and self.active < self.controller.limit:
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result(None)
+                self.active += 1
+
+    async def __aenter__(self):
+        import asyncio
+
+        if self.active < self.controller.limit and not self._waiters:
+            self.active += 1
+            return self
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # El permiso llegó a la vez que la cancelación: devolverlo
+                self.active -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.active -= 1
+        self._wake()
@@ -1,36 +1,232 @@
+import json
 import os
-import yaml
-from dotenv import load_dotenv
+import sys
+import threading
 
-# Cargar las variables desde el archivo .env
-load_dotenv()
+# Ruta por defecto de config.yaml dentro del contenedor (CONFIG_FILE la sustituye)
+DEFAULT_CONFIG_FILE = "/app/config.yaml"
+# Prefijo de las variables de entorno que sustituyen claves de primer nivel de config.yaml
+# (p. ej. ARGOCD_MONITOR_ENGINE=async o ARGOCD_MONITOR_MAX_WORKERS=20)
+ENV_PREFIX = "ARGOCD_MONITOR_"
+CACHE_VERSION = 1
 
-class Config:
-    CONFIG_FILE = "/app/config.yaml"  # Actualiza la ruta al archivo config.yaml
+_env_lock = threading.Lock()
+_env_loaded = False
 
-    try:
-        ARGOCD_API = os.getenv("ARGOCD_API", "https://localhost:8080/api/v1")
-        ARGOCD_TOKEN = os.getenv("ARGOCD_TOKEN")
-        SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
-
-        @staticmethod
-        def validate():
-            missing_vars = []
-            if not Config.ARGOCD_API:
-                missing_vars.append("ARGOCD_API")
-            if not Config.ARGOCD_TOKEN:
-                missing_vars.append("ARGOCD_TOKEN")
-            if not Config.SLACK_WEBHOOK_URL:
-                missing_vars.append("SLACK_WEBHOOK_URL")
-            if missing_vars:
-                raise ValueError(f"❌ Faltan variables de entorno requeridas: {', '.join(missing_vars)}")
-    except Exception as e:
-        print(f"❌ Error al cargar la configuración: {e}")
-        raise
+
+def find_env_file(start=None):
+    """Busca .env desde el directorio de este módulo hacia arriba, como load_dotenv() sin argumentos."""
+    directory = os.path.abspath(start or os.path.dirname(__file__))
+    while True:
+        candidate = os.path.join(directory, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def load_env():
+    """Carga el archivo .env una sola vez; python-dotenv solo se importa si existe (en el pod no hay)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if not _env_loaded:
+            path = find_env_file()
+            if path is not None:
+                from dotenv import load_dotenv
+
+                # Cargar las variables desde el archivo .env
+                load_dotenv(path)
+            _env_loaded = True
+
+
+class _ConfigMeta(type):
+    """Resuelve las variables de entorno de Config en el primer acceso, no al importar el módulo."""
+
+    _ENV = {
+        "CONFIG_FILE": ("CONFIG_FILE", DEFAULT_CONFIG_FILE),
+        "CONFIG_CACHE": ("CONFIG_CACHE", None),
+        "ARGOCD_API": ("ARGOCD_API", "https://localhost:8080/api/v1"),
+        "ARGOCD_TOKEN": ("ARGOCD_TOKEN", None),
+        "SLACK_WEBHOOK_URL": ("SLACK_WEBHOOK_URL", None),
+    }
+
+    def __getattr__(cls, name):
+        if name not in cls._ENV:
+            raise AttributeError(name)
+        load_env()
+        variable, default = cls._ENV[name]
+        value = os.getenv(variable, default)
+        # A partir de aquí es un atributo normal: asignarlo (p. ej. en pruebas) lo sustituye
+        setattr(cls, name, value)
+        return value
+
+
+class Config(metaclass=_ConfigMeta):
+    """Variables de entorno del monitor (ARGOCD_API, ARGOCD_TOKEN, SLACK_WEBHOOK_URL, CONFIG_FILE...)."""
+
+    @staticmethod
+    def validate():
+        missing_vars = []
+        if not Config.ARGOCD_API:
+            missing_vars.append("ARGOCD_API")
+        if not Config.ARGOCD_TOKEN:
+            missing_vars.append("ARGOCD_TOKEN")
+        if not Config.SLACK_WEBHOOK_URL:
+            missing_vars.append("SLACK_WEBHOOK_URL")
+        if missing_vars:
+            raise ValueError(f"❌ Faltan variables de entorno requeridas: {', '.join(missing_vars)}")
 
     @staticmethod
-    def load():
-        with open(Config.CONFIG_FILE, "r") as file:
-            return yaml.safe_load(file)
+    def load(path=None, cache=None):
+        """Lee config.yaml (o su caché precompilada si está al día) y aplica las sustituciones del entorno."""
+        path = path or Config.CONFIG_FILE
+        cache = cache if cache is not None else Config.CONFIG_CACHE
+        config = read_cache(cache, path) if cache else None
+        if config is None:
+            config = parse_yaml(path)
+            if cache:
+                write_cache(cache, path, config)
+        return apply_env_overrides(config or {})
+
+
+def parse_yaml(path):
+    import yaml
+
+    with open(path, "r") as file:
+        return yaml.safe_load(file)
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def read_cache(cache, path):
+    """Devuelve la configuración guardada en `cache` si corresponde a la versión actual de `path`."""
+    try:
+        with open(cache, "r") as file:
+            entry = json.load(file)
+        if entry.get("version") == CACHE_VERSION and entry.get("source") == os.path.abspath(path) and entry.get("stamp") == _source_stamp(path):
+            return entry["config"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def write_cache(cache, path, config):
+    """Guarda la configuración ya parseada en JSON (cargarla no necesita importar yaml)."""
+    entry = {"version": CACHE_VERSION, "source": os.path.abspath(path), "stamp": _source_stamp(path), "config": config}
+    try:
+        temporary = f"{cache}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(entry, file)
+        os.replace(temporary, cache)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"⚠️ No se pudo guardar la caché de configuración {cache}: {e}", file=sys.stderr)
+
+
+def apply_env_overrides(config, environ=None):
+    """Sustituye claves de primer nivel con ARGOCD_MONITOR_<CLAVE> (valor interpretado como YAML)."""
+    environ = os.environ if environ is None else environ
+    overrides = {key[len(ENV_PREFIX):].lower(): value for key, value in environ.items() if key.startswith(ENV_PREFIX)}
+    if not overrides:
+        return config
+    import yaml
+
+    config = dict(config)
+    for key, value in overrides.items():
+        config[key] = yaml.safe_load(value)
+    return config
+
+
+class LazyConfig:
+    """Configuración de config.yaml que se carga una sola vez, en el primer acceso.
+
+    Se comporta como un diccionario (get, [], in, update...), de modo que importar los
+    módulos del monitor no lee ni parsea nada.
+    """
+
+    def __init__(self, loader=Config.load):
+        self._loader = loader
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._loader()
+                data = self._data
+        return data
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def reload(self):
+        with self._lock:
+            self._data = None
+        return self._load()
+
+    def get(self, key, default=None):
+        return self._load().get(key, default)
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+
+    def __delitem__(self, key):
+        del self._load()[key]
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def keys(self):
+        return self._load().keys()
+
+    def items(self):
+        return self._load().items()
+
+    def update(self, *args, **kwargs):
+        self._load().update(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazyConfig({self._data!r})" if self.loaded else "LazyConfig(<sin cargar>)"
+
+
+CONFIG = LazyConfig()
+
+
+def main(argv=None):
+    """python -m script_py.config --compile [CACHE]: precompila config.yaml (p. ej. al construir la imagen)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompila config.yaml en una caché JSON")
+    parser.add_argument("--compile", metavar="CACHE", nargs="?", const="", default=None, help="Ruta de la caché (por defecto CONFIG_CACHE)")
+    args = parser.parse_args(argv)
+    if args.compile is None:
+        parser.print_help()
+        return 1
+    cache = args.compile or Config.CONFIG_CACHE
+    if not cache:
+        parser.error("indique la ruta de la caché o defina CONFIG_CACHE")
+    write_cache(cache, Config.CONFIG_FILE, parse_yaml(Config.CONFIG_FILE))
+    print(f"✅ Configuración {Config.CONFIG_FILE} precompilada en {cache}")
+    return 0
+
 
-CONFIG = Config.load()
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from script_py.config import CONFIG
+from script_py.history import get_history
+from script_py.logger import get_logger
+from script_py.slack_notifier import get_dispatcher
+
+log = get_logger("diagnosis")
+
+DEFAULT_ACTION = "La aplicación requiere atención."
+# Estados de un recurso que se consideran fallos (Progressing y Suspended son transitorios o deliberados)
+FAILED_HEALTH = ("Degraded", "Missing", "Unknown")
+SEVERITY = {"Degraded": 0, "Missing": 1, "Unknown": 2}
+# Recursos no sanos que se conservan como máximo al recorrer un árbol (el resto solo se cuenta)
+MAX_TRACKED_NODES = 1000
+MAX_MESSAGE = 200
+
+
+def _resource_id(node):
+    return f"{node.get('kind')}/{node.get('namespace') or '-'}/{node.get('name')}"
+
+
+def unhealthy_leaves(nodes, limit=5):
+    """Recursos no sanos sin hijos no sanos: el origen del fallo, no sus dueños.
+
+    Recorre los nodos una sola vez y descarta los sanos al momento, de modo que de un
+    árbol de miles de recursos solo quedan en memoria los que fallan. Devuelve
+    (hojas, total de recursos no sanos), con las hojas más graves primero.
+    """
+    failed = {}
+    parents = set()
+    total = 0
+    for node in nodes:
+        health = node.get("health") or {}
+        if health.get("status") not in FAILED_HEALTH:
+            continue
+        total += 1
+        for ref in node.get("parentRefs") or ():
+            parents.add(ref.get("uid") or _resource_id(ref))
+        if len(failed) < MAX_TRACKED_NODES:
+            failed[node.get("uid") or _resource_id(node)] = {
+                "group": node.get("group") or "",
+                "kind": node.get("kind"),
+                "namespace": node.get("namespace"),
+                "name": node.get("name"),
+                "health": health.get("status"),
+                "message": (health.get("message") or "")[:MAX_MESSAGE],
+            }
+    leaves = [resource for uid, resource in failed.items() if uid not in parents]
+    leaves.sort(key=lambda resource: SEVERITY.get(resource["health"], len(SEVERITY)))
+    return leaves[:limit], total
+
+
+def live_state_summary(managed_resource):
+    """(difiere de Git, primer mensaje de una condición fallida) de un recurso de managed-resources."""
+    modified = bool(managed_resource.get("modified"))
+    try:
+        live = json.loads(managed_resource.get("liveState") or "null") or {}
+    except ValueError:
+        return modified, ""
+    for condition in (live.get("status") or {}).get("conditions") or ():
+        if condition.get("status") == "False" and condition.get("message"):
+            return modified, condition["message"][:MAX_MESSAGE]
+    return modified, ""
+
+
+def format_summary(leaves, total, truncated=False):
+    lines = []
+    for resource in leaves:
+        location = f"{resource['namespace']}/{resource['name']}" if resource["namespace"] else resource["name"]
+        line = f"• `{resource['kind']} {location}`: {resource['health']}"
+        message = resource["message"] or resource.get("condition")
+        if message:
+            line += f" — {message}"
+        if resource.get("modified"):
+            line += " (difiere de Git)"
+        lines.append(line)
+    if total > len(leaves):
+        lines.append(f"➕ {total} recursos no sanos en total.")
+    if truncated:
+        lines.append("✂️ Diagnóstico incompleto (límite de bytes o de tiempo del ciclo).")
+    return "\n".join(lines)
+
+
+class Budget:
+    """Presupuesto de bytes y tiempo del diagnóstico, compartido por todos los hilos de un ciclo."""
+
+    def __init__(self, max_bytes, seconds, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.deadline = clock() + seconds
+        self.clock = clock
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def consume(self, size):
+        with self._lock:
+            self.used += size
+            return self.used <= self.max_bytes
+
+    @property
+    def remaining_time(self):
+        return self.deadline - self.clock()
+
+    @property
+    def exhausted(self):
+        return self.used >= self.max_bytes or self.remaining_time <= 0
+
+
+class Diagnoser:
+    """Diagnóstico de las aplicaciones no sanas antes de avisar a Slack.
+
+    Por cada aplicación se recorre su resource-tree en streaming, se eligen las hojas no sanas
+    y se consultan sus managed-resources; el resumen se adjunta a la alerta. Se ejecuta en un
+    pool de `workers` hilos y cada ciclo tiene un presupuesto de bytes y de tiempo: agotado,
+    las alertas se envían sin diagnóstico.
+    """
+
+    def __init__(self, client, dispatcher=None, workers=4, max_resources=5, max_bytes=50 * 1024 * 1024, time_budget=60, clock=time.monotonic):
+        self.client = client
+        self.dispatcher = dispatcher
+        self.workers = workers
+        self.max_resources = max_resources
+        self.max_bytes = max_bytes
+        self.time_budget = time_budget
+        self.clock = clock
+        self.budget = Budget(max_bytes, time_budget, clock)
+        self._executor = None
+        # Diagnósticos en curso: cada uno se retira al terminar (en modo stream nadie llama a finish())
+        self._futures = set()
+        self._lock = threading.Lock()
+        self.stats = {"diagnosed": 0, "skipped": 0, "truncated": 0, "errors": 0}
+
+    @classmethod
+    def from_config(cls, client, config=None):
+        config = CONFIG if config is None else config
+        return cls(
+            client,
+            workers=config.get("diagnosis_workers", 4),
+            max_resources=config.get("diagnosis_max_resources", 5),
+            max_bytes=config.get("diagnosis_byte_budget", 50 * 1024 * 1024),
+            time_budget=config.get("diagnosis_time_budget", 60),
+        )
+
+    def _dispatcher(self):
+        return self.dispatcher if self.dispatcher is not None else get_dispatcher()
+
+    def start_cycle(self):
+        """Renueva el presupuesto de bytes y tiempo."""
+        self.budget = Budget(self.max_bytes, self.time_budget, self.clock)
+
+    def submit(self, app_name, health_status, action=DEFAULT_ACTION, attempts=0, level=0):
+        """Diagnostica la aplicación en segundo plano y después envía la alerta. False si no hay presupuesto."""
+        budget = self.budget
+        if budget.exhausted:
+            self.stats["skipped"] += 1
+            return False
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="diagnosis")
+            future = self._executor.submit(self._run, app_name, health_status, action, budget, attempts, level)
+            self._futures.add(future)
+        # Fuera del lock: si ya terminó, el callback se ejecuta aquí mismo
+        future.add_done_callback(self._discard)
+        return True
+
+    def _discard(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _run(self, app_name, health_status, action, budget, attempts=0, level=0):
+        details = None
+        try:
+            if budget.exhausted:
+                self.stats["skipped"] += 1
+            else:
+                details = self.diagnose(app_name, budget)
+        except Exception as e:
+            self.stats["errors"] += 1
+            log.warning("⚠️ No se pudo diagnosticar '%s': %s", app_name, e, extra={"app": app_name})
+        self._dispatcher().notify(app_name, health_status, attempts, action, details=details, level=level)
+
+    def diagnose(self, app_name, budget=None):
+        """Resumen en texto de los recursos que fallan en una aplicación."""
+        budget = budget or self.budget
+        truncated = []
+
+        def on_chunk(size):
+            if budget.consume(size) and budget.remaining_time > 0:
+                return True
+            truncated.append(True)
+            return False
+
+        timeout = max(1, min(self.client.timeouts["resource_tree"], budget.remaining_time))
+        leaves, total = unhealthy_leaves(self.client.iter_resource_tree(app_name, timeout=timeout, on_chunk=on_chunk), self.max_resources)
+        for resource in leaves:
+            if budget.exhausted:
+                truncated.append(True)
+                break
+            managed = self.client.get_managed_resources(
+                app_name, kind=resource["kind"], name=resource["name"], namespace=resource["namespace"], group=resource["group"],
+                timeout=max(1, min(self.client.timeouts["managed_resources"], budget.remaining_time)),
+            )
+            if managed:
+                resource["modified"], resource["condition"] = live_state_summary(managed[0])
+        if truncated:
+            self.stats["truncated"] += 1
+        self.stats["diagnosed"] += 1
+        if not leaves:
+            return "No se encontraron recursos con fallos." + ("\n✂️ Diagnóstico incompleto (límite de bytes o de tiempo del ciclo)." if truncated else "")
+        return format_summary(leaves, total, truncated=bool(truncated))
+
+    def finish(self, timeout=None):
+        """Espera a los diagnósticos en curso (como mucho `timeout` segundos). Devuelve los que quedan."""
+        with self._lock:
+            futures, self._futures = self._futures, set()
+        deadline = None if timeout is None else self.clock() + timeout
+        pending = 0
+        for future in futures:
+            remaining = None if deadline is None else max(0, deadline - self.clock())
+            try:
+                future.result(remaining)
+            except Exception:
+                pending += 1
+        return pending
+
+
+# Diagnóstico configurado para el proceso (None = alertas sin diagnóstico)
+_diagnoser = None
+
+
+def set_diagnoser(diagnoser):
+    global _diagnoser
+    _diagnoser = diagnoser
+
+
+def get_diagnoser():
+    return _diagnoser
+
+
+def notify_unhealthy(app_name, health_status, action=DEFAULT_ACTION):
+    """Envía la alerta de una aplicación no sana, diagnosticada si está activado y la alerta es nueva.
+
+    Con historial, `attempts` son los ciclos seguidos en Degraded/Error y el nivel de escalada
+    sube con cada umbral de history_escalation_cycles superado. El despachador descarta la
+    alerta si coincide con la última entregada (estado y nivel), guardada en el AppStateStore.
+    """
+    dispatcher = get_dispatcher()
+    history = get_history()
+    attempts, level = 0, 0
+    if history is not None:
+        attempts = history.unhealthy_cycles(app_name)
+        level = history.escalation_level(attempts)
+    if level:
+        action = f"{action} Escalada: lleva {attempts} ciclos en estado {health_status}."
+    diagnoser = _diagnoser
+    if diagnoser is not None and dispatcher.would_notify(app_name, health_status, level) and diagnoser.submit(app_name, health_status, action, attempts, level):
+        return
+    dispatcher.notify(app_name, health_status, attempts, action, level=level)
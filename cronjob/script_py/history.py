@@ -0,0 +1,343 @@
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from script_py.config import CONFIG
+from script_py.logger import get_logger
+from script_py.state import HealthStatus, SyncStatus
+
+log = get_logger("history")
+
+# Cabecera de cada bloque del fichero: magia, ciclo al escribirlo, nombres nuevos y filas
+MAGIC = b"AMH1"
+_HEADER = struct.Struct("<4sIII")
+_NAME_LENGTH = struct.Struct("<H")
+# Columnas persistidas (nombre, tipo de array); los arrays se guardan en el orden de bytes de la máquina
+_COLUMNS = (("times", "d"), ("cycles", "I"), ("apps", "I"), ("health", "B"), ("sync", "B"))
+# Estados que cuentan para la escalada de alertas (los mismos que notifica la regla por defecto)
+ESCALATION_HEALTH = frozenset((HealthStatus.DEGRADED, HealthStatus.ERROR))
+DEFAULT_RETENTION = 35 * 24 * 3600
+DEFAULT_COMPACT_CHUNKS = 64
+DEFAULT_ESCALATION_CYCLES = (3, 12, 48)
+
+
+class HealthHistory:
+    """Historial de transiciones de estado de las aplicaciones, en columnas de arrays.
+
+    Solo se añade una fila cuando cambia la salud o la sincronización de una aplicación
+    (o la primera vez que se ve): instante, ciclo, aplicación, salud y sincronización en
+    arrays compactos (unos 14 bytes por fila). `prev` enlaza cada fila con la anterior de la
+    misma aplicación, de modo que las consultas por aplicación recorren solo sus transiciones
+    y las de toda la flota buscan el inicio de la ventana con bisect (el tiempo solo crece).
+
+    Con `path`, flush() añade al fichero un bloque con las filas nuevas (nunca reescribe lo
+    anterior) y cada `compact_chunks` bloques se compacta: se descartan las filas más antiguas
+    que `retention` (salvo la última de cada aplicación, su estado actual) y se reescribe el
+    fichero en un único bloque.
+    """
+
+    def __init__(self, path=None, retention=DEFAULT_RETENTION, compact_chunks=DEFAULT_COMPACT_CHUNKS, escalation_cycles=DEFAULT_ESCALATION_CYCLES, clock=time.time):
+        self.path = path
+        self.retention = retention
+        self.compact_chunks = compact_chunks
+        self.escalation_cycles = tuple(sorted(escalation_cycles))
+        self.clock = clock
+        self.cycle = 0
+        self.names = []
+        self._ids = {}
+        self._last = array("i")
+        self.prev = array("i")
+        for column, typecode in _COLUMNS:
+            setattr(self, column, array(typecode))
+        self._lock = threading.Lock()
+        self._flushed_rows = 0
+        self._flushed_names = 0
+        self._flushed_cycle = 0
+        self._chunks = 0
+        if path is not None:
+            self._load()
+
+    @classmethod
+    def from_config(cls, config=None, shard=0):
+        """Historial configurado en config.yaml; `history_path` puede incluir "{shard}" (vacío = solo en memoria)."""
+        config = CONFIG if config is None else config
+        path = config.get("history_path")
+        return cls(
+            path=path.format(shard=shard) if path else None,
+            retention=config.get("history_retention_days", DEFAULT_RETENTION // (24 * 3600)) * 24 * 3600,
+            compact_chunks=config.get("history_compact_chunks", DEFAULT_COMPACT_CHUNKS),
+            escalation_cycles=config.get("history_escalation_cycles", DEFAULT_ESCALATION_CYCLES),
+        )
+
+    def __len__(self):
+        return len(self.times)
+
+    # Escritura
+
+    def start_cycle(self):
+        """Marca el comienzo de un ciclo (en modo stream, de un intervalo de guardado)."""
+        with self._lock:
+            self.cycle += 1
+            return self.cycle
+
+    def _app_id(self, name):
+        # Se llama con el lock tomado
+        app_id = self._ids.get(name)
+        if app_id is None:
+            app_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+            self._last.append(-1)
+        return app_id
+
+    def _append(self, app_id, now, cycle, health, sync):
+        # Se llama con el lock tomado
+        self.times.append(now)
+        self.cycles.append(cycle)
+        self.apps.append(app_id)
+        self.health.append(health)
+        self.sync.append(sync)
+        self.prev.append(self._last[app_id])
+        self._last[app_id] = len(self.times) - 1
+
+    def record(self, name, health, sync):
+        """Registra el estado observado de una aplicación. Devuelve True si fue una transición."""
+        health = HealthStatus.parse(health)
+        sync = SyncStatus.parse(sync)
+        with self._lock:
+            app_id = self._app_id(name)
+            last = self._last[app_id]
+            if last >= 0 and self.health[last] == health and self.sync[last] == sync:
+                return False
+            # El tiempo de las filas no decrece aunque el reloj retroceda (bisect depende de ello)
+            now = max(self.clock(), self.times[-1]) if self.times else self.clock()
+            self._append(app_id, now, self.cycle, health, sync)
+            return True
+
+    # Consultas
+
+    def _row(self, name):
+        app_id = self._ids.get(name)
+        return self._last[app_id] if app_id is not None else -1
+
+    def transitions(self, name):
+        """Transiciones de una aplicación, de la más antigua a la más reciente: (instante, salud, sincronización)."""
+        with self._lock:
+            rows = []
+            row = self._row(name)
+            while row >= 0:
+                rows.append((self.times[row], HealthStatus(self.health[row]).label, SyncStatus(self.sync[row]).label))
+                row = self.prev[row]
+        rows.reverse()
+        return rows
+
+    def unhealthy_cycles(self, name):
+        """Ciclos seguidos, incluido el actual, que la aplicación lleva Degraded/Error (0 si no lo está)."""
+        with self._lock:
+            row = self._row(name)
+            start = None
+            while row >= 0 and self.health[row] in ESCALATION_HEALTH:
+                start = self.cycles[row]
+                row = self.prev[row]
+            return 0 if start is None else self.cycle - start + 1
+
+    def escalation_level(self, cycles):
+        """Umbrales de history_escalation_cycles superados: 0 = alerta normal, 1, 2... = escalada."""
+        return bisect_right(self.escalation_cycles, cycles)
+
+    def flapping(self, window, min_changes=4, now=None):
+        """Aplicaciones con al menos `min_changes` cambios de salud en los últimos `window` segundos: {nombre: cambios}."""
+        now = self.clock() if now is None else now
+        changes = {}
+        with self._lock:
+            health, prev, apps = self.health, self.prev, self.apps
+            for row in range(bisect_left(self.times, now - window), len(self.times)):
+                before = prev[row]
+                if before >= 0 and health[before] != health[row]:
+                    app_id = apps[row]
+                    changes[app_id] = changes.get(app_id, 0) + 1
+            return {self.names[app_id]: count for app_id, count in changes.items() if count >= min_changes}
+
+    def recoveries(self, window, now=None, name=None):
+        """Duración (segundos) de cada incidente que terminó en los últimos `window` segundos.
+
+        Un incidente empieza al dejar de estar Healthy y termina al volver a Healthy; solo
+        cuentan los que pasaron por Degraded/Error (no un Progressing de un despliegue).
+        """
+        now = self.clock() if now is None else now
+        healthy = HealthStatus.HEALTHY
+        durations = []
+        with self._lock:
+            times, health, prev = self.times, self.health, self.prev
+            if name is not None:
+                rows, row = [], self._row(name)
+                while row >= 0 and times[row] >= now - window:
+                    rows.append(row)
+                    row = prev[row]
+            else:
+                rows = range(bisect_left(times, now - window), len(times))
+            for row in rows:
+                before = prev[row]
+                if health[row] != healthy or before < 0 or health[before] == healthy:
+                    continue
+                failed = False
+                start = before
+                while before >= 0 and health[before] != healthy:
+                    failed = failed or health[before] in ESCALATION_HEALTH
+                    start = before
+                    before = prev[before]
+                if failed:
+                    durations.append(times[row] - times[start])
+        return durations
+
+    def mean_time_to_recovery(self, window, now=None, name=None):
+        """MTTR (segundos) de los incidentes resueltos en la ventana; None si no hubo ninguno."""
+        durations = self.recoveries(window, now=now, name=name)
+        return sum(durations) / len(durations) if durations else None
+
+    # Persistencia
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return
+        offset = 0
+        while offset < len(data):
+            end = self._read_chunk(data, offset)
+            if end is None:
+                # Bloque incompleto (p. ej. el proceso murió escribiéndolo): se descarta
+                log.warning("⚠️ Historial %s truncado en el byte %s: se descartan %s bytes.", self.path, offset, len(data) - offset)
+                with open(self.path, "r+b") as file:
+                    file.truncate(offset)
+                break
+            offset = end
+            self._chunks += 1
+        self._flushed_rows = len(self.times)
+        self._flushed_names = len(self.names)
+        self._flushed_cycle = self.cycle
+        log.debug("📚 Historial cargado: %s transiciones de %s aplicaciones en %s bloques.", len(self.times), len(self.names), self._chunks)
+
+    def _read_chunk(self, data, offset):
+        """Añade a memoria el bloque que empieza en `offset`. Devuelve dónde termina, o None si está incompleto."""
+        if offset + _HEADER.size > len(data):
+            return None
+        magic, cycle, name_count, row_count = _HEADER.unpack_from(data, offset)
+        if magic != MAGIC:
+            return None
+        offset += _HEADER.size
+        names = []
+        for _ in range(name_count):
+            if offset + _NAME_LENGTH.size > len(data):
+                return None
+            (length,) = _NAME_LENGTH.unpack_from(data, offset)
+            offset += _NAME_LENGTH.size
+            names.append(data[offset:offset + length].decode())
+            offset += length
+        columns = []
+        for _, typecode in _COLUMNS:
+            column = array(typecode)
+            size = column.itemsize * row_count
+            if offset + size > len(data):
+                return None
+            column.frombytes(data[offset:offset + size])
+            columns.append(column)
+            offset += size
+        for name in names:
+            self._app_id(name)
+        first = len(self.times)
+        for (column, _), values in zip(_COLUMNS, columns):
+            getattr(self, column).extend(values)
+        last, prev = self._last, self.prev
+        for row, app_id in enumerate(columns[2], first):
+            prev.append(last[app_id])
+            last[app_id] = row
+        self.cycle = max(self.cycle, cycle)
+        return offset
+
+    def _chunk(self, names, rows, cycle):
+        parts = [_HEADER.pack(MAGIC, cycle, len(names), len(rows))]
+        for name in names:
+            encoded = name.encode()
+            parts.append(_NAME_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+        for column, _ in _COLUMNS:
+            parts.append(getattr(self, column)[rows.start:rows.stop].tobytes())
+        return b"".join(parts)
+
+    def flush(self):
+        """Añade al fichero las transiciones nuevas (y compacta si toca). Devuelve cuántas se escribieron."""
+        if self.path is None:
+            return 0
+        with self._lock:
+            rows = range(self._flushed_rows, len(self.times))
+            if not rows and self.cycle == self._flushed_cycle:
+                return 0
+            chunk = self._chunk(self.names[self._flushed_names:], rows, self.cycle)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "ab") as file:
+                file.write(chunk)
+            self._flushed_rows = len(self.times)
+            self._flushed_names = len(self.names)
+            self._flushed_cycle = self.cycle
+            self._chunks += 1
+            compact = self._chunks >= self.compact_chunks
+        if compact:
+            self.compact()
+        return len(rows)
+
+    def compact(self, now=None):
+        """Descarta las transiciones fuera de la retención y reescribe el fichero en un solo bloque.
+
+        Devuelve cuántas filas se descartaron. La última fila de cada aplicación se conserva.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            cutoff = now - self.retention
+            keep = [row for row in range(len(self.times)) if self.times[row] >= cutoff or self._last[self.apps[row]] == row]
+            dropped = len(self.times) - len(keep)
+            if dropped:
+                self._rebuild(keep)
+            if self.path is not None:
+                temporary = f"{self.path}.tmp"
+                with open(temporary, "wb") as file:
+                    file.write(self._chunk(self.names, range(0, len(self.times)), self.cycle))
+                os.replace(temporary, self.path)
+                self._flushed_rows = len(self.times)
+                self._flushed_names = len(self.names)
+                self._flushed_cycle = self.cycle
+                self._chunks = 1
+        if dropped:
+            log.info("🗜️ Historial compactado: %s transiciones descartadas, %s conservadas.", dropped, len(self.times))
+        return dropped
+
+    def _rebuild(self, keep):
+        # Se llama con el lock tomado: renumera aplicaciones y filas conservando solo `keep`
+        old = {column: getattr(self, column) for column, _ in _COLUMNS}
+        old_names = self.names
+        self.names = []
+        self._ids = {}
+        self._last = array("i")
+        self.prev = array("i")
+        for column, typecode in _COLUMNS:
+            setattr(self, column, array(typecode))
+        for row in keep:
+            app_id = self._app_id(old_names[old["apps"][row]])
+            self._append(app_id, old["times"][row], old["cycles"][row], old["health"][row], old["sync"][row])
+
+
+# Historial configurado para el proceso (None = sin historial ni escalada)
+_history = None
+
+
+def set_history(history):
+    global _history
+    _history = history
+
+
+def get_history():
+    return _history
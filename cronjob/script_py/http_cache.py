@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL = 30
+
+
+def cache_key(url, params=None):
+    """Clave de caché de un GET: la URL con los parámetros ordenados."""
+    if not params:
+        return url
+    items = params.items() if isinstance(params, dict) else params
+    return f"{url}?{urlencode(sorted(items), doseq=True)}"
+
+
+class CachedResponse:
+    """Respuesta servida desde la caché, con la interfaz de requests.Response que usa el cliente."""
+
+    __slots__ = ("url", "content", "headers", "status_code")
+
+    def __init__(self, url, content, etag=None):
+        self.url = url
+        self.content = content
+        self.headers = {"ETag": etag} if etag else {}
+        self.status_code = 200
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Entry:
+    __slots__ = ("content", "etag", "stored_at")
+
+    def __init__(self, content, etag, stored_at):
+        self.content = content
+        self.etag = etag
+        self.stored_at = stored_at
+
+
+class ResponseCache:
+    """Caché LRU acotada de respuestas GET con caducidad (TTL).
+
+    El tamaño está acotado en entradas (`max_entries`) y en bytes de contenido (`max_bytes`):
+    un documento mayor que `max_bytes` no se guarda. Una entrada dentro del TTL se sirve sin preguntar a ArgoCD; una caducada con ETag se
+    revalida con If-None-Match (304 = sin descargar el documento) y una sin ETag se vuelve a pedir.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def lookup(self, key):
+        """Devuelve (entrada, vigente): la entrada guardada (o None) y si sigue dentro del TTL."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(key)
+            return entry, self.clock() - entry.stored_at < self.ttl
+
+    def store(self, key, content, etag=None):
+        with self._lock:
+            self._discard(key)
+            if len(content) > self.max_bytes:
+                return
+            self._entries[key] = _Entry(content, etag, self.clock())
+            self._bytes += len(content)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.content)
+
+    def discard(self, key):
+        """Elimina una entrada que ya no refleja el estado de ArgoCD."""
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.content)
+
+    def touch(self, key):
+        """Renueva el TTL de una entrada revalidada (304)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = self.clock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes idénticas: solo la primera se ejecuta y las demás esperan su resultado."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """Devuelve (resultado, compartido); compartido es True si se reutilizó la llamada de otro hilo."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
@@ -0,0 +1,82 @@
+class ChangeTracker:
+    """Recuerda el resourceVersion y la huella de estado de cada aplicación entre ciclos.
+
+    En modo incremental solo las aplicaciones cuyo estado cambió desde el ciclo anterior
+    pasan por la lógica de decisión; el resto se omite y se contabiliza en `skipped`.
+    """
+
+    def __init__(self, state_store=None):
+        # Con un AppStateStore persistido, las aplicaciones sin cambios desde la ejecución
+        # anterior también se omiten en el primer ciclo
+        self.state_store = state_store
+        self.resource_versions = {}
+        self.fingerprints = {}
+        # Aplicaciones que el siguiente ciclo debe evaluar aunque su huella no cambie
+        self.forced = set()
+        self.skipped = 0
+        self.changed = 0
+
+    @staticmethod
+    def fingerprint(app):
+        """Huella del estado relevante para la decisión: salud, sincronización y revisión."""
+        status = app.get("status", {})
+        return (
+            status.get("health", {}).get("status"),
+            status.get("sync", {}).get("status"),
+            app.get("metadata", {}).get("annotations", {}).get("argocd.argoproj.io/revision", "unknown"),
+        )
+
+    def observe(self, app):
+        """Registra el estado de una aplicación y devuelve True si es nueva o cambió."""
+        metadata = app.get("metadata", {})
+        app_name = metadata.get("name")
+        if app_name in self.forced:
+            self.forced.discard(app_name)
+            self.resource_versions[app_name] = metadata.get("resourceVersion")
+            self.fingerprints[app_name] = self.fingerprint(app)
+            return True
+
+        # Atajo: si el resourceVersion no cambió, el objeto es idéntico
+        resource_version = metadata.get("resourceVersion")
+        if resource_version is not None and self.resource_versions.get(app_name) == resource_version:
+            return False
+        self.resource_versions[app_name] = resource_version
+
+        # El resourceVersion cambia también con reconciliaciones sin cambios de estado
+        fingerprint = self.fingerprint(app)
+        previous = self.fingerprints.get(app_name)
+        if previous is None and self.state_store is not None:
+            state = self.state_store.get(app_name)
+            if state is not None:
+                previous = (state.health.label, state.sync.label, state.revision)
+        if previous == fingerprint:
+            self.fingerprints[app_name] = fingerprint
+            return False
+        self.fingerprints[app_name] = fingerprint
+        return True
+
+    def forget(self, app_name):
+        """Olvida una aplicación eliminada de ArgoCD."""
+        self.fingerprints.pop(app_name, None)
+        self.resource_versions.pop(app_name, None)
+        self.forced.discard(app_name)
+
+    def force(self, app_name):
+        """Marca una aplicación para que el siguiente ciclo la evalúe aunque no haya cambiado.
+
+        No basta con forget(): observe() volvería a compararla con la huella del state_store.
+        """
+        self.forced.add(app_name)
+
+    def filter_changed(self, apps):
+        """Devuelve solo las aplicaciones nuevas o con cambios y actualiza el estado recordado."""
+        changed = [app for app in apps if self.observe(app)]
+
+        # Olvidar las aplicaciones que ya no existen en ArgoCD
+        seen = {app.get("metadata", {}).get("name") for app in apps}
+        for app_name in (set(self.fingerprints) | self.forced) - seen:
+            self.forget(app_name)
+
+        self.changed = len(changed)
+        self.skipped = len(apps) - len(changed)
+        return changed
@@ -0,0 +1,135 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+# Estados del analizador
+_START, _KEY, _COLON, _VALUE, _AFTER_VALUE, _ITEMS, _AFTER_ITEM, _DONE = range(8)
+
+
+class ItemStreamParser:
+    """Analizador JSON incremental para respuestas de lista de ArgoCD ({"metadata": ..., "items": [...]}).
+
+    Se le pasan fragmentos de la respuesta con `feed()` y devuelve los elementos de `items`
+    completos a medida que aparecen, sin construir nunca el documento entero en memoria.
+    El resto de claves de primer nivel se guarda en `extra` (con keep_extra=False se descartan).
+    """
+
+    def __init__(self, key="items", keep_extra=True):
+        self.key = key
+        self.keep_extra = keep_extra
+        self.extra = {}
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._current_key = None
+
+    def feed(self, chunk):
+        """Añade un fragmento (bytes o str) y devuelve la lista de elementos completados."""
+        if isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk)
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        items = []
+        while self._step(items):
+            pass
+        return items
+
+    def close(self):
+        """Verifica que el documento haya terminado correctamente."""
+        if self._state != _DONE:
+            raise ValueError("Respuesta JSON incompleta")
+
+    def _peek(self):
+        """Devuelve el siguiente carácter significativo o None si hacen falta más datos."""
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buf[pos] if pos < len(buf) else None
+
+    def _decode(self):
+        """Decodifica un valor JSON completo en la posición actual o devuelve (None, False)."""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            return None, False
+        # Un número al final del búfer podría continuar en el siguiente fragmento
+        if end == len(self._buf) and self._buf[self._pos] not in '{["':
+            return None, False
+        self._pos = end
+        return value, True
+
+    def _expect(self, char):
+        raise ValueError(f"JSON inesperado en la posición {self._pos}: se esperaba {char!r}")
+
+    def _step(self, items):
+        char = self._peek()
+        if char is None or self._state == _DONE:
+            return False
+
+        if self._state == _START:
+            if char != "{":
+                self._expect("{")
+            self._pos += 1
+            self._state = _KEY
+        elif self._state == _KEY:
+            if char == "}":
+                self._pos += 1
+                self._state = _DONE
+                return False
+            if char != '"':
+                self._expect('"')
+            key, complete = self._decode()
+            if not complete:
+                return False
+            self._current_key = key
+            self._state = _COLON
+        elif self._state == _COLON:
+            if char != ":":
+                self._expect(":")
+            self._pos += 1
+            self._state = _VALUE
+        elif self._state == _VALUE:
+            if self._current_key == self.key and char == "[":
+                self._pos += 1
+                self._state = _ITEMS
+                return True
+            value, complete = self._decode()
+            if not complete:
+                return False
+            if self.keep_extra:
+                self.extra[self._current_key] = value
+            self._state = _AFTER_VALUE
+        elif self._state == _AFTER_VALUE:
+            if char == ",":
+                self._pos += 1
+                self._state = _KEY
+            elif char == "}":
+                self._pos += 1
+                self._state = _DONE
+                return False
+            else:
+                self._expect(",")
+        elif self._state == _ITEMS:
+            if char == "]":
+                self._pos += 1
+                self._state = _AFTER_VALUE
+                return True
+            item, complete = self._decode()
+            if not complete:
+                return False
+            items.append(item)
+            self._state = _AFTER_ITEM
+        elif self._state == _AFTER_ITEM:
+            if char == ",":
+                self._pos += 1
+                self._state = _ITEMS
+            elif char == "]":
+                self._pos += 1
+                self._state = _AFTER_VALUE
+            else:
+                self._expect(",")
+        return True
@@ -0,0 +1,27 @@
+import importlib
+
+
+class LazyModule:
+    """Módulo que se importa en el primer acceso a uno de sus atributos.
+
+    Usa el import normal de Python (seguro entre hilos), así que importar un módulo del
+    monitor no arrastra dependencias pesadas (requests, urllib3...) que ese proceso quizá
+    no llegue a usar.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        return f"LazyModule({self._name!r}, cargado={self._module is not None})"
+
+
+def lazy_import(name):
+    return LazyModule(name)
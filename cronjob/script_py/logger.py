@@ -0,0 +1,170 @@
+import atexit
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+from logging.handlers import QueueHandler
+from script_py.config import Config, CONFIG
+
+ROOT_LOGGER = "argocd_monitor"
+DEFAULT_LEVEL = "INFO"
+DEFAULT_BATCH_SIZE = 256
+TEXT_FORMAT = "%(asctime)s %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Campos estándar de LogRecord: todo lo demás se considera un campo estructurado (extra=)
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_BEARER = re.compile(r"(Bearer\s+)[^\s'\",}]+", re.IGNORECASE)
+_SLACK_WEBHOOK = re.compile(r"https://hooks\.slack\.com/services/[^\s'\",}]+")
+REDACTED = "***"
+
+
+def redact(text):
+    """Oculta tokens Bearer, el token de ArgoCD y la URL del webhook de Slack en un texto."""
+    text = _BEARER.sub(r"\1" + REDACTED, text)
+    text = _SLACK_WEBHOOK.sub(REDACTED, text)
+    for secret in (Config.ARGOCD_TOKEN, Config.SLACK_WEBHOOK_URL):
+        if secret and secret in text:
+            text = text.replace(secret, REDACTED)
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro: ts, level, logger, msg y los campos pasados con extra=."""
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return redact(json.dumps(entry, ensure_ascii=False, default=str))
+
+
+class RedactingFormatter(logging.Formatter):
+    """Formato de texto tradicional ("fecha mensaje") con los secretos ocultos."""
+
+    def format(self, record):
+        return redact(super().format(record))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Encola el registro sin formatearlo: el formateo y la escritura ocurren en el hilo del listener.
+
+    Los argumentos del mensaje se formatean más tarde, así que no deben modificarse tras registrarlos.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Nunca bloquear el camino crítico: si la cola está llena el registro se pierde
+            self.dropped += 1
+
+
+class BatchingQueueListener:
+    """Hilo que vacía la cola de registros y los escribe en bloques de hasta `batch_size` líneas."""
+
+    def __init__(self, log_queue, formatter, stream=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.queue = log_queue
+        self.formatter = formatter
+        self.stream = stream or sys.stdout
+        self.batch_size = batch_size
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            self._write([record for record in batch if record is not None])
+            if stop:
+                return
+
+    def _write(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                lines.append(f"❌ Registro de log no formateable: {record.msg!r}")
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def get_logger(name):
+    """Logger del monitor para un módulo (hijo de "argocd_monitor")."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def setup_logging(config=None, level=None, fmt=None, stream=None, max_queue=10000):
+    """Configura el logging del monitor a partir de log_level, log_format y log_batch_size.
+
+    Los registros por debajo del nivel se descartan antes de formatearse. El resto se encola
+    sin bloquear y un hilo en segundo plano los formatea y escribe por bloques.
+    """
+    global _listener
+    config = CONFIG if config is None else config
+    level = (level or config.get("log_level", DEFAULT_LEVEL)).upper()
+    fmt = fmt or config.get("log_format", "json")
+    formatter = JsonFormatter() if fmt == "json" else RedactingFormatter(TEXT_FORMAT, DATE_FORMAT)
+
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+        log_queue = queue.Queue(maxsize=max_queue)
+        handler = DeferredQueueHandler(log_queue)
+        root = logging.getLogger(ROOT_LOGGER)
+        root.handlers[:] = [handler]
+        root.setLevel(level)
+        root.propagate = False
+        _listener = BatchingQueueListener(log_queue, formatter, stream, batch_size=config.get("log_batch_size", DEFAULT_BATCH_SIZE))
+        _listener.start()
+    return handler
+
+
+def shutdown_logging():
+    """Escribe los registros pendientes y detiene el hilo de escritura."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
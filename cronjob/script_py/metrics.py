@@ -0,0 +1,184 @@
+import threading
+import time
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, push_to_gateway, start_http_server
+from script_py.logger import get_logger
+
+log = get_logger("metrics")
+
+DEFAULT_METRICS_PORT = 8000
+
+# Buckets (segundos) para la duración de un ciclo completo: de 1 segundo a 15 minutos
+CYCLE_BUCKETS = (1, 2.5, 5, 10, 30, 60, 120, 300, 600, 900)
+
+# Métricas de Prometheus
+TOTAL_SYNC_ATTEMPTS = Counter("total_sync_attempts", "Número total de intentos de sincronización")
+CYCLE_DURATION = Histogram(
+    "argocd_monitor_cycle_duration_seconds",
+    "Duración de cada ciclo de análisis",
+    ["engine"],
+    buckets=CYCLE_BUCKETS,
+)
+ARGOCD_REQUEST_DURATION = Histogram(
+    "argocd_monitor_argocd_request_duration_seconds",
+    "Latencia de las llamadas a la API de ArgoCD",
+    ["endpoint", "status"],
+)
+QUEUE_WAIT = Histogram(
+    "argocd_monitor_queue_wait_seconds",
+    "Tiempo que una aplicación u operación espera en cola antes de procesarse",
+    ["queue"],
+)
+SLACK_DELIVERY = Histogram(
+    "argocd_monitor_slack_delivery_seconds",
+    "Latencia de cada envío al webhook de Slack",
+    ["status"],
+)
+APPLICATIONS = Gauge(
+    "argocd_monitor_applications",
+    "Aplicaciones por estado de salud y de sincronización",
+    ["health", "sync"],
+)
+IN_FLIGHT_REQUESTS = Gauge(
+    "argocd_monitor_in_flight_requests",
+    "Solicitudes a la API de ArgoCD en curso",
+)
+CONCURRENCY_LIMIT = Gauge(
+    "argocd_monitor_concurrency_limit",
+    "Límite actual de llamadas simultáneas a ArgoCD (control adaptativo)",
+)
+CYCLE_APPLICATIONS = Counter(
+    "argocd_monitor_cycle_applications",
+    "Aplicaciones por resultado al final de cada ciclo",
+    ["result"],
+)
+
+HTTP_CACHE_REQUESTS = Counter(
+    "argocd_monitor_http_cache_requests",
+    "GET de estado por aplicación (get_application_status) según la caché HTTP (hit, revalidated, miss, collapsed)",
+    ["result"],
+)
+HTTP_CACHE_SAVED_BYTES = Counter(
+    "argocd_monitor_http_cache_saved_bytes",
+    "Bytes de documentos de aplicación servidos desde la caché en lugar de descargarse",
+)
+
+FLAPPING_APPLICATIONS = Gauge(
+    "argocd_monitor_flapping_applications",
+    "Aplicaciones con varios cambios de salud en la ventana history_flapping_window",
+)
+MEAN_TIME_TO_RECOVERY = Gauge(
+    "argocd_monitor_mean_time_to_recovery_seconds",
+    "Tiempo medio desde que una aplicación deja de estar Healthy (pasando por Degraded/Error) hasta que se recupera",
+)
+
+# Hijos de las métricas ya resueltos por etiqueta: labels() toma un lock en cada llamada
+_children = {}
+_application_labels = set()
+_application_lock = threading.Lock()
+# Funciones llamadas con (endpoint, status, segundos) al terminar cada llamada a ArgoCD
+_request_listeners = []
+
+
+def _child(metric, *labels):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children.setdefault(key, metric.labels(*labels))
+    return child
+
+
+def observe_request(endpoint, status, seconds):
+    _child(ARGOCD_REQUEST_DURATION, endpoint, str(status)).observe(seconds)
+
+
+def observe_queue_wait(queue, seconds):
+    _child(QUEUE_WAIT, queue).observe(seconds)
+
+
+def observe_slack_delivery(status, seconds):
+    _child(SLACK_DELIVERY, str(status)).observe(seconds)
+
+
+def observe_cycle(engine, seconds):
+    _child(CYCLE_DURATION, engine).observe(seconds)
+
+
+def count_cycle_results(summary):
+    for result in ("completed", "skipped", "timed_out"):
+        _child(CYCLE_APPLICATIONS, result).inc(summary.get(result, 0))
+
+
+def observe_cache(result, saved_bytes=0):
+    _child(HTTP_CACHE_REQUESTS, result).inc()
+    if saved_bytes:
+        HTTP_CACHE_SAVED_BYTES.inc(saved_bytes)
+
+
+def set_history_stats(flapping, mean_time_to_recovery):
+    FLAPPING_APPLICATIONS.set(flapping)
+    if mean_time_to_recovery is not None:
+        MEAN_TIME_TO_RECOVERY.set(mean_time_to_recovery)
+
+
+def add_request_listener(listener):
+    _request_listeners.append(listener)
+
+
+def set_application_counts(counts):
+    """Publica el número de aplicaciones por (salud, sincronización); las combinaciones que desaparecen quedan a 0."""
+    with _application_lock:
+        for labels in _application_labels - counts.keys():
+            _child(APPLICATIONS, *labels).set(0)
+        for labels, count in counts.items():
+            _child(APPLICATIONS, *labels).set(count)
+        _application_labels.update(counts)
+
+
+class RequestTimer:
+    """Mide una llamada a ArgoCD: la cuenta como en curso y registra su latencia al salir.
+
+    El código de estado se asigna en `status`; si no llega a asignarse se registra "error".
+    """
+
+    __slots__ = ("endpoint", "status", "started")
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.status = None
+        self.started = 0.0
+
+    def __enter__(self):
+        IN_FLIGHT_REQUESTS.inc()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        IN_FLIGHT_REQUESTS.dec()
+        status = self.status if self.status is not None else "error"
+        observe_request(self.endpoint, status, elapsed)
+        for listener in _request_listeners:
+            listener(self.endpoint, status, elapsed)
+
+
+def start_metrics_server(port=DEFAULT_METRICS_PORT):
+    """Expone /metrics para Prometheus. Devuelve False si el puerto ya está en uso."""
+    try:
+        start_http_server(port)
+    except OSError as e:
+        log.warning("⚠️ No se pudo iniciar el servidor de métricas en el puerto %s: %s", port, e)
+        return False
+    return True
+
+
+def push_metrics(gateway, job="argocd-monitor", grouping_key=None, timeout=10):
+    """Envía todas las métricas a un Pushgateway (modo --once: el pod termina antes de que Prometheus lo consulte).
+
+    Devuelve False si el envío falla; el error no detiene el monitor.
+    """
+    try:
+        push_to_gateway(gateway, job=job, registry=REGISTRY, grouping_key=grouping_key, timeout=timeout)
+    except OSError as e:
+        log.warning("⚠️ No se pudieron enviar las métricas al Pushgateway %s: %s", gateway, e)
+        return False
+    return True
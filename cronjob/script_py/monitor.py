@@ -1,101 +1,546 @@
 import sys
 import os
 import time
-from datetime import datetime
-from script_py.argocd_client import ArgoCDClient
-from script_py.slack_notifier import SlackNotifier
+import argparse
+from script_py.argocd_client import get_client, operation_in_progress
+from script_py.slack_notifier import get_dispatcher
 from script_py.config import CONFIG
-from concurrent.futures import ThreadPoolExecutor
+from script_py.incremental import ChangeTracker
+from script_py.state import AppStateStore
+from script_py.persistence import create_backend
+from script_py.scheduler import ActionScheduler
+from script_py.concurrency import AIMDController, AdaptiveLimiter, AsyncAdaptiveLimiter
+from script_py.verification import wait_until_converged
+from script_py.rules import RuleEngine
+from script_py.diagnosis import Diagnoser, get_diagnoser, notify_unhealthy, set_diagnoser
+from script_py.history import HealthHistory, get_history, set_history
+from script_py.sharding import Shard
+from script_py import metrics
+from script_py.logger import get_logger, setup_logging
+from concurrent.futures import ThreadPoolExecutor, wait
 
-# Diccionario para rastrear el estado y la versión de las aplicaciones
-app_versions = {}
+log = get_logger("monitor")
 
-def get_current_time():
-    """Devuelve la fecha y hora actual formateada."""
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+# Estado y versión registrados de cada aplicación (compartido entre hilos)
+state_store = AppStateStore()
+
+# Seguimiento de cambios entre ciclos (solo en modo incremental)
+change_tracker = None
+
+# Última escritura del estado en modo stream
+last_flush = 0.0
+
+# Planificador de las operaciones refresh/sync (se crea en el primer uso)
+action_scheduler = None
+
+# Partición de aplicaciones de esta réplica (sin sharding por defecto)
+shard = Shard()
+
+# Aplicaciones que no se procesaron antes del plazo del ciclo anterior (van primero en el siguiente)
+carry_over = set()
+
+# Reglas de decisión compiladas (se crean en el primer uso o al arrancar)
+rules = None
+
+# Controlador AIMD de la concurrencia hacia ArgoCD (solo con adaptive_concurrency)
+concurrency_controller = None
 
 def get_app_version(app):
     """Obtiene la versión de la aplicación desde su etiqueta o anotación."""
     try:
         return app.get("metadata", {}).get("annotations", {}).get("argocd.argoproj.io/revision", "unknown")
     except Exception as e:
-        print(f"{get_current_time()} ❌ Error al obtener la versión de la aplicación: {e}")
+        log.error("❌ Error al obtener la versión de la aplicación: %s", e)
         return "unknown"
 
+def execute_action(app_name, action):
+    """Ejecuta una operación refresh/sync con el cliente compartido."""
+    if action == "refresh":
+        get_client().refresh_app(app_name)
+    elif action == "sync":
+        get_client().sync_app(app_name)
+
+def get_rules():
+    """Devuelve el motor de reglas compilado a partir de config.yaml."""
+    global rules
+    if rules is None:
+        rules = RuleEngine.from_config(CONFIG)
+    return rules
+
+def get_concurrency_controller(initial):
+    """Devuelve el controlador de concurrencia adaptativa (None si adaptive_concurrency está desactivado)."""
+    global concurrency_controller
+    if concurrency_controller is None and CONFIG.get("adaptive_concurrency", False):
+        concurrency_controller = AIMDController.from_config(CONFIG, initial).observe_requests()
+    return concurrency_controller
+
+def get_scheduler():
+    """Devuelve el planificador de operaciones, creado con el state_store activo."""
+    global action_scheduler
+    if action_scheduler is None:
+        controller = get_concurrency_controller(CONFIG.get("action_workers", 4))
+        limiter = AdaptiveLimiter(controller) if controller is not None else None
+        action_scheduler = ActionScheduler.from_config(execute_action, state_store, limiter=limiter)
+    return action_scheduler
+
+def evaluate_application(app):
+    """Evalúa el estado de una aplicación y devuelve (nombre, estado de salud, acciones a ejecutar).
+
+    Las acciones las decide el motor de reglas; si una regla la ignora (p. ej. excluded_apps),
+    el estado de salud devuelto es None.
+    """
+    app_name = app.get("metadata", {}).get("name", "Desconocido")
+    health_status = app["status"]["health"]["status"]
+    sync_status = app["status"]["sync"]["status"]
+    current_version = get_app_version(app)
+
+    known = state_store.get(app_name)
+    previous_version = known.revision if known is not None else current_version
+    decision = get_rules().evaluate(
+        app_name, app.get("spec", {}).get("project"), health_status, sync_status,
+        version_changed=current_version != previous_version,
+    )
+    # Omitir aplicaciones ignoradas
+    if decision.ignored:
+        return app_name, None, []
+    actions = list(decision.actions)
+
+    log.debug("🔄 Procesando la aplicación: %s", app_name, extra={"app": app_name})
+    if "refresh" in actions:
+        log.debug("🔄 Realizando refresh para la aplicación: %s", app_name, extra={"app": app_name})
+
+    # Registrar el estado actual
+    state_store.observe(app_name, health_status, sync_status, current_version)
+    history = get_history()
+    if history is not None:
+        history.record(app_name, health_status, sync_status)
+
+    if health_status == "Healthy":
+        # Permitir una nueva alerta si la aplicación vuelve a degradarse
+        get_dispatcher().resolve(app_name)
+
+    if health_status == "Healthy" and sync_status == "Synced":
+        log.debug("✅ '%s' está en estado Healthy y Synced.", app_name, extra={"app": app_name})
+        get_scheduler().reset(app_name)
+    elif sync_status == "OutOfSync":
+        log.warning("⚠️ '%s' está OutOfSync. Intentando sincronizar...", app_name, extra={"app": app_name})
+    elif health_status in ["Degraded", "Error"]:
+        log.error("❌ '%s' está en estado %s.", app_name, health_status, extra={"app": app_name})
+    else:
+        log.info("ℹ️ '%s' está en estado desconocido: %s.", app_name, health_status, extra={"app": app_name})
+
+    # Independiente de la rama anterior (antes quedaba oculto tras la rama Degraded/Error)
+    if (health_status in ["Degraded", "Error"] or sync_status == "OutOfSync") and current_version != previous_version:
+        log.warning("⚠️ '%s' cambió de versión (%s -> %s).", app_name, previous_version, current_version, extra={"app": app_name})
+
+    # Los intentos de refresh/sync los registra el planificador al ejecutarlos
+    if "notify" in actions:
+        state_store.record_action(app_name, "notify")
+
+    return app_name, health_status, actions
+
 def process_application(app):
-    """Procesa una aplicación individual."""
-    global app_versions
+    """Procesa una aplicación individual. Devuelve False si se omitió (excluida) y True en otro caso."""
+    app_name = app.get("metadata", {}).get("name", "Desconocido")
     try:
-        app_name = app.get("metadata", {}).get("name", "Desconocido")
-
-        # Omitir aplicaciones excluidas
-        if app_name in CONFIG["excluded_apps"]:
-            return
-
-        health_status = app["status"]["health"]["status"]
-        sync_status = app["status"]["sync"]["status"]
-        current_version = get_app_version(app)
-
-        print(f"{get_current_time()} 🔄 Procesando la aplicación: {app_name}")
-
-        # Realizar refresh solo si la aplicación no está en estado Healthy
-        if health_status != "Healthy":
-            print(f"{get_current_time()} 🔄 Realizando refresh para la aplicación: {app_name}")
-            ArgoCDClient.refresh_app(app_name, timeout=CONFIG.get("request_timeout", 10))
-
-        # Inicializar el estado y la versión si no están registrados
-        if app_name not in app_versions:
-            app_versions[app_name] = {"health_status": health_status, "version": current_version}
-
-        previous_health_status = app_versions[app_name]["health_status"]
-        previous_version = app_versions[app_name]["version"]
-
-        # Verificar el estado de la aplicación
-        if health_status == "Healthy" and sync_status == "Synced":
-            print(f"{get_current_time()} ✅ '{app_name}' está en estado Healthy y Synced.")
-        elif sync_status == "OutOfSync":
-            print(f"{get_current_time()} ⚠️ '{app_name}' está OutOfSync. Intentando sincronizar...")
-            ArgoCDClient.sync_app(app_name, timeout=CONFIG.get("request_timeout", 10))
-        elif health_status in ["Degraded", "Error"]:
-            print(f"{get_current_time()} ❌ '{app_name}' está en estado {health_status}.")
-            SlackNotifier.send_notification(app_name, health_status, 0, "La aplicación requiere atención.")
-        elif health_status in ["Degraded", "Error", "OutOfSync"] and current_version != previous_version:
-            print(f"{get_current_time()} ⚠️ '{app_name}' cambió de versión ({previous_version} -> {current_version}).")
+        app_name, health_status, actions = evaluate_application(app)
+        if health_status is None:
+            return False
+        operations = [action for action in actions if action in ("refresh", "sync")]
+        # Otra réplica (o ArgoCD) ya está sincronizando la aplicación: no lanzar un segundo sync
+        if "sync" in operations and operation_in_progress(app):
+            log.info("⏭️ '%s' ya tiene una operación en curso: se omite el sync.", app_name, extra={"app": app_name})
+            operations.remove("sync")
+        if operations:
+            get_scheduler().submit(app_name, operations, health_status)
+        if "notify" in actions:
+            notify_unhealthy(app_name, health_status)
+
+    except Exception as e:
+        log.error("❌ Error al procesar la aplicación '%s': %s", app_name, e, extra={"app": app_name})
+    return True
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="argocd-monitor", description="Monitor de aplicaciones de ArgoCD")
+    run_mode = parser.add_mutually_exclusive_group()
+    run_mode.add_argument(
+        "--once",
+        dest="run_mode",
+        action="store_const",
+        const="once",
+        help="Ejecutar un solo ciclo, entregar las alertas y salir (CronJob)",
+    )
+    run_mode.add_argument(
+        "--daemon",
+        dest="run_mode",
+        action="store_const",
+        const="daemon",
+        help="Repetir el ciclo cada analysis_interval sin salir (Deployment)",
+    )
+    parser.set_defaults(run_mode=CONFIG.get("run_mode", "daemon"))
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "async"],
+        default=CONFIG.get("engine", "threads"),
+        help="Motor de procesamiento: ThreadPoolExecutor (por defecto) o asyncio",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=CONFIG.get("incremental", False),
+        help="Procesar solo las aplicaciones cuyo estado cambió desde el ciclo anterior",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["poll", "stream"],
+        default=CONFIG.get("mode", "poll"),
+        help="Consultar /applications cada analysis_interval (poll) o consumir el stream de ArgoCD",
+    )
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        default=None,
+        help="Índice de esta réplica (por defecto SHARD_INDEX, JOB_COMPLETION_INDEX o el ordinal del hostname)",
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        default=None,
+        help="Número total de réplicas entre las que se reparten las aplicaciones (por defecto shard_count)",
+    )
+    parser.add_argument(
+        "--metrics",
+        action=argparse.BooleanOptionalAction,
+        default=CONFIG.get("metrics", True),
+        help="Exponer /metrics para Prometheus en metrics_port",
+    )
+    parser.add_argument(
+        "--state-backend",
+        choices=["sqlite", "memory", "none"],
+        default=CONFIG.get("state_backend", "none"),
+        help="Persistencia del estado entre ejecuciones (por defecto state_backend)",
+    )
+    args = parser.parse_args(argv)
+    if args.run_mode == "once" and args.mode == "stream":
+        parser.error("--once no es compatible con --mode stream (el stream no tiene fin de ciclo)")
+    return args
+
+def shard_projects():
+    """Proyectos de esta réplica para filtrar la consulta a ArgoCD (None: sin filtro por proyecto)."""
+    projects = shard.owned_projects(get_client())
+    if projects == []:
+        log.info("ℹ️ El shard %s/%s no es dueño de ningún proyecto.", shard.index, shard.count)
+    return projects
+
+def fetch_applications():
+    """Obtiene de ArgoCD las aplicaciones de esta réplica, filtradas por proyecto cuando es posible."""
+    projects = shard_projects()
+    return [] if projects == [] else get_client().get_applications(projects=projects)
+
+def select_applications(apps):
+    """Descarta las aplicaciones de otras réplicas, olvida las eliminadas y, en modo incremental, omite las que no cambiaron."""
+    apps = shard.select(apps)
+    names = [app.get("metadata", {}).get("name") for app in apps]
+    state_store.prune(names)
+    if action_scheduler is not None:
+        action_scheduler.prune(names)
+    if change_tracker is None:
+        return apps
+    changed = change_tracker.filter_changed(apps)
+    log.info("⏭️ Modo incremental: %s con cambios, %s omitidas.", change_tracker.changed, change_tracker.skipped)
+    return changed
+
+def publish_metrics(engine, started):
+    """Registra la duración del ciclo y el número de aplicaciones por estado."""
+    metrics.observe_cycle(engine, time.monotonic() - started)
+    metrics.set_application_counts(state_store.counts())
+    publish_history_metrics()
+
+def publish_history_metrics():
+    """Publica las aplicaciones inestables (flapping) y el MTTR según el historial de transiciones."""
+    history = get_history()
+    if history is None:
+        return
+    flapping = history.flapping(CONFIG.get("history_flapping_window", 6 * 3600), CONFIG.get("history_flapping_changes", 4))
+    if flapping:
+        worst = sorted(flapping, key=flapping.get, reverse=True)[:10]
+        log.warning("🔀 %s aplicaciones cambian de estado sin estabilizarse: %s.", len(flapping), ", ".join(f"{name} ({flapping[name]})" for name in worst))
+    metrics.set_history_stats(len(flapping), history.mean_time_to_recovery(CONFIG.get("history_mttr_window", 7 * 24 * 3600)))
+
+def finish_cycle(engine, summary):
+    """Registra el resumen del ciclo y guarda las aplicaciones fuera de plazo para el siguiente.
+
+    En modo incremental, las omitidas por no tener cambios se suman a `skipped` y las
+    arrastradas se marcan para que el siguiente ciclo no las descarte como sin cambios.
+    """
+    global carry_over
+    if change_tracker is not None:
+        summary["skipped"] += change_tracker.skipped
+        for app_name in summary["carry_over"]:
+            change_tracker.force(app_name)
+    carry_over = set(summary["carry_over"])
+    metrics.count_cycle_results(summary)
+    limit = concurrency_controller.limit if concurrency_controller is not None else "fija"
+    log.info(
+        "📋 Ciclo %s: %s completadas, %s omitidas, %s fuera de plazo (pasan al siguiente ciclo) en %.1fs; concurrencia %s.",
+        engine, summary["completed"], summary["skipped"], summary["timed_out"], summary["duration"], limit,
+        extra={"completed": summary["completed"], "skipped": summary["skipped"], "timed_out": summary["timed_out"]},
+    )
+
+def verify_syncs(deadline):
+    """Comprueba en lote que las aplicaciones sincronizadas en el ciclo convergen (Healthy y Synced).
+
+    Cada consulta es una sola solicitud a ArgoCD para todo el lote; la espera termina en
+    sync_verify_timeout o, antes, en el plazo del ciclo (`deadline`, en time.monotonic()).
+    """
+    synced = get_scheduler().take_synced()
+    if not synced or not CONFIG.get("sync_verification", True):
+        return
+    timeout = max(0, min(CONFIG.get("sync_verify_timeout", 60), deadline - time.monotonic()))
+    statuses, unconverged = wait_until_converged(
+        get_client(), synced, timeout=timeout,
+        interval=CONFIG.get("sync_verify_interval", 2), max_interval=CONFIG.get("sync_verify_max_interval", 15),
+    )
+    log.info("🔁 Verificación tras sync: %s de %s aplicaciones convergieron.", len(synced) - len(unconverged), len(synced))
+    for app_name in sorted(unconverged):
+        status = statuses[app_name]
+        if status is None:
+            log.warning("⚠️ No se pudo verificar el estado de '%s' tras el sync.", app_name, extra={"app": app_name})
         else:
-            print(f"{get_current_time()} ℹ️ '{app_name}' está en estado desconocido: {health_status}.")
+            log.warning("⚠️ '%s' no convergió tras el sync: %s/%s (operación: %s).", app_name, status.health, status.sync, status.operation, extra={"app": app_name})
 
-        # Actualizar el estado y la versión registrados
-        app_versions[app_name]["health_status"] = health_status
-        app_versions[app_name]["version"] = current_version
+def start_cycle():
+    """Comienzo de un ciclo: avanza el contador del historial y renueva el presupuesto del diagnóstico."""
+    history = get_history()
+    if history is not None:
+        history.start_cycle()
+    diagnoser = get_diagnoser()
+    if diagnoser is not None:
+        diagnoser.start_cycle()
 
-    except Exception as e:
-        print(f"{get_current_time()} ❌ Error al procesar la aplicación '{app_name}': {e}")
+def finish_diagnosis(deadline):
+    """Espera a los diagnósticos en curso, como mucho hasta el plazo del ciclo, para que sus alertas salgan en este ciclo."""
+    diagnoser = get_diagnoser()
+    if diagnoser is None:
+        return
+    pending = diagnoser.finish(timeout=max(0, deadline - time.monotonic()))
+    if pending:
+        log.warning("⏰ %s diagnósticos siguen en curso al final del ciclo: sus alertas saldrán en el siguiente envío.", pending)
+
+def flush_state():
+    """Guarda en el backend de persistencia los registros modificados durante el ciclo."""
+    started = time.monotonic()
+    written = state_store.flush()
+    history = get_history()
+    transitions = history.flush() if history is not None else 0
+    if written or transitions:
+        log.info("💾 Estado guardado: %s registros y %s transiciones en %.0f ms.", written, transitions, (time.monotonic() - started) * 1000)
+
+def run_threaded_cycle():
+    """Ejecuta un ciclo con el ThreadPoolExecutor. Devuelve False si no hay aplicaciones."""
+    started = time.monotonic()
+    log.info("🔍 Obteniendo aplicaciones de ArgoCD...")
+    apps = fetch_applications()
+    if not apps:
+        return False
+
+    start_cycle()
+    scheduler = get_scheduler()
+    apps = scheduler.order(select_applications(apps), carry_over)
+    deadline = started + CONFIG.get("cycle_deadline", 5 * 60)
+    submitted = time.monotonic()
+
+    def process_queued(app):
+        metrics.observe_queue_wait("applications", time.monotonic() - submitted)
+        return process_application(app)
+
+    executor = ThreadPoolExecutor(max_workers=CONFIG.get("max_workers", 5))
+    futures = {executor.submit(process_queued, app): app.get("metadata", {}).get("name") for app in apps}
+    done, pending = wait(futures, timeout=max(0, deadline - time.monotonic()))
+    # Las aplicaciones aún en cola no llegan a empezar; las que están en curso terminan en segundo plano
+    executor.shutdown(wait=False, cancel_futures=True)
+    summary = {"completed": 0, "skipped": 0, "timed_out": len(pending), "carry_over": [futures[future] for future in pending]}
+    for future in done:
+        if future.exception() is not None:
+            log.error("❌ Error al procesar la aplicación '%s': %s", futures[future], future.exception(), extra={"app": futures[future]})
+            summary["completed"] += 1
+        elif future.result():
+            summary["completed"] += 1
+        else:
+            summary["skipped"] += 1
+
+    if not scheduler.drain(timeout=max(0, deadline - time.monotonic())):
+        cancelled = scheduler.cancel_pending()
+        log.warning("⏰ Plazo del ciclo agotado: %s operaciones refresh/sync sin ejecutar.", len(cancelled))
+        for app_name in cancelled:
+            if app_name not in summary["carry_over"]:
+                summary["completed"] -= 1
+                summary["timed_out"] += 1
+                summary["carry_over"].append(app_name)
+    if pending:
+        log.warning("⏰ Plazo del ciclo agotado: %s aplicaciones sin procesar.", len(pending))
+    verify_syncs(deadline)
+    finish_diagnosis(deadline)
+    summary["duration"] = time.monotonic() - started
+    get_dispatcher().flush()
+    flush_state()
+    publish_metrics("threads", started)
+    finish_cycle("threads", summary)
+
+    stats = get_client().pool_stats()
+    log.info("🔌 Pool de conexiones: %s reutilizadas, %s nuevas.", stats['hits'], stats['misses'])
+    return True
+
+def run_async_cycle():
+    """Ejecuta un ciclo con el motor asyncio. Devuelve False si no hay aplicaciones."""
+    import asyncio
+    from script_py.async_engine import run_async_cycle as run_cycle
+
+    started = time.monotonic()
+    log.info("🔍 Obteniendo aplicaciones de ArgoCD (asyncio)...")
+    projects = shard_projects()
+    if projects == []:
+        return False
+    controller = get_concurrency_controller(CONFIG.get("async_concurrency", 100))
+    limiter = AsyncAdaptiveLimiter(controller) if controller is not None else None
+    start_cycle()
+    summary = asyncio.run(run_cycle(
+        evaluate_application, CONFIG, select=select_applications, scheduler=get_scheduler(),
+        projects=projects, limiter=limiter, carry_over=carry_over,
+    ))
+    if summary is None:
+        return False
+    deadline = started + CONFIG.get("cycle_deadline", 5 * 60)
+    verify_syncs(deadline)
+    finish_diagnosis(deadline)
+    summary["duration"] = time.monotonic() - started
+    get_dispatcher().flush()
+    flush_state()
+    publish_metrics("async", started)
+    finish_cycle("async", summary)
+    return True
 
-def main():
-    global app_versions
-    print(f"{get_current_time()} 🔧 Iniciando el monitor de ArgoCD...")
+def handle_stream_event(event_type, app):
+    """Procesa un evento del stream de ArgoCD con la misma lógica que el modo poll."""
+    from script_py.stream import DELETED
 
+    app_name = app.get("metadata", {}).get("name")
+    if not shard.owns(app):
+        return
+    if event_type == DELETED:
+        state_store.remove(app_name)
+        if change_tracker is not None:
+            change_tracker.forget(app_name)
+        return
+    if change_tracker is not None and not change_tracker.observe(app):
+        return
+    process_application(app)
+
+    # En modo stream no hay fin de ciclo: cada state_flush_interval se cierra uno (alertas,
+    # presupuesto de mensajes a Slack y estado guardado)
+    global last_flush
+    if time.monotonic() - last_flush >= CONFIG.get("state_flush_interval", 60):
+        last_flush = time.monotonic()
+        get_dispatcher().flush()
+        start_cycle()
+        flush_state()
+        metrics.set_application_counts(state_store.counts())
+        publish_history_metrics()
+
+def run_stream_mode():
+    """Consume el stream de ArgoCD indefinidamente, procesando cada cambio a medida que llega."""
+    from script_py.stream import ApplicationStream, EventDispatcher
+
+    log.info("📡 Modo stream: escuchando cambios de aplicaciones en ArgoCD...")
+    stream = ApplicationStream(get_client(), resync_interval=CONFIG.get("stream_resync_interval", 60 * 60))
+    dispatcher = EventDispatcher(handle_stream_event, max_workers=CONFIG.get("max_workers", 5), max_pending=CONFIG.get("stream_max_pending", 100))
+    dispatcher.run(stream.events())
+
+def close_notifications():
+    """Entrega las alertas pendientes antes de salir (en modo --once el proceso termina tras el ciclo)."""
+    dispatcher = get_dispatcher()
+    timeout = CONFIG.get("slack_shutdown_timeout", 30)
+    dispatcher.flush(wait=True, timeout=timeout)
+    dispatcher.close(timeout=timeout)
+    # Guardar las alertas entregadas después del último flush_state() del ciclo
+    flush_state()
+
+def push_cycle_metrics():
+    """Envía las métricas al Pushgateway de metrics_pushgateway, si está configurado.
+
+    En modo --once el pod termina en cuanto acaba el ciclo y Prometheus no llegaría a consultar
+    /metrics; cada réplica agrupa sus métricas por shard para no sobrescribir las de las demás.
+    """
+    gateway = CONFIG.get("metrics_pushgateway")
+    if gateway:
+        metrics.push_metrics(gateway, grouping_key={"shard": str(shard.index)})
+
+def run_once(run_cycle):
+    """Ejecuta un solo ciclo y devuelve el código de salida del proceso (1 si el ciclo falló)."""
+    log.info("🔧 Ejecutando un ciclo del monitor de ArgoCD...")
+    try:
+        if not run_cycle():
+            log.warning("⚠️ No se encontraron aplicaciones o hubo un error al obtenerlas.")
+        return 0
+    except Exception as e:
+        log.exception("❌ Error en el ciclo: %s", e)
+        return 1
+    finally:
+        close_notifications()
+        push_cycle_metrics()
+
+def run_daemon(run_cycle):
+    """Repite el ciclo cada analysis_interval indefinidamente."""
     while True:
         try:
-            print(f"{get_current_time()} 🔍 Obteniendo aplicaciones de ArgoCD...")
-            apps = ArgoCDClient.get_applications(timeout=CONFIG.get("request_timeout", 10))
-
-            if not apps:
-                print(f"{get_current_time()} ⚠️ No se encontraron aplicaciones o hubo un error al obtenerlas.")
+            if not run_cycle():
+                log.warning("⚠️ No se encontraron aplicaciones o hubo un error al obtenerlas.")
                 time.sleep(CONFIG.get("analysis_interval", 15 * 60))
                 continue
 
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                executor.map(process_application, apps)
-
-            print(f"{get_current_time()} ⏳ Esperando {CONFIG.get('analysis_interval', 15 * 60) // 60} minutos para el próximo análisis...")
+            log.info("⏳ Esperando %s minutos para el próximo análisis...", CONFIG.get('analysis_interval', 15 * 60) // 60)
             time.sleep(CONFIG.get("analysis_interval", 15 * 60))
 
         except Exception as e:
-            print(f"{get_current_time()} ❌ Error en el ciclo principal: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ Error en el ciclo principal: %s", e)
             time.sleep(30)
 
+def main(argv=None):
+    """Punto de entrada de `argocd-monitor`. Devuelve el código de salida."""
+    global change_tracker, state_store, shard, rules
+    args = parse_args(argv)
+    setup_logging()
+    # Las reglas se compilan una sola vez: un error de configuración detiene el arranque
+    rules = RuleEngine.from_config(CONFIG)
+    shard = Shard.from_config(CONFIG, index=args.shard_index, count=args.shard_count)
+    if shard.enabled:
+        log.info("🧩 Shard %s de %s (partición por %s).", shard.index, shard.count, shard.key)
+    if args.metrics:
+        # Iniciar el servidor HTTP para métricas
+        metrics.start_metrics_server(CONFIG.get("metrics_port", metrics.DEFAULT_METRICS_PORT))
+    backend = create_backend(dict(CONFIG.items(), state_backend=args.state_backend), shard=shard.index)
+    if backend is not None:
+        # El estado guardado por la ejecución anterior se carga en el primer acceso
+        state_store = AppStateStore(backend=backend)
+    # La última alerta entregada se guarda con el estado: deduplica entre ejecuciones --once
+    get_dispatcher().attach_state(state_store)
+    if args.incremental:
+        change_tracker = ChangeTracker(state_store)
+    if CONFIG.get("history", True):
+        # Las transiciones guardadas por ejecuciones anteriores se cargan al crearlo
+        set_history(HealthHistory.from_config(CONFIG, shard=shard.index))
+    if CONFIG.get("diagnosis", True):
+        set_diagnoser(Diagnoser.from_config(get_client()))
+    if args.mode == "stream":
+        run_stream_mode()
+        return 0
+
+    run_cycle = run_async_cycle if args.engine == "async" else run_threaded_cycle
+    if args.run_mode == "once":
+        return run_once(run_cycle)
+    log.info("🔧 Iniciando el monitor de ArgoCD (motor: %s)...", args.engine)
+    run_daemon(run_cycle)
+    return 0
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
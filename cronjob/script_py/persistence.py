@@ -0,0 +1,86 @@
+import os
+import threading
+from script_py.state import AppState
+
+_COLUMNS = AppState.__slots__
+
+
+class MemoryBackend:
+    """Backend en memoria (pruebas y ejecuciones sin persistencia)."""
+
+    def __init__(self, records=None):
+        self.records = dict(records or {})
+
+    def load(self):
+        return dict(self.records)
+
+    def save(self, changed, removed):
+        self.records.update(changed)
+        for name in removed:
+            self.records.pop(name, None)
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """Guarda el estado de cada aplicación como una fila de una tabla SQLite local."""
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            import sqlite3
+
+            # En modo stream se escribe desde los hilos del pool: el acceso se serializa con _lock
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            columns = ", ".join(f"{column} {'TEXT PRIMARY KEY' if column == 'name' else ''}".strip() for column in _COLUMNS)
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS app_state ({columns})")
+            # Tablas creadas por versiones anteriores: añadir los campos nuevos (quedan a NULL)
+            existing = {row[1] for row in self._connection.execute("PRAGMA table_info(app_state)")}
+            for column in _COLUMNS:
+                if column not in existing:
+                    self._connection.execute(f"ALTER TABLE app_state ADD COLUMN {column}")
+        return self._connection
+
+    def load(self):
+        with self._lock:
+            rows = self._connect().execute(f"SELECT {', '.join(_COLUMNS)} FROM app_state").fetchall()
+        return {row[0]: row for row in rows}
+
+    def save(self, changed, removed):
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(f"INSERT OR REPLACE INTO app_state ({', '.join(_COLUMNS)}) VALUES ({placeholders})", changed.values())
+                connection.executemany("DELETE FROM app_state WHERE name = ?", ((name,) for name in removed))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def create_backend(config, shard=0):
+    """Crea el backend de persistencia configurado en `state_backend` (o None si está desactivado).
+
+    `state_path` puede incluir "{shard}" para que cada réplica use su propio fichero.
+    """
+    backend = config.get("state_backend", "none")
+    if backend == "sqlite":
+        return SQLiteBackend(config.get("state_path", "/var/lib/argocd-monitor/state.db").format(shard=shard))
+    if backend == "memory":
+        return MemoryBackend()
+    if backend in (None, "none"):
+        return None
+    raise ValueError(f"❌ Backend de persistencia desconocido: {backend}")
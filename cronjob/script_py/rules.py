@@ -0,0 +1,223 @@
+import fnmatch
+import re
+from script_py.config import CONFIG
+from script_py.logger import get_logger
+
+log = get_logger("rules")
+
+# Acciones en el orden en que se ejecutan; "ignore" descarta la aplicación
+ACTIONS = ("refresh", "sync", "notify")
+IGNORE = "ignore"
+REGEX_PREFIX = "re:"
+GLOB_CHARS = "*?["
+HEALTH_STATES = ("Healthy", "Progressing", "Degraded", "Suspended", "Missing", "Error", "Unknown")
+SYNC_STATES = ("Synced", "OutOfSync", "Unknown")
+# Perfiles (aplicación, proyecto) a partir de los cuales se vacía su caché (rotación de aplicaciones)
+MAX_CACHED_NAMES = 100000
+
+# Reglas equivalentes a la cadena if/elif original de process_application
+DEFAULT_RULES = [
+    {"name": "refresh-unhealthy", "health": "!Healthy", "actions": ["refresh"]},
+    {"name": "sync-out-of-sync", "sync": "OutOfSync", "actions": ["sync"]},
+    {"name": "notify-degraded", "health": ["Degraded", "Error"], "sync": "!OutOfSync", "actions": ["notify"]},
+]
+
+
+# Flags globales al inicio de un patrón ("(?i)^canary-"): no se pueden combinar con "|"
+_GLOBAL_FLAGS = re.compile(r"(?:\(\?[aiLmsux]+\))+")
+
+
+def _scoped(pattern):
+    """Patrón equivalente que se puede unir a otros: "(?i)^canary-" -> "(?i:^canary-)"."""
+    match = _GLOBAL_FLAGS.match(pattern)
+    if match is None:
+        return f"(?:{pattern})"
+    flags = "".join(sorted(set(match.group()) - set("(?)")))
+    return f"(?{flags}:{pattern[match.end():]})"
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+class Selector:
+    """Selector de nombres: exactos, globs ("team-*") o expresiones regulares ("re:^canary-")."""
+
+    def __init__(self, patterns):
+        self.exact = set()
+        self.patterns = []
+        for pattern in _as_list(patterns):
+            pattern = str(pattern)
+            if pattern.startswith(REGEX_PREFIX):
+                self.patterns.append(pattern[len(REGEX_PREFIX):])
+            elif any(char in pattern for char in GLOB_CHARS):
+                self.patterns.append(fnmatch.translate(pattern))
+            else:
+                self.exact.add(pattern)
+        self.compiled = [re.compile(pattern) for pattern in self.patterns]
+
+    def matches(self, name):
+        return name in self.exact or any(regex.match(name) for regex in self.compiled)
+
+
+class Condition:
+    """Condición sobre un estado: valores permitidos y excluidos ("!Healthy"). Vacía = cualquiera."""
+
+    def __init__(self, values):
+        values = [str(value) for value in _as_list(values)]
+        self.allowed = frozenset(value for value in values if not value.startswith("!"))
+        self.denied = frozenset(value[1:] for value in values if value.startswith("!"))
+
+    def matches(self, value):
+        return (not self.allowed or value in self.allowed) and value not in self.denied
+
+
+class Rule:
+    """Una regla de config.yaml: selectores de aplicación/proyecto, condiciones de estado y acciones."""
+
+    __slots__ = ("name", "apps", "projects", "health", "sync", "version_changed", "actions", "ignore")
+
+    def __init__(self, name, actions, apps=None, projects=None, health=None, sync=None, version_changed=None):
+        actions = _as_list(actions)
+        unknown = [action for action in actions if action not in ACTIONS and action != IGNORE]
+        if not actions or unknown:
+            raise ValueError(f"❌ Acciones no válidas en la regla '{name}': {unknown or actions} (usar {', '.join(ACTIONS + (IGNORE,))})")
+        self.name = name
+        self.apps = Selector(apps) if apps is not None else None
+        self.projects = Selector(projects) if projects is not None else None
+        self.health = Condition(health)
+        self.sync = Condition(sync)
+        self.version_changed = version_changed
+        self.ignore = IGNORE in actions
+        self.actions = tuple(action for action in ACTIONS if action in actions)
+
+    @classmethod
+    def from_dict(cls, spec, index=0):
+        spec = dict(spec)
+        name = spec.pop("name", f"rule-{index}")
+        actions = spec.pop("actions", spec.pop("action", None))
+        try:
+            return cls(name, actions, **spec)
+        except TypeError as e:
+            raise ValueError(f"❌ Campo desconocido en la regla '{name}': {e}") from None
+
+    def matches_state(self, health, sync, version_changed):
+        return (
+            self.health.matches(health)
+            and self.sync.matches(sync)
+            and (self.version_changed is None or self.version_changed == version_changed)
+        )
+
+
+class Decision:
+    """Resultado de evaluar las reglas: acciones a ejecutar, si se ignora y qué reglas coincidieron."""
+
+    __slots__ = ("actions", "ignored", "rules")
+
+    def __init__(self, actions=(), ignored=False, rules=()):
+        self.actions = actions
+        self.ignored = ignored
+        self.rules = rules
+
+    def __repr__(self):
+        return f"Decision(actions={self.actions!r}, ignored={self.ignored!r}, rules={self.rules!r})"
+
+
+class _SelectorIndex:
+    """Índice de los selectores de un campo (aplicación o proyecto) de todas las reglas.
+
+    Las reglas candidatas para un nombre salen de un conjunto hash para los nombres exactos y
+    de una única expresión regular combinada para los patrones: solo si esta coincide se
+    prueba cada patrón.
+    """
+
+    def __init__(self, rules, field):
+        self.any = frozenset(index for index, rule in enumerate(rules) if getattr(rule, field) is None)
+        self.exact = {}
+        self.patterns = []
+        for index, rule in enumerate(rules):
+            selector = getattr(rule, field)
+            if selector is None:
+                continue
+            for name in selector.exact:
+                self.exact.setdefault(name, set()).add(index)
+            self.patterns.extend((index, regex) for regex in selector.compiled)
+        combined = "|".join(_scoped(regex.pattern) for _, regex in self.patterns)
+        self.combined = re.compile(combined) if combined else None
+
+    def candidates(self, name):
+        indices = set(self.any)
+        indices.update(self.exact.get(name, ()))
+        if self.combined is not None and self.combined.match(name):
+            indices.update(index for index, regex in self.patterns if regex.match(name))
+        return indices
+
+
+class RuleEngine:
+    """Motor de reglas compilado una vez al arrancar.
+
+    Todas las reglas que coinciden con una aplicación suman sus acciones; una regla "ignore"
+    descarta la aplicación. Cada (aplicación, proyecto) se resuelve una sola vez a su perfil:
+    las reglas cuyos selectores la incluyen. La decisión se guarda en una tabla indexada por
+    (perfil, salud, sincronización, cambio de versión), así que evaluar una aplicación cuesta
+    dos búsquedas en diccionarios sin importar cuántas reglas haya.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._apps = _SelectorIndex(self.rules, "apps")
+        self._projects = _SelectorIndex(self.rules, "projects")
+        self._profiles = {}
+        # Perfiles iguales comparten el mismo objeto (hash ya calculado, comparación por identidad)
+        self._interned = {}
+        self._table = {}
+        # Las reglas sin selectores valen para cualquier aplicación: su tabla se precalcula entera
+        unselected = self._intern(self._apps.any & self._projects.any)
+        for health in HEALTH_STATES:
+            for sync in SYNC_STATES:
+                for version_changed in (False, True):
+                    self._table[unselected, health, sync, version_changed] = self._decide(unselected, health, sync, version_changed)
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Compila `rules` de config.yaml (DEFAULT_RULES si no hay) precedidas de `excluded_apps`."""
+        config = CONFIG if config is None else config
+        specs = []
+        if config.get("excluded_apps"):
+            specs.append({"name": "excluded-apps", "apps": config["excluded_apps"], "actions": [IGNORE]})
+        specs.extend(config.get("rules") or DEFAULT_RULES)
+        engine = cls(Rule.from_dict(spec, index) for index, spec in enumerate(specs))
+        log.debug("📐 %s reglas compiladas.", len(engine.rules))
+        return engine
+
+    def _intern(self, indices):
+        indices = frozenset(indices)
+        return self._interned.setdefault(indices, indices)
+
+    def _profile(self, app_name, project):
+        profile = self._intern(self._apps.candidates(app_name or "") & self._projects.candidates(project or ""))
+        if len(self._profiles) >= MAX_CACHED_NAMES:
+            self._profiles.clear()
+        self._profiles[app_name, project] = profile
+        return profile
+
+    def _decide(self, indices, health, sync, version_changed):
+        matched = [index for index in sorted(indices) if self.rules[index].matches_state(health, sync, version_changed)]
+        names = tuple(self.rules[index].name for index in matched)
+        if any(self.rules[index].ignore for index in matched):
+            return Decision(ignored=True, rules=names)
+        actions = {action for index in matched for action in self.rules[index].actions}
+        return Decision(tuple(action for action in ACTIONS if action in actions), rules=names)
+
+    def evaluate(self, app_name, project=None, health=None, sync=None, version_changed=False):
+        """Devuelve la Decision para una aplicación en el estado indicado."""
+        profile = self._profiles.get((app_name, project))
+        if profile is None:
+            profile = self._profile(app_name, project)
+        key = (profile, health, sync, version_changed)
+        decision = self._table.get(key)
+        if decision is None:
+            decision = self._table[key] = self._decide(profile, health, sync, version_changed)
+        return decision
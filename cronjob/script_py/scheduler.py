@@ -0,0 +1,254 @@
+import heapq
+import itertools
+import threading
+import time
+from script_py.config import CONFIG
+from script_py.logger import get_logger
+from script_py.metrics import TOTAL_SYNC_ATTEMPTS, observe_queue_wait
+
+log = get_logger("scheduler")
+
+# Prioridad de las operaciones según el estado de salud (menor = antes)
+PRIORITIES = {"Degraded": 0, "Error": 0, "Missing": 1}
+DEFAULT_PRIORITY = 2
+
+
+class TokenBucket:
+    """Limitador de tasa global: `rate` operaciones por segundo con ráfagas de hasta `burst`."""
+
+    def __init__(self, rate, burst, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Reserva un token y devuelve cuántos segundos hay que esperar para usarlo."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay > 0:
+            self.sleep(delay)
+
+    async def acquire_async(self):
+        import asyncio
+
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ActionScheduler:
+    """Cola de operaciones refresh/sync hacia ArgoCD.
+
+    - Fusiona solicitudes duplicadas de una misma operación para una aplicación.
+    - Limita la tasa global con un TokenBucket.
+    - Aplica un máximo de intentos por aplicación (`max_attempts`, p. ej. max_sync_attempts)
+      y backoff exponencial entre intentos.
+    - Atiende primero a las aplicaciones Degraded/Error.
+
+    `execute(app_name, action)` realiza la llamada. Los intentos se cuentan en el
+    AppStateStore, si se proporciona, para que el límite sobreviva entre ejecuciones.
+    Con un `limiter` (concurrency.AdaptiveLimiter) el número de llamadas simultáneas sigue
+    el límite adaptativo en lugar de ser siempre `workers`.
+    """
+
+    def __init__(self, execute, state_store=None, rate=5, burst=10, workers=4, max_attempts=None, backoff=30, max_backoff=600, clock=time.monotonic, sleep=time.sleep, limiter=None):
+        self.execute = execute
+        self.state_store = state_store
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.limiter = limiter
+        # Con límite adaptativo hacen falta hilos suficientes para su máximo
+        self.workers = max(workers, limiter.controller.max_limit) if limiter is not None else workers
+        self.max_attempts = dict(max_attempts or {})
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self._queue = []
+        self._sequence = itertools.count()
+        self._active = set()
+        # Intentos y backoff por aplicación ({aplicación: {acción: valor}}): reset() y prune() no recorren todo
+        self._attempts = {}
+        # Aplicaciones sincronizadas desde la última llamada a take_synced() (para verificarlas)
+        self._synced = set()
+        self._next_allowed = {}
+        self._condition = threading.Condition()
+        self._threads = []
+        self._closed = False
+        self.stats = {"executed": 0, "coalesced": 0, "capped": 0, "backed_off": 0, "errors": 0}
+
+    @classmethod
+    def from_config(cls, execute, state_store=None, config=None, limiter=None):
+        config = CONFIG if config is None else config
+        max_attempts = {"sync": config.get("max_sync_attempts")}
+        if config.get("max_refresh_attempts"):
+            max_attempts["refresh"] = config["max_refresh_attempts"]
+        return cls(
+            execute,
+            state_store=state_store,
+            rate=config.get("action_rate", 5),
+            burst=config.get("action_burst", 10),
+            workers=config.get("action_workers", 4),
+            max_attempts={action: limit for action, limit in max_attempts.items() if limit},
+            backoff=config.get("action_backoff", 30),
+            max_backoff=config.get("action_max_backoff", 600),
+            limiter=limiter,
+        )
+
+    def _attempt_count(self, app_name, action):
+        if self.state_store is not None:
+            state = self.state_store.get(app_name)
+            return getattr(state, f"{action}_attempts", 0) if state is not None else 0
+        return self._attempts.get(app_name, {}).get(action, 0)
+
+    def admit(self, app_name, action):
+        """Decide si una operación puede encolarse ahora. Si devuelve True, hay que llamar a complete()."""
+        key = (app_name, action)
+        with self._condition:
+            if key in self._active:
+                self.stats["coalesced"] += 1
+                return False
+            limit = self.max_attempts.get(action)
+            if limit is not None and self._attempt_count(app_name, action) >= limit:
+                self.stats["capped"] += 1
+                log.warning("🛑 '%s' alcanzó el máximo de intentos de %s (%s).", app_name, action, limit, extra={"app": app_name})
+                return False
+            if self.clock() < self._next_allowed.get(app_name, {}).get(action, 0):
+                self.stats["backed_off"] += 1
+                return False
+            self._active.add(key)
+            return True
+
+    def complete(self, app_name, action):
+        """Registra un intento terminado y programa el backoff del siguiente."""
+        key = (app_name, action)
+        if self.state_store is not None:
+            self.state_store.record_action(app_name, action)
+        if action == "sync":
+            TOTAL_SYNC_ATTEMPTS.inc()
+        with self._condition:
+            self._active.discard(key)
+            if self.state_store is None:
+                counts = self._attempts.setdefault(app_name, {})
+                counts[action] = counts.get(action, 0) + 1
+            attempts = max(self._attempt_count(app_name, action), 1)
+            self._next_allowed.setdefault(app_name, {})[action] = self.clock() + min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+            self.stats["executed"] += 1
+            if action == "sync":
+                self._synced.add(app_name)
+            self._condition.notify_all()
+
+    def take_synced(self):
+        """Devuelve y olvida las aplicaciones sincronizadas desde la llamada anterior."""
+        with self._condition:
+            synced, self._synced = self._synced, set()
+        return synced
+
+    def reset(self, app_name):
+        """Reinicia los intentos y el backoff de una aplicación recuperada."""
+        if self.state_store is not None:
+            self.state_store.reset_attempts(app_name)
+        with self._condition:
+            self._next_allowed.pop(app_name, None)
+            self._attempts.pop(app_name, None)
+
+    def prune(self, names):
+        """Olvida los intentos y el backoff de las aplicaciones que ya no están en `names`."""
+        names = set(names)
+        with self._condition:
+            for table in (self._next_allowed, self._attempts):
+                for app_name in [app_name for app_name in table if app_name not in names]:
+                    del table[app_name]
+
+    @staticmethod
+    def priority(health_status):
+        return PRIORITIES.get(health_status, DEFAULT_PRIORITY)
+
+    @classmethod
+    def order(cls, apps, carry_over=()):
+        """Ordena las aplicaciones: primero las arrastradas del ciclo anterior y después por gravedad."""
+        def key(app):
+            name = app.get("metadata", {}).get("name")
+            return name not in carry_over, cls.priority(app.get("status", {}).get("health", {}).get("status"))
+        return sorted(apps, key=key)
+
+    def submit(self, app_name, actions, health_status=None):
+        """Encola las operaciones de una aplicación (se ejecutan en orden). Devuelve las admitidas."""
+        admitted = [action for action in actions if self.admit(app_name, action)]
+        if not admitted:
+            return []
+        self._ensure_started()
+        with self._condition:
+            heapq.heappush(self._queue, (self.priority(health_status), next(self._sequence), app_name, admitted, time.monotonic()))
+            self._condition.notify()
+        return admitted
+
+    def _ensure_started(self):
+        with self._condition:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"action-scheduler-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                _, _, app_name, actions, enqueued = heapq.heappop(self._queue)
+            observe_queue_wait("actions", time.monotonic() - enqueued)
+            for action in actions:
+                try:
+                    self.bucket.acquire()
+                    if self.limiter is not None:
+                        with self.limiter:
+                            self.execute(app_name, action)
+                    else:
+                        self.execute(app_name, action)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    log.error("❌ Error al ejecutar %s para '%s': %s", action, app_name, e, extra={"app": app_name})
+                finally:
+                    self.complete(app_name, action)
+
+    def drain(self, timeout=None):
+        """Espera a que se ejecuten todas las operaciones encoladas. Devuelve False si vence el plazo."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._queue or self._active:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def cancel_pending(self):
+        """Descarta las operaciones aún en cola (fin del plazo del ciclo). Devuelve sus aplicaciones."""
+        with self._condition:
+            pending = self._queue
+            self._queue = []
+            for _, _, app_name, actions, _ in pending:
+                for action in actions:
+                    self._active.discard((app_name, action))
+            self._condition.notify_all()
+        return [app_name for _, _, app_name, _, _ in pending]
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
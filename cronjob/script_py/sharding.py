@@ -0,0 +1,115 @@
+import bisect
+import hashlib
+import os
+import re
+import socket
+from script_py.config import CONFIG
+from script_py.logger import get_logger
+
+log = get_logger("sharding")
+
+# Puntos virtuales por réplica en el anillo: reparto más uniforme a costa de un anillo mayor
+DEFAULT_VNODES = 64
+SHARD_KEYS = ("name", "project")
+
+
+def _hash(key):
+    # hash() de Python cambia entre procesos: todas las réplicas deben calcular el mismo anillo
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Anillo de hash consistente: al añadir o quitar un miembro solo cambian de dueño ~1/N claves."""
+
+    def __init__(self, members, vnodes=DEFAULT_VNODES):
+        points = sorted((_hash(f"{member}#{i}"), member) for member in members for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._members = [member for _, member in points]
+
+    def owner(self, key):
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._members[index]
+
+
+# Pods de un Deployment: <nombre>-<pod-template-hash>-<sufijo>; el sufijo puede ser solo dígitos
+# ("argocd-monitor-7c9d5b8f64-24579") y no es un ordinal de StatefulSet
+_DEPLOYMENT_POD = re.compile(r"-[bcdfghjklmnpqrstvwxz2456789]{6,10}-[bcdfghjklmnpqrstvwxz2456789]{5}$")
+_STATEFULSET_ORDINAL = re.compile(r"-(\d+)$")
+
+
+def shard_index_from_env(default=0):
+    """Índice de la réplica: SHARD_INDEX, JOB_COMPLETION_INDEX (Job indexado) o el ordinal del hostname (StatefulSet)."""
+    for variable in ("SHARD_INDEX", "JOB_COMPLETION_INDEX"):
+        if os.getenv(variable):
+            return int(os.environ[variable])
+    hostname = socket.gethostname()
+    match = _STATEFULSET_ORDINAL.search(hostname)
+    if match is None or _DEPLOYMENT_POD.search(hostname):
+        return default
+    return int(match.group(1))
+
+
+class Shard:
+    """Partición de las aplicaciones que le corresponde a esta réplica del monitor.
+
+    Cada una de las `count` réplicas es dueña de las aplicaciones cuyo nombre (o proyecto,
+    con key="project") cae en su tramo del anillo. Con count=1 el sharding está desactivado.
+    """
+
+    def __init__(self, index=0, count=1, key="name", vnodes=DEFAULT_VNODES):
+        if key not in SHARD_KEYS:
+            raise ValueError(f"❌ Clave de sharding desconocida: {key} (usar {' o '.join(SHARD_KEYS)})")
+        if not 0 <= index < count:
+            raise ValueError(f"❌ Índice de shard fuera de rango: {index} (shard_count={count})")
+        self.index = index
+        self.count = count
+        self.key = key
+        self.member = f"shard-{index}"
+        self.ring = HashRing([f"shard-{i}" for i in range(count)], vnodes=vnodes)
+
+    @classmethod
+    def from_config(cls, config=None, index=None, count=None):
+        """Crea la partición con shard_count/shard_by de config.yaml (SHARD_COUNT/SHARD_INDEX tienen prioridad)."""
+        config = CONFIG if config is None else config
+        if count is None:
+            count = int(os.getenv("SHARD_COUNT") or config.get("shard_count", 1))
+        if index is None and config.get("shard_index") is not None:
+            index = config["shard_index"]
+        elif index is None:
+            # Sin sharding no hay índice que deducir: el hostname de un Deployment no es un ordinal
+            index = shard_index_from_env() if count > 1 else 0
+        return cls(index=index, count=count, key=config.get("shard_by", "name"))
+
+    @property
+    def enabled(self):
+        return self.count > 1
+
+    def owns_key(self, key):
+        return not self.enabled or self.ring.owner(key) == self.member
+
+    def owns(self, app):
+        if not self.enabled:
+            return True
+        if self.key == "project":
+            return self.owns_key(app.get("spec", {}).get("project") or "")
+        return self.owns_key(app.get("metadata", {}).get("name") or "")
+
+    def select(self, apps):
+        """Filtra la lista de aplicaciones a las de esta réplica."""
+        if not self.enabled:
+            return apps
+        return [app for app in apps if self.owns(app)]
+
+    def owned_projects(self, client):
+        """Proyectos de esta réplica para filtrar /applications en ArgoCD (projects=).
+
+        Devuelve None si el filtrado debe hacerse en el cliente: sharding desactivado, partición
+        por nombre (ArgoCD no filtra por hash) o error al listar los proyectos.
+        """
+        if not self.enabled or self.key != "project":
+            return None
+        projects = client.get_projects()
+        if projects is None:
+            log.warning("⚠️ No se pudieron listar los proyectos: se filtrará la partición en el cliente.")
+            return None
+        return [project for project in projects if self.owns_key(project)]
@@ -1,28 +1,295 @@
-import requests
-from script_py.config import Config
+import queue
+import threading
+import time
+from script_py.config import Config, CONFIG
+from script_py.logger import get_logger
+from script_py.metrics import observe_slack_delivery
+from script_py.lazy import lazy_import
+
+requests = lazy_import("requests")
+
+log = get_logger("slack_notifier")
+
+# Slack admite como máximo 50 bloques por mensaje
+MAX_BLOCKS_PER_MESSAGE = 50
+# ...y 3000 caracteres por bloque de texto
+MAX_BLOCK_TEXT = 3000
+DEFAULT_TIMEOUT = 10
+
+
+def build_block(app_name, status, attempts, action="", details=None):
+    """Bloque de Slack con el estado de una aplicación y, si lo hay, su diagnóstico."""
+    text = (
+        f"*Aplicación:* `{app_name}`\n"
+        f"*Estado:* `{status}`\n"
+        f"*Intentos:* `{attempts}`\n"
+        f"*Acción:* {action}\n"
+    )
+    if details:
+        text += f"*Diagnóstico:*\n{details}\n"
+    if len(text) > MAX_BLOCK_TEXT:
+        text = text[:MAX_BLOCK_TEXT - 1] + "…"
+    return {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": text,
+        }
+    }
+
 
 class SlackNotifier:
     @staticmethod
     def send_notification(app_name, status, attempts, action=""):
         message = {
             "text": f"⚠️ *Estado de la aplicación:*",
-            "blocks": [
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": (
-                            f"*Aplicación:* `{app_name}`\n"
-                            f"*Estado:* `{status}`\n"
-                            f"*Intentos:* `{attempts}`\n"
-                            f"*Acción:* {action}\n"
-                        )
-                    }
-                }
-            ]
+            "blocks": [build_block(app_name, status, attempts, action)]
         }
+        started = time.perf_counter()
+        status = "error"
         try:
-            response = requests.post(Config.SLACK_WEBHOOK_URL, json=message)
+            response = requests.post(Config.SLACK_WEBHOOK_URL, json=message, timeout=DEFAULT_TIMEOUT)
+            status = response.status_code
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
-            print(f"❌ Error al enviar notificación a Slack: {e}")
\ No newline at end of file
+            log.error("❌ Error al enviar notificación a Slack: %s", e)
+        finally:
+            observe_slack_delivery(status, time.perf_counter() - started)
+
+
+class _Flush:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """Envía las notificaciones a Slack desde un hilo en segundo plano.
+
+    `notify()` nunca bloquea: encola la alerta y vuelve. El hilo agrupa las alertas pendientes
+    en mensajes de hasta `batch_size` aplicaciones, que se envían al final de cada ciclo
+    (`flush()`) o tras `batch_window` segundos. Cada ciclo (hasta el siguiente `flush()`) está
+    limitado a `max_messages` mensajes; las alertas que no caben se resumen en el último y se
+    vuelven a avisar en el siguiente. Las respuestas 429 respetan Retry-After.
+
+    Una alerta se descarta como repetida si coincide (estado y nivel de escalada) con la que
+    está en cola para la aplicación o con la última entregada. Con `state_store` la última
+    entregada se guarda en el AppStateStore y la deduplicación se mantiene entre ejecuciones
+    (--once); las alertas que no llegan a Slack no cuentan como entregadas.
+    """
+
+    def __init__(self, webhook_url=None, batch_size=20, max_messages=5, batch_window=30, max_queue=1000, max_retries=3, timeout=DEFAULT_TIMEOUT, sleep=time.sleep, state_store=None):
+        self.webhook_url = webhook_url or Config.SLACK_WEBHOOK_URL
+        self.batch_size = min(batch_size, MAX_BLOCKS_PER_MESSAGE - 1)
+        self.max_messages = max_messages
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.sleep = sleep
+        self.session = requests.Session()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.state_store = state_store
+        # Alertas en cola y (sin state_store) entregadas: {aplicación: (estado, nivel)}
+        self._queued = {}
+        self._delivered = {}
+        # Mensajes enviados desde el último flush(): solo los usa el hilo de envío
+        self._cycle_messages = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"queued": 0, "deduplicated": 0, "dropped": 0, "suppressed": 0, "messages": 0, "throttled": 0, "errors": 0}
+
+    @classmethod
+    def from_config(cls, config=None):
+        config = CONFIG if config is None else config
+        return cls(
+            batch_size=config.get("slack_batch_size", 20),
+            max_messages=config.get("slack_max_messages_per_cycle", 5),
+            batch_window=config.get("slack_batch_window", 30),
+        )
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slack-dispatcher", daemon=True)
+                self._thread.start()
+
+    def attach_state(self, state_store):
+        """Guarda la última alerta entregada de cada aplicación en `state_store` (persistido)."""
+        self.state_store = state_store
+
+    def _last_alert(self, app_name):
+        # Se llama con el lock tomado
+        if app_name in self._queued:
+            return self._queued[app_name]
+        if self.state_store is not None:
+            return self.state_store.last_alert(app_name)
+        return self._delivered.get(app_name)
+
+    def would_notify(self, app_name, status, level=0):
+        """True si una alerta con este estado y nivel de escalada no se descartaría como repetida."""
+        with self._lock:
+            return self._last_alert(app_name) != (status, level)
+
+    def notify(self, app_name, status, attempts=0, action="", details=None, level=0):
+        """Encola una alerta (`details`: diagnóstico opcional; `level`: nivel de escalada).
+
+        Devuelve False si se descartó (duplicada o cola llena).
+        """
+        alert = (app_name, status, attempts, action, details, level)
+        with self._lock:
+            if self._last_alert(app_name) == (status, level):
+                self.stats["deduplicated"] += 1
+                return False
+            self._queued[app_name] = (status, level)
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+            # La alerta no salió: la siguiente observación debe poder avisar
+            self._forget([alert])
+            return False
+        with self._lock:
+            self.stats["queued"] += 1
+        return True
+
+    def resolve(self, app_name):
+        """Olvida la última alerta de una aplicación recuperada para volver a avisar si empeora."""
+        with self._lock:
+            self._queued.pop(app_name, None)
+            self._delivered.pop(app_name, None)
+        if self.state_store is not None:
+            self.state_store.clear_alert(app_name)
+
+    def flush(self, wait=False, timeout=None):
+        """Marca el fin de un ciclo: las alertas pendientes se envían ya."""
+        if self._thread is None:
+            return
+        marker = _Flush()
+        self._queue.put(marker)
+        if wait:
+            marker.done.wait(timeout)
+
+    def close(self, timeout=None):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        pending = []
+        deadline = None
+        while True:
+            wait = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, tuple):
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.batch_window
+                continue
+
+            self._send_batch(pending)
+            pending = []
+            deadline = None
+            if isinstance(item, _Flush):
+                self._cycle_messages = 0
+                item.done.set()
+            elif item is _STOP:
+                return
+
+    def _send_batch(self, alerts):
+        if not alerts:
+            return
+        batches = [alerts[i:i + self.batch_size] for i in range(0, len(alerts), self.batch_size)]
+        # El límite es por ciclo: las ventanas de batch_window anteriores ya gastaron parte
+        budget = max(self.max_messages - self._cycle_messages, 0)
+        unsent = batches[budget:]
+        suppressed = sum(len(batch) for batch in unsent)
+        batches = batches[:budget]
+        self._cycle_messages += len(batches)
+        for index, batch in enumerate(batches):
+            blocks = [build_block(*alert[:5]) for alert in batch]
+            if suppressed and index == len(batches) - 1:
+                blocks.append({
+                    "type": "context",
+                    "elements": [{"type": "mrkdwn", "text": f"➕ {suppressed} aplicaciones más no incluidas (límite de mensajes por ciclo): se avisarán en el siguiente."}],
+                })
+            if self._post({"text": f"⚠️ *Estado de {len(batch)} aplicaciones:*", "blocks": blocks}):
+                self._mark_delivered(batch)
+            else:
+                self._forget(batch)
+        if suppressed:
+            self.stats["suppressed"] += suppressed
+            # Sin mensaje que las resuma (presupuesto agotado) o solo contadas: se vuelven a avisar
+            # en el siguiente ciclo en lugar de darlas por enviadas
+            self._forget([alert for batch in unsent for alert in batch])
+            log.warning("⚠️ Límite de mensajes a Slack alcanzado: %s alertas pendientes para el siguiente ciclo.", suppressed)
+
+    def _forget(self, alerts):
+        """Olvida las alertas no enviadas para que una nueva observación vuelva a encolarlas."""
+        with self._lock:
+            for app_name, status, _, _, _, level in alerts:
+                if self._queued.get(app_name) == (status, level):
+                    del self._queued[app_name]
+
+    def _mark_delivered(self, alerts):
+        with self._lock:
+            for app_name, status, _, _, _, level in alerts:
+                if self._queued.get(app_name) == (status, level):
+                    del self._queued[app_name]
+                if self.state_store is not None:
+                    self.state_store.record_alert(app_name, status, level)
+                else:
+                    self._delivered[app_name] = (status, level)
+
+    def _post(self, message):
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self.session.post(self.webhook_url, json=message, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                observe_slack_delivery("error", time.perf_counter() - started)
+                return self._failed(e)
+            observe_slack_delivery(response.status_code, time.perf_counter() - started)
+            if response.status_code == 429 and attempt < self.max_retries:
+                self.stats["throttled"] += 1
+                try:
+                    retry_after = float(response.headers.get("Retry-After", 1))
+                except ValueError:
+                    retry_after = 1
+                log.warning("⏳ Slack limitó el envío (429). Reintentando en %.0fs...", retry_after)
+                self.sleep(retry_after)
+                continue
+            try:
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                return self._failed(e)
+            self.stats["messages"] += 1
+            return True
+        return False
+
+    def _failed(self, error):
+        self.stats["errors"] += 1
+        log.error("❌ Error al enviar notificación a Slack: %s", error)
+        return False
+
+
+_default_dispatcher = None
+_default_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Devuelve el despachador de notificaciones compartido por todo el proceso."""
+    global _default_dispatcher
+    if _default_dispatcher is None:
+        with _default_dispatcher_lock:
+            if _default_dispatcher is None:
+                _default_dispatcher = NotificationDispatcher.from_config()
+    return _default_dispatcher
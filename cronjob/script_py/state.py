@@ -0,0 +1,289 @@
+import sys
+import threading
+import time
+from enum import IntEnum
+
+
+class HealthStatus(IntEnum):
+    """Estados de salud de ArgoCD almacenados como enteros pequeños."""
+    UNKNOWN = 0
+    HEALTHY = 1
+    PROGRESSING = 2
+    DEGRADED = 3
+    SUSPENDED = 4
+    MISSING = 5
+    ERROR = 6
+
+    @classmethod
+    def parse(cls, value):
+        return _HEALTH_BY_NAME.get(value, cls.UNKNOWN)
+
+    @property
+    def label(self):
+        return _HEALTH_LABELS[self]
+
+
+class SyncStatus(IntEnum):
+    """Estados de sincronización de ArgoCD almacenados como enteros pequeños."""
+    UNKNOWN = 0
+    SYNCED = 1
+    OUT_OF_SYNC = 2
+
+    @classmethod
+    def parse(cls, value):
+        return _SYNC_BY_NAME.get(value, cls.UNKNOWN)
+
+    @property
+    def label(self):
+        return _SYNC_LABELS[self]
+
+
+_HEALTH_LABELS = {
+    HealthStatus.UNKNOWN: "Unknown",
+    HealthStatus.HEALTHY: "Healthy",
+    HealthStatus.PROGRESSING: "Progressing",
+    HealthStatus.DEGRADED: "Degraded",
+    HealthStatus.SUSPENDED: "Suspended",
+    HealthStatus.MISSING: "Missing",
+    HealthStatus.ERROR: "Error",
+}
+_HEALTH_BY_NAME = {label: status for status, label in _HEALTH_LABELS.items()}
+_SYNC_LABELS = {
+    SyncStatus.UNKNOWN: "Unknown",
+    SyncStatus.SYNCED: "Synced",
+    SyncStatus.OUT_OF_SYNC: "OutOfSync",
+}
+_SYNC_BY_NAME = {label: status for status, label in _SYNC_LABELS.items()}
+
+
+class AppState:
+    """Estado registrado de una aplicación. Usa __slots__ para ocupar poca memoria por aplicación."""
+
+    __slots__ = (
+        "name", "health", "sync", "revision",
+        "first_seen", "last_seen", "last_change",
+        "sync_attempts", "refresh_attempts", "last_action", "last_action_at",
+        # Última alerta entregada a Slack (estado y nivel de escalada): deduplica entre ejecuciones
+        "alert_status", "alert_level",
+    )
+
+    def __init__(self, name, health=HealthStatus.UNKNOWN, sync=SyncStatus.UNKNOWN, revision=None, now=0.0):
+        self.name = name
+        self.health = health
+        self.sync = sync
+        self.revision = revision
+        self.first_seen = now
+        self.last_seen = now
+        self.last_change = now
+        self.sync_attempts = 0
+        self.refresh_attempts = 0
+        self.last_action = None
+        self.last_action_at = 0.0
+        self.alert_status = None
+        self.alert_level = 0
+
+    def as_tuple(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    @classmethod
+    def from_tuple(cls, values):
+        state = cls.__new__(cls)
+        # Los registros guardados antes de añadir un campo no lo incluyen (o lo traen a NULL)
+        values = tuple(values) + (None,) * (len(cls.__slots__) - len(values))
+        for slot, value in zip(cls.__slots__, values):
+            setattr(state, slot, value)
+        state.health = HealthStatus(state.health)
+        state.sync = SyncStatus(state.sync)
+        state.alert_level = state.alert_level or 0
+        return state
+
+    def __repr__(self):
+        return f"AppState({self.name!r}, {self.health.label}, {self.sync.label}, revision={self.revision!r})"
+
+
+class AppStateStore:
+    """Almacén del estado de todas las aplicaciones, seguro para usar desde varios hilos.
+
+    Con un `backend` de persistencia el estado se carga de forma perezosa en el primer acceso
+    y `flush()` escribe solo los registros que cambiaron desde la última escritura.
+    """
+
+    def __init__(self, clock=time.time, backend=None):
+        self._states = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._backend = backend
+        self._loaded = backend is None
+        self._dirty = set()
+        self._removed = set()
+
+    def _ensure_loaded(self):
+        # Se llama con el lock tomado
+        if not self._loaded:
+            self._states = {sys.intern(name): AppState.from_tuple(values) for name, values in self._backend.load().items()}
+            self._loaded = True
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._states)
+
+    def __contains__(self, name):
+        with self._lock:
+            self._ensure_loaded()
+            return name in self._states
+
+    def get(self, name):
+        with self._lock:
+            self._ensure_loaded()
+            return self._states.get(name)
+
+    def names(self):
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._states)
+
+    def counts(self):
+        """Número de aplicaciones por (salud, sincronización), con los nombres de ArgoCD."""
+        totals = {}
+        with self._lock:
+            self._ensure_loaded()
+            for state in self._states.values():
+                key = (state.health, state.sync)
+                totals[key] = totals.get(key, 0) + 1
+        return {(health.label, sync.label): count for (health, sync), count in totals.items()}
+
+    def observe(self, name, health, sync, revision):
+        """Registra el estado actual de una aplicación.
+
+        Devuelve una copia del estado anterior (o None si la aplicación es nueva).
+        """
+        health = HealthStatus.parse(health)
+        sync = SyncStatus.parse(sync)
+        revision = sys.intern(revision) if isinstance(revision, str) else revision
+        now = self._clock()
+        with self._lock:
+            self._ensure_loaded()
+            state = self._states.get(name)
+            if state is None:
+                name = sys.intern(name)
+                self._states[name] = AppState(name, health, sync, revision, now)
+                self._dirty.add(name)
+                self._removed.discard(name)
+                return None
+            previous = AppState.from_tuple(state.as_tuple())
+            if (state.health, state.sync, state.revision) != (health, sync, revision):
+                state.last_change = now
+                self._dirty.add(name)
+            state.health = health
+            state.sync = sync
+            state.revision = revision
+            # last_seen no marca el registro como modificado: se persiste con el siguiente cambio
+            state.last_seen = now
+            return previous
+
+    def record_action(self, name, action):
+        """Registra la última acción ejecutada sobre una aplicación y cuenta los intentos."""
+        with self._lock:
+            self._ensure_loaded()
+            state = self._states.get(name)
+            if state is None:
+                return
+            if action == "sync":
+                state.sync_attempts += 1
+            elif action == "refresh":
+                state.refresh_attempts += 1
+            state.last_action = action
+            state.last_action_at = self._clock()
+            self._dirty.add(name)
+
+    def last_alert(self, name):
+        """Última alerta entregada de una aplicación: (estado, nivel de escalada) o None."""
+        with self._lock:
+            self._ensure_loaded()
+            state = self._states.get(name)
+            if state is None or state.alert_status is None:
+                return None
+            return state.alert_status, state.alert_level
+
+    def record_alert(self, name, status, level=0):
+        """Registra la alerta que acaba de entregarse a Slack."""
+        with self._lock:
+            self._ensure_loaded()
+            state = self._states.get(name)
+            if state is not None and (state.alert_status, state.alert_level) != (status, level):
+                state.alert_status = status
+                state.alert_level = level
+                self._dirty.add(name)
+
+    def clear_alert(self, name):
+        """Olvida la última alerta de una aplicación recuperada para volver a avisar si empeora."""
+        with self._lock:
+            self._ensure_loaded()
+            state = self._states.get(name)
+            if state is not None and state.alert_status is not None:
+                state.alert_status = None
+                state.alert_level = 0
+                self._dirty.add(name)
+
+    def reset_attempts(self, name):
+        with self._lock:
+            self._ensure_loaded()
+            state = self._states.get(name)
+            if state is not None and (state.sync_attempts or state.refresh_attempts):
+                state.sync_attempts = 0
+                state.refresh_attempts = 0
+                self._dirty.add(name)
+
+    def remove(self, name):
+        with self._lock:
+            self._ensure_loaded()
+            if self._states.pop(name, None) is not None:
+                self._dirty.discard(name)
+                self._removed.add(name)
+
+    def prune(self, names):
+        """Elimina las aplicaciones que ya no están en `names` (borradas de ArgoCD)."""
+        names = set(names)
+        with self._lock:
+            self._ensure_loaded()
+            for name in [name for name in self._states if name not in names]:
+                del self._states[name]
+                self._dirty.discard(name)
+                self._removed.add(name)
+
+    def flush(self):
+        """Escribe en el backend solo los registros modificados. Devuelve cuántos se escribieron."""
+        if self._backend is None:
+            return 0
+        with self._lock:
+            if not self._loaded:
+                return 0
+            changed = {name: self._states[name].as_tuple() for name in self._dirty}
+            removed = set(self._removed)
+            self._dirty.clear()
+            self._removed.clear()
+        if changed or removed:
+            self._backend.save(changed, removed)
+        return len(changed) + len(removed)
+
+    def snapshot(self):
+        """Copia compacta del almacén: {nombre: tupla de campos}."""
+        with self._lock:
+            self._ensure_loaded()
+            return {name: state.as_tuple() for name, state in self._states.items()}
+
+    def restore(self, snapshot):
+        """Reemplaza el contenido del almacén por el de una instantánea."""
+        states = {name: AppState.from_tuple(values) for name, values in snapshot.items()}
+        with self._lock:
+            self._states = states
+            self._loaded = True
+
+    @staticmethod
+    def diff(old, new):
+        """Compara dos instantáneas y devuelve (añadidas, eliminadas, modificadas)."""
+        added = new.keys() - old.keys()
+        removed = old.keys() - new.keys()
+        changed = {name for name in new.keys() & old.keys() if new[name] != old[name]}
+        return added, removed, changed
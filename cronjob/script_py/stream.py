@@ -0,0 +1,126 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from script_py.logger import get_logger
+from script_py.lazy import lazy_import
+
+requests = lazy_import("requests")
+
+log = get_logger("stream")
+
+# Tipo de evento sintético emitido por la resincronización completa periódica
+RESYNC = "RESYNC"
+DELETED = "DELETED"
+
+
+class ApplicationStream:
+    """Generador de eventos de cambio de aplicaciones a partir del stream de ArgoCD.
+
+    Reconecta reanudando desde el último resourceVersion visto, con backoff exponencial tras un
+    error o una conexión que se cerró sin eventos (el backoff se reinicia al recibir uno) y,
+    cada `resync_interval` segundos, emite una resincronización completa (evento RESYNC
+    por aplicación) como red de seguridad ante eventos perdidos.
+    """
+
+    def __init__(self, client, resync_interval=3600, min_backoff=1, max_backoff=60, clock=time.monotonic, sleep=time.sleep):
+        self.client = client
+        self.resync_interval = resync_interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.sleep = sleep
+        self.resource_version = None
+        self.next_resync = None
+        self.reconnects = 0
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _resync_due(self):
+        return self.next_resync is None or self.clock() >= self.next_resync
+
+    def _resync(self):
+        log.info("🔁 Resincronización completa de aplicaciones...")
+        self.next_resync = self.clock() + self.resync_interval
+        for app in self.client.get_applications():
+            yield RESYNC, app
+
+    def events(self):
+        backoff = self.min_backoff
+        while not self._stopped.is_set():
+            if self._resync_due():
+                yield from self._resync()
+            received = False
+            try:
+                for event_type, app in self.client.watch_applications(resource_version=self.resource_version):
+                    received = True
+                    backoff = self.min_backoff
+                    resource_version = app.get("metadata", {}).get("resourceVersion")
+                    if resource_version:
+                        self.resource_version = resource_version
+                    yield event_type, app
+                    if self._stopped.is_set():
+                        return
+                    if self._resync_due():
+                        yield from self._resync()
+                # El servidor cerró el stream: reconectar de inmediato solo si llegó algún evento
+                self.reconnects += 1
+                if not received:
+                    log.warning("⚠️ El stream se cerró sin eventos. Reconectando en %ss...", backoff)
+                    self.sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self.reconnects += 1
+                log.error("❌ Stream interrumpido (%s). Reconectando en %ss...", e, backoff)
+                self.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+
+class EventDispatcher:
+    """Reparte eventos entre un pool de hilos con contrapresión.
+
+    Los eventos pendientes de una misma aplicación se fusionan (solo se procesa el más reciente)
+    y una aplicación nunca se procesa en dos hilos a la vez. Cuando hay `max_pending`
+    aplicaciones en espera, el lector se bloquea y deja de consumir el stream.
+    """
+
+    def __init__(self, handler, max_workers=5, max_pending=100):
+        self.handler = handler
+        self.max_workers = max_workers
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.latest = {}
+        self.dispatched = 0
+        self.coalesced = 0
+
+    def _drain(self, app_name):
+        try:
+            while True:
+                with self.lock:
+                    event = self.latest[app_name]
+                try:
+                    self.handler(*event)
+                except Exception as e:
+                    log.error("❌ Error al procesar el evento de '%s': %s", app_name, e, extra={"app": app_name})
+                with self.lock:
+                    # Si llegó un evento más reciente mientras se procesaba, procesarlo también
+                    if self.latest[app_name] is event:
+                        del self.latest[app_name]
+                        return
+        finally:
+            self.slots.release()
+
+    def run(self, events):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for event_type, app in events:
+                app_name = app.get("metadata", {}).get("name")
+                with self.lock:
+                    queued = app_name in self.latest
+                    self.latest[app_name] = (event_type, app)
+                if queued:
+                    self.coalesced += 1
+                    continue
+                self.slots.acquire()
+                self.dispatched += 1
+                executor.submit(self._drain, app_name)
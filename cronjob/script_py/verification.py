@@ -0,0 +1,48 @@
+import time
+from script_py.logger import get_logger
+
+log = get_logger("verification")
+
+# Fases de operación de ArgoCD tras las que no tiene sentido seguir esperando
+FAILED_PHASES = ("Failed", "Error")
+
+
+def converged(status):
+    """True si la aplicación terminó su operación y quedó Healthy y Synced."""
+    return status is not None and status.health == "Healthy" and status.sync == "Synced" and status.operation != "Running"
+
+
+def failed(status):
+    return status is not None and status.operation in FAILED_PHASES
+
+
+def wait_until_converged(client, app_names, timeout=60, interval=2, max_interval=15, selector=None, projects=None, clock=time.monotonic, sleep=time.sleep):
+    """Consulta el estado de un lote de aplicaciones hasta que convergen o vence el plazo.
+
+    Cada consulta es una sola solicitud (ArgoCDClient.get_statuses) para todo el lote, y
+    el intervalo entre consultas se duplica hasta `max_interval`. Se deja de esperar por
+    una aplicación cuando converge, cuando su operación falla o si ya no existe.
+    Devuelve (estados, pendientes): el último AppStatus de cada aplicación (None si no
+    existe o no se pudo consultar) y el conjunto de las que no convergieron.
+    """
+    pending = set(app_names)
+    statuses = dict.fromkeys(pending)
+    deadline = clock() + timeout
+    delay = interval
+    while pending:
+        batch = client.get_statuses(pending, selector=selector, projects=projects)
+        if batch is not None:
+            for app_name in list(pending):
+                status = statuses[app_name] = batch.get(app_name)
+                if converged(status):
+                    pending.discard(app_name)
+                elif status is None or failed(status):
+                    # Eliminada o con la operación fallida: no va a converger esperando
+                    pending.discard(app_name)
+        if not pending or clock() + delay > deadline:
+            break
+        sleep(delay)
+        delay = min(delay * 2, max_interval)
+    unconverged = {app_name for app_name, status in statuses.items() if not converged(status)}
+    log.debug("🔁 Verificación de %s aplicaciones: %s sin converger.", len(statuses), len(unconverged))
+    return statuses, unconverged
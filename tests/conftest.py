@@ -0,0 +1,4 @@
+import os
+
+# Usar el config.yaml del repositorio en lugar de /app/config.yaml (ruta del contenedor)
+os.environ.setdefault("CONFIG_FILE", os.path.join(os.path.dirname(__file__), "../cronjob/config.yaml"))
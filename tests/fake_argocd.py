@@ -0,0 +1,288 @@
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_app(name, health="Healthy", sync="Synced", resource_version="1", project="default", payload_bytes=0):
+    """Construye una aplicación de ArgoCD mínima.
+
+    `payload_bytes` añade recursos de relleno para simular documentos grandes.
+    """
+    app = {
+        "metadata": {"name": name, "resourceVersion": resource_version},
+        "spec": {"project": project},
+        "status": {"health": {"status": health}, "sync": {"status": sync}},
+    }
+    if payload_bytes:
+        resource = {"kind": "Deployment", "name": "x" * 40, "status": "Synced", "health": {"status": "Healthy"}}
+        count = max(1, payload_bytes // len(json.dumps(resource)))
+        app["status"]["resources"] = [dict(resource, name=f"{name}-{i}") for i in range(count)]
+    return app
+
+
+def parse_mix(text):
+    """Convierte "Healthy=0.9,Degraded=0.1" en {"Healthy": 0.9, "Degraded": 0.1}."""
+    mix = {}
+    for part in text.split(","):
+        if part:
+            key, value = part.split("=")
+            mix[key] = float(value)
+    return mix
+
+
+def synthesize_apps(count, health_mix=None, sync_mix=None, projects=1, payload_bytes=0, seed=0):
+    """Genera `count` aplicaciones con la proporción de estados indicada."""
+    rng = random.Random(seed)
+    health_mix = health_mix or {"Healthy": 1.0}
+    sync_mix = sync_mix or {"Synced": 1.0}
+    healths = rng.choices(list(health_mix), weights=list(health_mix.values()), k=count)
+    syncs = rng.choices(list(sync_mix), weights=list(sync_mix.values()), k=count)
+    return [
+        make_app(f"app-{i:05d}", healths[i], syncs[i], project=f"project-{i % projects}", payload_bytes=payload_bytes)
+        for i in range(count)
+    ]
+
+
+def _pick(source, target, path):
+    if not isinstance(source, dict) or path[0] not in source:
+        return
+    if len(path) == 1:
+        target[path[0]] = source[path[0]]
+    else:
+        _pick(source[path[0]], target.setdefault(path[0], {}), path[1:])
+
+
+def project_document(document, paths):
+    projected = {}
+    for path in paths:
+        _pick(document, projected, path)
+    return projected
+
+
+def project_fields(document, fields):
+    """Aplica el parámetro fields= de ArgoCD ("items.metadata.name,...") a una respuesta de lista."""
+    paths = [field.split(".")[1:] for field in fields.split(",") if field.startswith("items.")]
+    items = [project_document(item, paths) for item in document["items"]]
+    return {"metadata": document.get("metadata", {}), "items": items}
+
+
+class FakeArgoCD:
+    """Servidor HTTP local que imita la API de ArgoCD.
+
+    - GET /api/v1/applications devuelve `apps` (respetando fields=, projects= y name=).
+    - GET /api/v1/applications/{name} devuelve una aplicación (respetando fields=, con ETag; 304
+      si coincide con If-None-Match, salvo con `etags=False`); POST .../sync la acepta.
+    - GET /api/v1/applications/{name}/resource-tree devuelve `resource_trees[name]` (sin nodos
+      por defecto) y .../managed-resources los `managed_resources[name]` que coinciden con
+      kind=, resourceName=, namespace= y group=.
+    - GET /api/v1/projects devuelve los proyectos de las aplicaciones.
+    - GET /api/v1/stream/applications emite el siguiente guion de `stream_scripts`
+      (una lista de eventos por conexión) y cierra la conexión al terminar.
+    - GET /_stats devuelve el número de solicitudes y bytes transferidos.
+    Cada respuesta se retrasa `latency` segundos y falla con 500 con probabilidad `error_rate`.
+    Con `record=True` las solicitudes quedan registradas en `requests` como (método, ruta, query).
+    """
+
+    def __init__(self, apps=None, stream_scripts=None, latency=0, error_rate=0, host="127.0.0.1", port=0, record=True, seed=0, etags=True, resource_trees=None, managed_resources=None):
+        self.apps = list(apps or [])
+        self.resource_trees = dict(resource_trees or {})
+        self.managed_resources = dict(managed_resources or {})
+        self.stream_scripts = list(stream_scripts or [])
+        self.latency = latency
+        self.error_rate = error_rate
+        self.record = record
+        self.etags = etags
+        self.requests = []
+        self.stats = {"requests": 0, "errors": 0, "not_modified": 0, "bytes_sent": 0, "bytes_received": 0}
+        self.lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._list_cache = {}
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.server.request_queue_size = 1024
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def api(self):
+        return f"http://127.0.0.1:{self.server.server_port}/api/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _next_script(self):
+        with self.lock:
+            return self.stream_scripts.pop(0) if self.stream_scripts else []
+
+    def _find(self, name):
+        with self.lock:
+            if len(self._list_cache.get("by_name", {})) != len(self.apps):
+                self._list_cache["by_name"] = {app["metadata"]["name"]: app for app in self.apps}
+            return self._list_cache["by_name"].get(name)
+
+    def _list_body(self, query):
+        apps = self.apps
+        if "projects" in query:
+            projects = set(query["projects"].split(","))
+            apps = [app for app in apps if app.get("spec", {}).get("project") in projects]
+        if "name" in query:
+            apps = [app for app in apps if app["metadata"]["name"] == query["name"]]
+        document = {"metadata": {"resourceVersion": "1"}, "items": apps}
+        if "fields" in query:
+            document = project_fields(document, query["fields"])
+        return json.dumps(document).encode()
+
+    def _managed_body(self, name, query):
+        filters = (("kind", "kind"), ("resourceName", "name"), ("namespace", "namespace"), ("group", "group"))
+        items = [
+            item for item in self.managed_resources.get(name, [])
+            if all(item.get(field) == query[param] for param, field in filters if param in query)
+        ]
+        return json.dumps({"items": items}).encode()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _record(self, received=0):
+                url = urlparse(self.path)
+                # Los parámetros repetidos (projects=a&projects=b) se unen con comas
+                query = {key: ",".join(values) for key, values in parse_qs(url.query).items()}
+                with fake.lock:
+                    fake.stats["requests"] += 1
+                    fake.stats["bytes_received"] += received
+                    if fake.record:
+                        fake.requests.append((self.command, url.path, query))
+                return url.path, query
+
+            def _fail(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                with fake.lock:
+                    failed = fake.error_rate and fake._random.random() < fake.error_rate
+                    if failed:
+                        fake.stats["errors"] += 1
+                if failed:
+                    self._send_body(b'{"error": "injected"}', status=500)
+                return failed
+
+            def _send_body(self, body, status=200, etag=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                # Antes de escribir: el cliente puede leer las estadísticas en cuanto recibe el cuerpo
+                with fake.lock:
+                    fake.stats["bytes_sent"] += len(body)
+                self.wfile.write(body)
+
+            def _send_json(self, payload, status=200):
+                self._send_body(json.dumps(payload).encode(), status)
+
+            def do_GET(self):
+                path, query = self._record()
+                if path == "/_stats":
+                    with fake.lock:
+                        stats = dict(fake.stats)
+                    self._send_json(stats)
+                    return
+                if self._fail():
+                    return
+                if path == "/api/v1/applications":
+                    self._send_body(fake._list_body(query))
+                elif path == "/api/v1/projects":
+                    projects = sorted({app.get("spec", {}).get("project") for app in fake.apps})
+                    self._send_json({"items": [{"metadata": {"name": project}} for project in projects]})
+                elif path == "/api/v1/stream/applications":
+                    self._stream(fake._next_script())
+                elif path.startswith("/api/v1/applications/") and path.endswith("/resource-tree"):
+                    name = path.split("/")[-2]
+                    self._send_body(json.dumps(fake.resource_trees.get(name, {"nodes": []})).encode())
+                elif path.startswith("/api/v1/applications/") and path.endswith("/managed-resources"):
+                    self._send_body(fake._managed_body(path.split("/")[-2], query))
+                elif path.startswith("/api/v1/applications/"):
+                    app = fake._find(path.rsplit("/", 1)[-1])
+                    if app is None:
+                        self._send_json({}, status=404)
+                        return
+                    if "fields" in query:
+                        app = project_document(app, [field.split(".") for field in query["fields"].split(",")])
+                    body = json.dumps(app).encode()
+                    etag = f'"{hashlib.md5(body).hexdigest()}"' if fake.etags else None
+                    if etag and self.headers.get("If-None-Match") == etag:
+                        with fake.lock:
+                            fake.stats["not_modified"] += 1
+                        self._send_body(b"", status=304, etag=etag)
+                    else:
+                        self._send_body(body, etag=etag)
+                else:
+                    self._send_json({}, status=404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                self._record(received=length)
+                if self._fail():
+                    return
+                self._send_json({})
+
+            def _stream(self, events):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for event_type, app in events:
+                    line = json.dumps({"result": {"type": event_type, "application": app}}) + "\n"
+                    self.wfile.write(line.encode())
+                    self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+def main(argv=None):
+    """Levanta un servidor ArgoCD falso con una flota sintética (para benchmarks y pruebas manuales)."""
+    parser = argparse.ArgumentParser(description="Servidor ArgoCD falso")
+    parser.add_argument("--apps", type=int, default=100)
+    parser.add_argument("--health-mix", type=parse_mix, default={"Healthy": 0.9, "Degraded": 0.05, "Progressing": 0.05})
+    parser.add_argument("--sync-mix", type=parse_mix, default={"Synced": 0.9, "OutOfSync": 0.1})
+    parser.add_argument("--projects", type=int, default=1)
+    parser.add_argument("--payload-bytes", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    apps = synthesize_apps(args.apps, args.health_mix, args.sync_mix, args.projects, args.payload_bytes, args.seed)
+    fake = FakeArgoCD(apps=apps, latency=args.latency, error_rate=args.error_rate, port=args.port, record=False, seed=args.seed)
+    # La primera línea indica el puerto a quien lanzó el proceso
+    print(f"READY {fake.server.server_port}", flush=True)
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSlackWebhook:
+    """Webhook de Slack local que guarda los mensajes recibidos en `messages`.
+
+    `responses` es una lista de (código, cabeceras) que se devuelven en orden antes de
+    responder 200 a todo lo demás (por ejemplo [(429, {"Retry-After": "2"})]).
+    """
+
+    def __init__(self, responses=None):
+        self.responses = list(responses or [])
+        self.messages = []
+        self.attempts = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/services/T000/B000/XXX"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake.lock:
+                    fake.attempts += 1
+                    status, headers = fake.responses.pop(0) if fake.responses else (200, {})
+                    if status == 200:
+                        fake.messages.append(json.loads(body))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+        return Handler
@@ -4,22 +4,26 @@ import os
 # Agregar el directorio 'cronjob' al PYTHONPATH
 sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
 
+import json
 import pytest
 from unittest.mock import patch
-from script_py.argocd_client import ArgoCDClient
+from script_py.argocd_client import APPLICATION_FIELDS, ArgoCDClient
+from script_py.config import Config
 
-@patch("script_py.argocd_client.requests.get")
-def test_get_applications(mock_get):
+def test_get_applications():
     """
     Test the get_applications method of ArgoCDClient.
-    This test mocks the requests.get method to simulate a successful response from the ArgoCD API.
+    This test mocks the session's get method to simulate a successful response from the ArgoCD API.
     """
-    # Simular una respuesta exitosa de la API de ArgoCD
-    mock_get.return_value.status_code = 200
-    mock_get.return_value.json.return_value = {"items": [{"metadata": {"name": "app-1"}}]}
+    client = ArgoCDClient(token="test-token")
 
-    # Llamar al método que se está probando
-    apps = ArgoCDClient.get_applications()
+    with patch.object(client.session, "get") as mock_get:
+        # Simular una respuesta exitosa de la API de ArgoCD
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.iter_content.return_value = [b'{"items": [{"metadata": {"na', b'me": "app-1"}}]}']
+
+        # Llamar al método que se está probando
+        apps = client.get_applications()
 
     # Verificar que el resultado sea el esperado
     assert len(apps) == 1
@@ -27,8 +31,58 @@ def test_get_applications(mock_get):
 
     # Verificar que se haya llamado a la API con la URL correcta
     mock_get.assert_called_once_with(
-        f"{ArgoCDClient.Config.ARGOCD_API}/applications",
-        headers={"Authorization": f"Bearer {ArgoCDClient.Config.ARGOCD_TOKEN}"},
+        f"{Config.ARGOCD_API}/applications",
+        params={"fields": APPLICATION_FIELDS},
+        stream=True,
         verify=False,
         timeout=10
     )
+
+def test_session_headers_are_prebuilt():
+    """The auth header is built once on the shared session, not per call."""
+    client = ArgoCDClient(token="test-token")
+
+    assert client.session.headers["Authorization"] == "Bearer test-token"
+    assert client.session.headers["Connection"] == "keep-alive"
+
+def test_from_config_uses_per_endpoint_timeouts():
+    """Per-endpoint timeouts override request_timeout, which overrides the defaults of short calls (not stream or diagnosis)."""
+    client = ArgoCDClient.from_config({"request_timeout": 5, "timeouts": {"sync": 30}, "http_pool_size": 20})
+
+    assert client.timeouts == {"applications": 5, "sync": 30, "refresh": 5, "status": 5, "projects": 5, "resource_tree": 30, "managed_resources": 15, "stream": 300}
+    assert client.adapter._pool_maxsize == 20
+
+def test_pool_is_sized_for_the_adaptive_concurrency_limit():
+    """With adaptive concurrency the pool never blocks below concurrency_max."""
+    config = {"http_pool_size": 10, "adaptive_concurrency": True, "concurrency_max": 20}
+
+    assert ArgoCDClient.from_config(config).adapter._pool_maxsize == 20
+    assert ArgoCDClient.from_config(dict(config, adaptive_concurrency=False)).adapter._pool_maxsize == 10
+
+def test_pool_stats_counts_reused_connections():
+    """Connections opened by the pool are misses; further requests on them are hits."""
+    client = ArgoCDClient(token="test-token")
+    pool = client.adapter.poolmanager.connection_from_url("http://argocd.local")
+    pool.num_connections = 2
+    pool.num_requests = 10
+
+    assert client.pool_stats() == {"hits": 8, "misses": 2, "requests": 10}
+
+def test_get_applications_returns_compact_records():
+    """Only the fields the monitor reads are kept from each application."""
+    client = ArgoCDClient(token="test-token")
+    app = {
+        "metadata": {"name": "app-1", "resourceVersion": "7", "annotations": {"argocd.argoproj.io/revision": "abc", "other": "x"}},
+        "spec": {"project": "poc", "source": {"repoURL": "https://example.com/repo.git"}},
+        "status": {"health": {"status": "Degraded"}, "sync": {"status": "Synced", "revision": "abc"}, "resources": [{}] * 100},
+    }
+
+    with patch.object(client.session, "get") as mock_get:
+        mock_get.return_value.iter_content.return_value = [json.dumps({"items": [app]}).encode()]
+        apps = client.get_applications()
+
+    assert apps == [{
+        "metadata": {"name": "app-1", "resourceVersion": "7", "annotations": {"argocd.argoproj.io/revision": "abc"}},
+        "spec": {"project": "poc"},
+        "status": {"health": {"status": "Degraded"}, "sync": {"status": "Synced"}},
+    }]
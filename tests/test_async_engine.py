@@ -0,0 +1,59 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import asyncio
+from script_py.async_engine import run_cycle_async
+
+
+class FakeAsyncClient:
+    """Cliente falso que registra la concurrencia máxima observada."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.refreshed = []
+
+    async def refresh_app(self, app_name):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            self.refreshed.append(app_name)
+        finally:
+            self.in_flight -= 1
+
+    async def sync_app(self, app_name):
+        pass
+
+
+def evaluate(app):
+    return app["metadata"]["name"], "Degraded", ["refresh"]
+
+
+def make_apps(count):
+    return [{"metadata": {"name": f"app-{i}"}} for i in range(count)]
+
+
+def test_run_cycle_async_bounds_concurrency():
+    """No more than `concurrency` calls are in flight at once, and every app is processed."""
+    client = FakeAsyncClient()
+
+    summary = asyncio.run(run_cycle_async(make_apps(50), client, evaluate, concurrency=10, deadline=5))
+
+    assert summary == {"completed": 50, "skipped": 0, "timed_out": 0, "carry_over": []}
+    assert client.max_in_flight == 10
+    assert len(client.refreshed) == 50
+
+
+def test_run_cycle_async_cancels_after_deadline():
+    """Apps still pending when the cycle deadline passes are cancelled and carried over."""
+    client = FakeAsyncClient(delay=10)
+
+    summary = asyncio.run(run_cycle_async(make_apps(5), client, evaluate, concurrency=5, deadline=0.05))
+
+    assert summary == {"completed": 0, "skipped": 0, "timed_out": 5, "carry_over": [f"app-{i}" for i in range(5)]}
+    assert client.in_flight == 0
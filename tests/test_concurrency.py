@@ -0,0 +1,136 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import asyncio
+import threading
+import time
+from script_py.async_engine import run_cycle_async
+from script_py.concurrency import AIMDController, AdaptiveLimiter, AsyncAdaptiveLimiter
+from script_py.scheduler import ActionScheduler
+from tests.fake_argocd import make_app
+
+
+def test_limit_grows_additively_while_latency_is_low():
+    """Each healthy window raises the limit by one, up to the maximum."""
+    controller = AIMDController(initial=2, max_limit=4, window=5)
+
+    for _ in range(5 * 4):
+        controller.record(0.1)
+
+    assert controller.limit == 4
+
+
+def test_limit_halves_on_slow_or_failing_windows():
+    """A window whose p90 latency or error rate exceeds the target halves the limit."""
+    controller = AIMDController(initial=16, min_limit=2, max_limit=16, target_latency=1.0, window=10)
+
+    for _ in range(10):
+        controller.record(3.0)
+    assert controller.limit == 8
+
+    for index in range(10):
+        controller.record(0.1, error=index < 2)
+    assert controller.limit == 4
+
+    for _ in range(30):
+        controller.record(5.0)
+    assert controller.limit == 2
+
+
+def test_controller_only_counts_per_application_endpoints():
+    """Slow application listings do not shrink the limit; 429/5xx responses count as errors."""
+    controller = AIMDController(initial=4, max_limit=8, window=2)
+
+    controller.on_request("applications", 200, 30.0)
+    controller.on_request("statuses", 200, 30.0)
+    assert controller.limit == 4
+
+    controller.on_request("sync", 429, 0.1)
+    controller.on_request("refresh", 503, 0.1)
+    assert controller.limit == 2
+
+
+def test_adaptive_limiter_follows_the_current_limit():
+    """Threads never exceed the controller's limit, and a raised limit admits waiting threads."""
+    controller = AIMDController(initial=2, max_limit=3, window=1)
+    limiter = AdaptiveLimiter(controller)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with limiter:
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) == 2
+
+    controller.record(0.1)
+    assert controller.limit == 3
+
+
+def test_async_cycle_uses_the_adaptive_limiter():
+    """With an adaptive limiter the async engine keeps at most `limit` apps in flight."""
+    in_flight = []
+    peak = []
+
+    class Client:
+        async def refresh_app(self, app_name):
+            in_flight.append(app_name)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(app_name)
+
+    def evaluate(app):
+        return app["metadata"]["name"], "Degraded", ["refresh"]
+
+    limiter = AsyncAdaptiveLimiter(AIMDController(initial=3, max_limit=3))
+    apps = [make_app(f"app-{i}") for i in range(20)]
+
+    summary = asyncio.run(run_cycle_async(apps, Client(), evaluate, deadline=5, limiter=limiter))
+
+    assert summary["completed"] == 20
+    assert max(peak) == 3
+    assert limiter.active == 0
+
+
+def test_carried_over_apps_are_ordered_first():
+    """Apps left over from the previous cycle go ahead of the rest, then by severity."""
+    apps = [
+        make_app("healthy", health="Healthy"),
+        make_app("degraded", health="Degraded"),
+        make_app("late", health="Healthy"),
+    ]
+
+    ordered = ActionScheduler.order(apps, carry_over={"late"})
+
+    assert [app["metadata"]["name"] for app in ordered] == ["late", "degraded", "healthy"]
+
+
+def test_cancel_pending_returns_queued_applications():
+    """At the deadline, queued operations are dropped, reported and can be admitted again."""
+    release = threading.Event()
+    scheduler = ActionScheduler(lambda app_name, action: release.wait(5), rate=1000, burst=1000, workers=1)
+
+    scheduler.submit("app-1", ["refresh"])
+    scheduler.submit("app-2", ["sync"])
+    scheduler.submit("app-3", ["refresh"])
+    time.sleep(0.05)
+
+    assert scheduler.drain(timeout=0.05) is False
+    assert sorted(scheduler.cancel_pending()) == ["app-2", "app-3"]
+    assert scheduler.admit("app-2", "sync") is True
+    release.set()
+    scheduler.close()
@@ -0,0 +1,68 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import json
+import subprocess
+from script_py.config import Config, LazyConfig, apply_env_overrides, read_cache
+
+CRONJOB_DIR = os.path.join(os.path.dirname(__file__), "../cronjob")
+CONFIG_FILE = os.path.join(CRONJOB_DIR, "config.yaml")
+HEAVY_MODULES = ("requests", "urllib3", "yaml", "dotenv", "aiohttp", "asyncio", "sqlite3")
+
+
+def run_python(code, **env):
+    environ = {key: value for key, value in os.environ.items() if key != "CONFIG_CACHE"}
+    environ.update(PYTHONPATH=CRONJOB_DIR, **env)
+    result = subprocess.run([sys.executable, "-c", code], cwd=CRONJOB_DIR, env=environ, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_importing_the_monitor_loads_no_config_and_no_heavy_modules():
+    """Importing the entry point neither reads config.yaml (it may not exist) nor imports HTTP/YAML libraries."""
+    loaded = run_python(
+        f"import json, sys; import script_py.monitor as m; print(json.dumps([m.CONFIG.loaded] + [n for n in {HEAVY_MODULES!r} if n in sys.modules]))",
+        CONFIG_FILE="/nonexistent/config.yaml",
+    )
+
+    assert loaded == [False]
+
+
+def test_config_is_loaded_once_on_first_access():
+    """The loader runs on first access only and the result is shared."""
+    calls = []
+    config = LazyConfig(loader=lambda: calls.append(1) or {"engine": "threads"})
+
+    assert not config.loaded
+    assert config.get("engine") == "threads"
+    assert config["engine"] == "threads"
+    assert "engine" in config
+    assert calls == [1]
+
+
+def test_environment_overrides_top_level_keys():
+    """ARGOCD_MONITOR_<KEY> replaces a config.yaml key, parsed as YAML."""
+    config = apply_env_overrides({"engine": "threads", "max_workers": 5}, {"ARGOCD_MONITOR_MAX_WORKERS": "20", "ARGOCD_MONITOR_ENGINE": "async", "OTHER": "x"})
+
+    assert config == {"engine": "async", "max_workers": 20}
+
+
+def test_precompiled_cache_skips_yaml(tmp_path):
+    """With a fresh CONFIG_CACHE the config is read without importing yaml; a stale cache is ignored."""
+    source = tmp_path / "config.yaml"
+    source.write_text(open(CONFIG_FILE).read())
+    cache = tmp_path / "config.json"
+    subprocess.run([sys.executable, "-m", "script_py.config", "--compile", str(cache)], cwd=CRONJOB_DIR, env=dict(os.environ, CONFIG_FILE=str(source)), check=True, capture_output=True)
+
+    result = run_python(
+        "import json, sys; from script_py.config import CONFIG; print(json.dumps([CONFIG.get('engine'), 'yaml' in sys.modules]))",
+        CONFIG_FILE=str(source), CONFIG_CACHE=str(cache),
+    )
+    assert result == ["threads", False]
+
+    source.write_text("engine: async\n")
+    assert read_cache(str(cache), str(source)) is None
+    assert Config.load(path=str(source), cache=str(cache))["engine"] == "async"
+    assert read_cache(str(cache), str(source)) == {"engine": "async"}
@@ -0,0 +1,146 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import json
+from script_py import diagnosis, slack_notifier
+from script_py.argocd_client import ArgoCDClient
+from script_py.diagnosis import Budget, Diagnoser, notify_unhealthy, set_diagnoser, unhealthy_leaves
+from script_py.slack_notifier import NotificationDispatcher
+from tests.fake_argocd import FakeArgoCD, make_app
+from tests.fake_slack import FakeSlackWebhook
+
+
+def node(kind, name, health="Healthy", parent=None, message=None, namespace="default"):
+    entry = {"kind": kind, "name": name, "namespace": namespace, "uid": f"{kind}-{name}", "health": {"status": health}}
+    if message:
+        entry["health"]["message"] = message
+    if parent:
+        entry["parentRefs"] = [{"kind": parent[0], "name": parent[1], "namespace": namespace, "uid": f"{parent[0]}-{parent[1]}"}]
+    return entry
+
+
+def large_tree(healthy=5000):
+    """A Deployment -> ReplicaSet -> Pod chain that fails, buried among thousands of healthy resources."""
+    nodes = [node("ConfigMap", f"cm-{i}") for i in range(healthy)]
+    nodes += [
+        node("Deployment", "web", "Degraded", message="Deployment does not have minimum availability"),
+        node("ReplicaSet", "web-1", "Degraded", parent=("Deployment", "web")),
+        node("Pod", "web-1-abc", "Degraded", parent=("ReplicaSet", "web-1"), message="Back-off restarting failed container"),
+        node("Service", "web", "Missing"),
+    ]
+    return {"nodes": nodes, "orphanedNodes": [node("Pod", f"orphan-{i}") for i in range(100)]}
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.alerts = []
+
+    def notify(self, app_name, status, attempts=0, action="", details=None, level=0):
+        self.alerts.append((app_name, status, details))
+        return True
+
+
+def test_unhealthy_leaves_are_the_deepest_failing_resources():
+    """Owners of a failing resource are pruned; the most severe leaves come first."""
+    leaves, total = unhealthy_leaves(large_tree(healthy=10)["nodes"])
+
+    assert total == 4
+    assert [(leaf["kind"], leaf["name"]) for leaf in leaves] == [("Pod", "web-1-abc"), ("Service", "web")]
+    assert leaves[0]["message"] == "Back-off restarting failed container"
+
+
+def test_streamed_tree_is_summarised_with_managed_resource_state():
+    """A 5000-node tree is streamed and only the failing leaves are looked up in managed-resources."""
+    live = {"status": {"conditions": [{"type": "Ready", "status": "False", "message": "containers with unready status: [web]"}]}}
+    managed = [{"kind": "Pod", "name": "web-1-abc", "namespace": "default", "group": "", "modified": True, "liveState": json.dumps(live)}]
+    with FakeArgoCD(apps=[make_app("app-1", health="Degraded")], resource_trees={"app-1": large_tree()}, managed_resources={"app-1": managed}) as fake:
+        client = ArgoCDClient(api=fake.api, token="token")
+        details = Diagnoser(client, dispatcher=RecordingDispatcher()).diagnose("app-1")
+
+    lookups = [query for method, path, query in fake.requests if path.endswith("/managed-resources")]
+    assert lookups == [{"kind": "Pod", "resourceName": "web-1-abc", "namespace": "default"}, {"kind": "Service", "resourceName": "web", "namespace": "default"}]
+    assert "`Pod default/web-1-abc`: Degraded — Back-off restarting failed container (difiere de Git)" in details
+    assert "`Service default/web`: Missing" in details
+    assert "4 recursos no sanos en total" in details
+
+
+def test_byte_budget_stops_reading_the_tree():
+    """Once the cycle's byte budget is spent the tree is cut short and the summary says so."""
+    with FakeArgoCD(resource_trees={"app-1": large_tree()}) as fake:
+        client = ArgoCDClient(api=fake.api, token="token")
+        diagnoser = Diagnoser(client, dispatcher=RecordingDispatcher(), max_bytes=16 * 1024)
+        details = diagnoser.diagnose("app-1")
+
+    assert "Diagnóstico incompleto" in details
+    assert diagnoser.stats["truncated"] == 1
+    assert diagnoser.budget.exhausted
+    assert not any(path.endswith("/managed-resources") for method, path, query in fake.requests)
+    assert diagnoser.submit("app-2", "Degraded") is False
+
+
+def test_budget_expires_with_the_clock():
+    now = [0.0]
+    budget = Budget(max_bytes=100, seconds=10, clock=lambda: now[0])
+
+    assert budget.consume(50) and not budget.exhausted
+    now[0] = 10
+    assert budget.exhausted
+
+
+def test_diagnosis_is_attached_to_the_slack_alert():
+    """notify_unhealthy diagnoses in the background and the summary reaches the Slack block."""
+    tree = {"nodes": [node("Pod", "worker", "Degraded", message="OOMKilled")]}
+    with FakeArgoCD(resource_trees={"app-1": tree}) as fake, FakeSlackWebhook() as slack:
+        dispatcher = NotificationDispatcher(webhook_url=slack.url, batch_window=60)
+        previous = slack_notifier._default_dispatcher
+        slack_notifier._default_dispatcher = dispatcher
+        diagnoser = Diagnoser(ArgoCDClient(api=fake.api, token="token"))
+        set_diagnoser(diagnoser)
+        try:
+            notify_unhealthy("app-1", "Degraded")
+            assert diagnoser.finish(timeout=5) == 0
+            dispatcher.flush(wait=True, timeout=5)
+            dispatcher.close(timeout=5)
+        finally:
+            set_diagnoser(None)
+            slack_notifier._default_dispatcher = previous
+
+    text = slack.messages[0]["blocks"][0]["text"]["text"]
+    assert "*Aplicación:* `app-1`" in text
+    assert "*Diagnóstico:*\n• `Pod default/worker`: Degraded — OOMKilled" in text
+
+
+def test_deduplicated_alerts_are_not_diagnosed():
+    """An alert the dispatcher would drop as repeated does not cost a resource-tree request."""
+    with FakeArgoCD() as fake:
+        dispatcher = NotificationDispatcher(webhook_url="http://127.0.0.1:9/unused")
+        dispatcher.notify("app-1", "Degraded")
+        previous = slack_notifier._default_dispatcher
+        slack_notifier._default_dispatcher = dispatcher
+        diagnoser = Diagnoser(ArgoCDClient(api=fake.api, token="token"))
+        set_diagnoser(diagnoser)
+        try:
+            notify_unhealthy("app-1", "Degraded")
+            diagnoser.finish(timeout=5)
+        finally:
+            set_diagnoser(None)
+            slack_notifier._default_dispatcher = previous
+
+    assert fake.requests == []
+    assert dispatcher.stats["deduplicated"] == 1
+    assert diagnosis.get_diagnoser() is None
+
+
+def test_finished_diagnoses_are_not_kept_without_finish():
+    """In stream mode nobody calls finish(): completed futures must not pile up."""
+    with FakeArgoCD(resource_trees={"app-1": {"nodes": [node("Pod", "worker", "Degraded")]}}) as fake:
+        diagnoser = Diagnoser(ArgoCDClient(api=fake.api, token="token"), dispatcher=RecordingDispatcher())
+        for _ in range(20):
+            assert diagnoser.submit("app-1", "Degraded")
+        diagnoser._executor.shutdown(wait=True)
+
+    assert len(diagnoser.dispatcher.alerts) == 20
+    assert diagnoser._futures == set()
@@ -0,0 +1,186 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+from script_py import slack_notifier
+from script_py.diagnosis import notify_unhealthy
+from script_py.history import HealthHistory, set_history
+from script_py.slack_notifier import NotificationDispatcher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_only_transitions_are_recorded():
+    """Repeated observations of the same state do not add rows."""
+    clock = FakeClock()
+    history = HealthHistory(clock=clock)
+
+    assert history.record("app-1", "Healthy", "Synced") is True
+    assert history.record("app-1", "Healthy", "Synced") is False
+    clock.now = 1060
+    assert history.record("app-1", "Degraded", "Synced") is True
+    clock.now = 1120
+    assert history.record("app-1", "Degraded", "OutOfSync") is True
+
+    assert len(history) == 3
+    assert history.transitions("app-1") == [(1000.0, "Healthy", "Synced"), (1060.0, "Degraded", "Synced"), (1120.0, "Degraded", "OutOfSync")]
+
+
+def test_unhealthy_cycles_count_the_current_streak():
+    history = HealthHistory(clock=FakeClock())
+    history.start_cycle()
+    history.record("app-1", "Healthy", "Synced")
+    for cycle in range(2, 6):
+        history.start_cycle()
+        history.record("app-1", "Degraded" if cycle < 4 else "Error", "Synced")
+
+    # Degraded en los ciclos 2 y 3 y Error en 4 y 5: una sola racha de 4 ciclos
+    assert history.unhealthy_cycles("app-1") == 4
+    assert [history.escalation_level(cycles) for cycles in (1, 3, 12, 100)] == [0, 1, 2, 3]
+    history.start_cycle()
+    history.record("app-1", "Healthy", "Synced")
+    assert history.unhealthy_cycles("app-1") == 0
+    assert history.unhealthy_cycles("unknown") == 0
+
+
+def test_flapping_and_mean_time_to_recovery():
+    clock = FakeClock()
+    history = HealthHistory(clock=clock)
+    for health in ["Healthy", "Degraded", "Healthy", "Degraded", "Healthy"]:
+        history.record("flappy", health, "Synced")
+        clock.now += 100
+    history.record("stable", "Healthy", "Synced")
+    history.record("deploying", "Healthy", "Synced")
+    clock.now += 100
+    history.record("deploying", "Progressing", "Synced")
+    clock.now += 100
+    history.record("deploying", "Healthy", "Synced")
+
+    assert history.flapping(window=3600, min_changes=4) == {"flappy": 4}
+    assert history.flapping(window=350, min_changes=1) == {"flappy": 1, "deploying": 2}
+    # Dos incidentes de 100 s; el Progressing de "deploying" no cuenta
+    assert history.recoveries(window=3600) == [100.0, 100.0]
+    assert history.mean_time_to_recovery(window=3600) == 100.0
+    assert history.mean_time_to_recovery(window=3600, name="stable") is None
+
+
+def test_history_survives_restarts_and_truncated_writes(tmp_path):
+    """Flushes append chunks; a torn chunk at the end is dropped on load."""
+    path = str(tmp_path / "history.bin")
+    history = HealthHistory(path=path, clock=FakeClock())
+    history.start_cycle()
+    history.record("app-1", "Degraded", "Synced")
+    assert history.flush() == 1
+    history.start_cycle()
+    history.record("app-2", "Healthy", "Synced")
+    assert history.flush() == 1
+    size = os.path.getsize(path)
+    with open(path, "ab") as file:
+        file.write(b"AMH1\x00\x00")
+
+    reloaded = HealthHistory(path=path)
+    assert reloaded.cycle == 2
+    assert reloaded.names == ["app-1", "app-2"]
+    assert reloaded.unhealthy_cycles("app-1") == 2
+    assert os.path.getsize(path) == size
+    reloaded.start_cycle()
+    reloaded.record("app-1", "Healthy", "Synced")
+    reloaded.flush()
+    assert HealthHistory(path=path).transitions("app-1")[-1][1] == "Healthy"
+
+
+def test_compaction_drops_old_rows_but_keeps_current_state(tmp_path):
+    path = str(tmp_path / "history.bin")
+    clock = FakeClock()
+    history = HealthHistory(path=path, retention=1000, compact_chunks=3, clock=clock)
+    history.record("old", "Degraded", "Synced")
+    history.record("app-1", "Healthy", "Synced")
+    clock.now += 500
+    history.record("app-1", "Degraded", "Synced")
+    history.flush()
+    clock.now += 1000
+    history.record("app-1", "Healthy", "Synced")
+    history.flush()
+    size = os.path.getsize(path)
+    history.start_cycle()
+    history.flush()
+
+    # El tercer bloque dispara la compactación: sobrevive la fila vieja de "old" (su estado actual)
+    assert history.transitions("old") == [(1000.0, "Degraded", "Synced")]
+    assert [health for _, health, _ in history.transitions("app-1")] == ["Degraded", "Healthy"]
+    assert os.path.getsize(path) < size
+    reloaded = HealthHistory(path=path)
+    assert reloaded.transitions("app-1") == history.transitions("app-1")
+    assert reloaded.cycle == 1
+
+
+def test_escalation_reaches_slack_attempts():
+    """An app degraded across cycles is alerted again, with its cycle count, at each threshold."""
+    dispatcher = NotificationDispatcher(webhook_url="http://127.0.0.1:9/unused")
+    queued = []
+    dispatcher._ensure_started = lambda: None
+    dispatcher._queue.put_nowait = queued.append
+    history = HealthHistory(escalation_cycles=(3,))
+    previous = slack_notifier._default_dispatcher
+    slack_notifier._default_dispatcher = dispatcher
+    set_history(history)
+    try:
+        for _ in range(4):
+            history.start_cycle()
+            history.record("app-1", "Degraded", "Synced")
+            notify_unhealthy("app-1", "Degraded")
+    finally:
+        set_history(None)
+        slack_notifier._default_dispatcher = previous
+
+    assert [(attempts, "Escalada" in action) for _, _, attempts, action, _, _ in queued] == [(1, False), (3, True)]
+
+
+def test_first_alert_is_sent_when_notify_starts_mid_streak():
+    """An app first synced (no alert) and then still Degraded is alerted right away, not at the threshold."""
+    dispatcher = NotificationDispatcher(webhook_url="http://127.0.0.1:9/unused")
+    queued = []
+    dispatcher._ensure_started = lambda: None
+    dispatcher._queue.put_nowait = queued.append
+    history = HealthHistory(escalation_cycles=(3,))
+    previous = slack_notifier._default_dispatcher
+    slack_notifier._default_dispatcher = dispatcher
+    set_history(history)
+    try:
+        history.start_cycle()
+        history.record("app-1", "Degraded", "OutOfSync")
+        history.start_cycle()
+        history.record("app-1", "Degraded", "Synced")
+        notify_unhealthy("app-1", "Degraded")
+    finally:
+        set_history(None)
+        slack_notifier._default_dispatcher = previous
+
+    assert [(app_name, attempts) for app_name, _, attempts, _, _, _ in queued] == [("app-1", 2)]
+
+
+def test_month_of_history_answers_fleet_wide_queries():
+    """A month of transitions for 5000 apps gives the expected fleet-wide results (timing lives in benchmarks/bench_history.py)."""
+    clock = FakeClock()
+    history = HealthHistory(clock=clock)
+    states = ["Healthy", "Degraded", "Healthy", "Progressing"]
+    for hour in range(0, 30 * 24, 6):
+        clock.now = 1000.0 + hour * 3600
+        for app in range(5000):
+            history.record(f"app-{app}", states[(hour // 6 + app) % len(states)] if app % 10 == 0 else "Healthy", "Synced")
+
+    flapping = history.flapping(window=30 * 24 * 3600, min_changes=4)
+    mttr = history.mean_time_to_recovery(window=30 * 24 * 3600)
+    cycles = [history.unhealthy_cycles(f"app-{app}") for app in range(5000)]
+
+    assert len(flapping) == 500
+    assert mttr == 6 * 3600
+    assert len(cycles) == 5000
@@ -0,0 +1,140 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import json
+import threading
+from prometheus_client import REGISTRY
+from script_py.argocd_client import ArgoCDClient
+from script_py.http_cache import ResponseCache
+from tests.fake_argocd import FakeArgoCD, make_app
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def app_gets(fake):
+    return [query for method, path, query in fake.requests if path.startswith("/api/v1/applications/")]
+
+
+def make_client(fake, clock=None, **cache_options):
+    return ArgoCDClient(api=fake.api, token="token", cache=ResponseCache(clock=clock or FakeClock(), **cache_options))
+
+
+def test_fresh_entries_are_served_without_a_request():
+    """Within the TTL repeated status reads hit the cache and count the bytes saved."""
+    hits = sample("argocd_monitor_http_cache_requests_total", result="hit")
+    saved = sample("argocd_monitor_http_cache_saved_bytes_total")
+
+    app = make_app("app-1", health="Degraded", payload_bytes=5000)
+    with FakeArgoCD(apps=[app]) as fake:
+        client = make_client(fake)
+        statuses = [client.get_application_status("app-1") for _ in range(3)]
+
+    assert statuses == [("Degraded", "Synced")] * 3
+    assert len(app_gets(fake)) == 1
+    assert sample("argocd_monitor_http_cache_requests_total", result="hit") == hits + 2
+    assert sample("argocd_monitor_http_cache_saved_bytes_total") == saved + 2 * len(json.dumps(app))
+
+
+def test_stale_entries_are_revalidated_with_etag():
+    """After the TTL an If-None-Match request gets a 304 and the body is not downloaded again."""
+    clock = FakeClock()
+    with FakeArgoCD(apps=[make_app("app-1", payload_bytes=5000)]) as fake:
+        client = make_client(fake, clock=clock, ttl=30)
+        client.get_application_status("app-1")
+        sent = fake.stats["bytes_sent"]
+        clock.now = 31
+        status = client.get_application_status("app-1")
+
+    assert status == ("Healthy", "Synced")
+    assert fake.stats["not_modified"] == 1
+    assert fake.stats["bytes_sent"] == sent
+
+
+def test_servers_without_etag_are_fetched_again_after_the_ttl():
+    """Without an ETag a stale entry is simply re-downloaded."""
+    clock = FakeClock()
+    with FakeArgoCD(apps=[make_app("app-1")], etags=False) as fake:
+        client = make_client(fake, clock=clock, ttl=30)
+        client.get_application_status("app-1")
+        clock.now = 31
+        client.get_application_status("app-1")
+
+    assert len(app_gets(fake)) == 2
+    assert fake.stats["not_modified"] == 0
+
+
+def test_refresh_downloads_only_projected_fields_and_drops_the_stale_entry():
+    """refresh=true asks ArgoCD for a few fields instead of the full document and is never cached."""
+    app = make_app("app-1", payload_bytes=50000)
+    with FakeArgoCD(apps=[app]) as fake:
+        client = make_client(fake)
+        client.get_application_status("app-1")
+        sent = fake.stats["bytes_sent"]
+        client.refresh_app("app-1")
+        refresh_bytes = fake.stats["bytes_sent"] - sent
+        assert len(client.cache) == 0
+        client.get_application_status("app-1")
+
+    assert [query.get("refresh") for query in app_gets(fake)] == [None, "true", None]
+    assert refresh_bytes < 500 < len(json.dumps(app))
+
+
+def test_concurrent_identical_gets_are_collapsed():
+    """Threads asking for the same app at the same time share a single request."""
+    with FakeArgoCD(apps=[make_app("app-1")], latency=0.2) as fake:
+        client = make_client(fake)
+        barrier = threading.Barrier(10)
+        results = []
+
+        def read():
+            barrier.wait()
+            results.append(client.get_application_status("app-1"))
+
+        threads = [threading.Thread(target=read) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results == [("Healthy", "Synced")] * 10
+    assert len(app_gets(fake)) == 1
+
+
+def test_cache_is_bounded_lru():
+    """Beyond max_entries the least recently used document is evicted."""
+    cache = ResponseCache(max_entries=2, clock=FakeClock())
+    cache.store("a", b"1")
+    cache.store("b", b"2")
+    cache.lookup("a")
+    cache.store("c", b"3")
+
+    assert len(cache) == 2
+    assert cache.lookup("b") == (None, False)
+    assert cache.lookup("a")[1] is True
+
+
+def test_cache_is_bounded_in_bytes():
+    """Entries are evicted to stay under max_bytes; a document larger than the bound is not stored."""
+    cache = ResponseCache(max_bytes=10, clock=FakeClock())
+    cache.store("a", b"1234")
+    cache.store("b", b"1234")
+    cache.store("c", b"1234")
+
+    assert cache.lookup("a") == (None, False)
+    assert cache.size_bytes == 8
+    cache.store("b", b"x" * 11)
+    assert cache.lookup("b") == (None, False)
+    assert (len(cache), cache.size_bytes) == (1, 4)
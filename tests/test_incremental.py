@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+from script_py.incremental import ChangeTracker
+from script_py.state import AppStateStore
+
+
+def make_app(name, health="Healthy", sync="Synced", resource_version="1"):
+    return {
+        "metadata": {"name": name, "resourceVersion": resource_version},
+        "status": {"health": {"status": health}, "sync": {"status": sync}},
+    }
+
+
+def test_filter_changed_skips_unchanged_apps():
+    """The first cycle processes everything; identical apps are skipped afterwards."""
+    tracker = ChangeTracker()
+    apps = [make_app("app-1"), make_app("app-2")]
+
+    assert tracker.filter_changed(apps) == apps
+    assert tracker.filter_changed(apps) == []
+    assert tracker.skipped == 2
+
+
+def test_filter_changed_detects_status_changes_only():
+    """A new resourceVersion alone is not a change; a new health status is."""
+    tracker = ChangeTracker()
+    tracker.filter_changed([make_app("app-1"), make_app("app-2")])
+
+    changed = tracker.filter_changed([
+        make_app("app-1", resource_version="2"),
+        make_app("app-2", health="Degraded", resource_version="2"),
+    ])
+
+    assert [app["metadata"]["name"] for app in changed] == ["app-2"]
+    assert (tracker.changed, tracker.skipped) == (1, 1)
+
+
+def test_filter_changed_forgets_removed_apps():
+    """Apps that disappear from ArgoCD are dropped and treated as new if they return."""
+    tracker = ChangeTracker()
+    tracker.filter_changed([make_app("app-1")])
+    tracker.filter_changed([])
+
+    assert tracker.filter_changed([make_app("app-1")]) != []
+
+
+def test_forced_apps_are_evaluated_despite_the_persisted_fingerprint():
+    """Carried-over apps are re-evaluated even when the state store still holds their fingerprint."""
+    store = AppStateStore()
+    store.observe("app-1", "Degraded", "OutOfSync", "unknown")
+    tracker = ChangeTracker(store)
+    assert tracker.filter_changed([make_app("app-1", "Degraded", "OutOfSync")]) == []
+
+    tracker.force("app-1")
+    assert len(tracker.filter_changed([make_app("app-1", "Degraded", "OutOfSync")])) == 1
+    assert tracker.filter_changed([make_app("app-1", "Degraded", "OutOfSync")]) == []
@@ -0,0 +1,59 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import json
+import pytest
+from script_py.json_stream import ItemStreamParser
+
+
+def parse_in_chunks(document, size):
+    parser = ItemStreamParser()
+    items = []
+    for start in range(0, len(document), size):
+        items.extend(parser.feed(document[start:start + size]))
+    parser.close()
+    return parser, items
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 100000])
+def test_parser_yields_items_regardless_of_chunk_boundaries(size):
+    """Items come out identical to json.loads however the body is split."""
+    payload = {
+        "metadata": {"resourceVersion": "123"},
+        "items": [{"metadata": {"name": f"app-{i}"}, "status": {"health": {"status": "Healthy"}, "n": i * 1.5}} for i in range(20)],
+        "total": 20,
+    }
+    document = json.dumps(payload).encode()
+
+    parser, items = parse_in_chunks(document, size)
+
+    assert items == payload["items"]
+    assert parser.extra == {"metadata": {"resourceVersion": "123"}, "total": 20}
+
+
+def test_parser_handles_multibyte_characters_split_across_chunks():
+    """UTF-8 sequences cut in half by the network are decoded correctly."""
+    document = json.dumps({"items": [{"name": "aplicación-ñ"}]}, ensure_ascii=False).encode()
+
+    _, items = parse_in_chunks(document, 1)
+
+    assert items == [{"name": "aplicación-ñ"}]
+
+
+def test_parser_accepts_null_items():
+    """ArgoCD returns "items": null when there are no applications."""
+    _, items = parse_in_chunks(b'{"metadata": {}, "items": null}', 4)
+
+    assert items == []
+
+
+def test_parser_rejects_truncated_documents():
+    """A body cut before the closing brace is reported as an error."""
+    parser = ItemStreamParser()
+    parser.feed(b'{"items": [{"name": "app-1"}')
+
+    with pytest.raises(ValueError):
+        parser.close()
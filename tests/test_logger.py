@@ -0,0 +1,102 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import io
+import json
+import logging
+import pytest
+from script_py import logger
+from script_py.config import Config
+
+
+class CountingArg:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "value"
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+@pytest.fixture
+def output():
+    stream = CountingStream()
+    yield stream
+    logger.shutdown_logging()
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_below_the_level_are_never_formatted(output):
+    """A DEBUG record with INFO as threshold never stringifies its arguments."""
+    logger.setup_logging(config={}, level="INFO", stream=output)
+    argument = CountingArg()
+
+    logger.get_logger("test").debug("🔍 %s", argument)
+    logger.shutdown_logging()
+
+    assert argument.calls == 0
+    assert output.getvalue() == ""
+
+
+def test_records_are_json_lines_with_extra_fields(output):
+    """Each record is one JSON object carrying the level, message and extra= fields."""
+    logger.setup_logging(config={}, level="DEBUG", stream=output)
+
+    logger.get_logger("test").warning("⚠️ '%s' está OutOfSync.", "app-1", extra={"app": "app-1"})
+    logger.shutdown_logging()
+
+    [record] = lines(output)
+    assert record["level"] == "WARNING"
+    assert record["logger"] == "argocd_monitor.test"
+    assert record["msg"] == "⚠️ 'app-1' está OutOfSync."
+    assert record["app"] == "app-1"
+
+
+def test_tokens_are_redacted(output, monkeypatch):
+    """Bearer tokens and the configured ArgoCD token never reach the output."""
+    monkeypatch.setattr(Config, "ARGOCD_TOKEN", "s3cr3t-token")
+    logger.setup_logging(config={}, level="INFO", stream=output)
+
+    log = logger.get_logger("test")
+    log.info("headers %s", {"Authorization": "Bearer abc.def.ghi"})
+    log.info("token=%s", "s3cr3t-token")
+    logger.shutdown_logging()
+
+    text = output.getvalue()
+    assert "abc.def.ghi" not in text
+    assert "s3cr3t-token" not in text
+    assert text.count(logger.REDACTED) == 2
+
+
+def test_pending_records_are_written_in_batches(output):
+    """Records queued while the writer is busy are written together, not one write per line."""
+    logger.setup_logging(config={"log_batch_size": 100}, level="INFO", stream=output)
+    handler = logging.getLogger(logger.ROOT_LOGGER).handlers[0]
+    # Detener el hilo de escritura para acumular registros en la cola
+    logger.shutdown_logging()
+    logger._listener = logger.BatchingQueueListener(handler.queue, logger.JsonFormatter(), output, batch_size=100)
+
+    log = logger.get_logger("test")
+    for i in range(250):
+        log.info("registro %s", i)
+    logger._listener.start()
+    logger.shutdown_logging()
+
+    assert len(lines(output)) == 250
+    assert output.writes == 3
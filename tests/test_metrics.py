@@ -0,0 +1,84 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from prometheus_client import REGISTRY
+from script_py import metrics
+from script_py.argocd_client import ArgoCDClient
+from script_py.state import AppStateStore
+from tests.fake_argocd import FakeArgoCD, make_app
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_client_calls_are_recorded_by_endpoint_and_status():
+    """Each ArgoCD call lands in the latency histogram with its endpoint and status code."""
+    before_ok = sample("argocd_monitor_argocd_request_duration_seconds_count", endpoint="refresh", status="200")
+    before_missing = sample("argocd_monitor_argocd_request_duration_seconds_count", endpoint="refresh", status="404")
+
+    with FakeArgoCD(apps=[make_app("app-1")]) as fake:
+        client = ArgoCDClient(api=fake.api, token="token")
+        client.refresh_app("app-1")
+        client.refresh_app("missing")
+
+    assert sample("argocd_monitor_argocd_request_duration_seconds_count", endpoint="refresh", status="200") == before_ok + 1
+    assert sample("argocd_monitor_argocd_request_duration_seconds_count", endpoint="refresh", status="404") == before_missing + 1
+    assert sample("argocd_monitor_in_flight_requests") == 0
+
+
+def test_connection_errors_are_recorded_as_error():
+    """A call that never gets a response is labelled status="error"."""
+    before = sample("argocd_monitor_argocd_request_duration_seconds_count", endpoint="sync", status="error")
+
+    ArgoCDClient(api="http://127.0.0.1:1/api/v1", token="token").sync_app("app-1")
+
+    assert sample("argocd_monitor_argocd_request_duration_seconds_count", endpoint="sync", status="error") == before + 1
+
+
+def test_application_gauge_zeroes_states_that_disappear():
+    """Health/sync combinations no longer present drop to 0 instead of keeping a stale value."""
+    store = AppStateStore()
+    store.observe("app-1", "Degraded", "OutOfSync", "rev-1")
+    store.observe("app-2", "Healthy", "Synced", "rev-1")
+    metrics.set_application_counts(store.counts())
+    assert sample("argocd_monitor_applications", health="Degraded", sync="OutOfSync") == 1
+
+    store.observe("app-1", "Healthy", "Synced", "rev-1")
+    metrics.set_application_counts(store.counts())
+
+    assert sample("argocd_monitor_applications", health="Degraded", sync="OutOfSync") == 0
+    assert sample("argocd_monitor_applications", health="Healthy", sync="Synced") == 2
+
+
+def test_metrics_are_pushed_to_the_pushgateway():
+    """push_metrics PUTs the whole registry under the job and shard grouping key; failures are reported, not raised."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_PUT(self):
+            received.append((self.path, self.rfile.read(int(self.headers["Content-Length"])).decode()))
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert metrics.push_metrics(f"127.0.0.1:{server.server_port}", grouping_key={"shard": "0"}) is True
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    path, body = received[0]
+    assert path == "/metrics/job/argocd-monitor/shard/0"
+    assert "argocd_monitor_cycle_duration_seconds" in body
+    assert metrics.push_metrics("127.0.0.1:1", timeout=1) is False
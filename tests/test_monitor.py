@@ -0,0 +1,125 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import subprocess
+import pytest
+from script_py import argocd_client, diagnosis, history, monitor, slack_notifier
+from script_py.argocd_client import REFRESH_FIELDS, ArgoCDClient
+from script_py.slack_notifier import NotificationDispatcher
+from tests.fake_argocd import FakeArgoCD, make_app
+from tests.fake_slack import FakeSlackWebhook
+
+
+@pytest.fixture
+def isolated_monitor(monkeypatch):
+    """Restores the monitor's process-wide state (store, scheduler, rules...) after the test."""
+    for name in ("state_store", "change_tracker", "action_scheduler", "shard", "carry_over", "rules", "concurrency_controller"):
+        monkeypatch.setattr(monitor, name, getattr(monitor, name))
+    monkeypatch.setattr(history, "_history", None)
+    monkeypatch.setattr(diagnosis, "_diagnoser", None)
+    monkeypatch.setattr(monitor, "setup_logging", lambda: None)
+    monkeypatch.setitem(monitor.CONFIG, "history_path", "")
+    return monkeypatch
+
+
+def test_run_mode_flags():
+    assert monitor.parse_args(["--once"]).run_mode == "once"
+    assert monitor.parse_args(["--daemon"]).run_mode == "daemon"
+    args = monitor.parse_args(["--no-metrics", "--state-backend", "memory", "--engine", "async"])
+    assert (args.metrics, args.state_backend, args.engine) == (False, "memory", "async")
+    with pytest.raises(SystemExit):
+        monitor.parse_args(["--once", "--daemon"])
+    with pytest.raises(SystemExit):
+        monitor.parse_args(["--once", "--mode", "stream"])
+
+
+def test_once_runs_a_single_cycle_and_delivers_alerts(isolated_monitor):
+    """--once processes the fleet, waits for Slack delivery and returns instead of looping."""
+    apps = [make_app("app-1", health="Degraded"), make_app("app-2")]
+    with FakeArgoCD(apps=apps) as fake, FakeSlackWebhook() as slack:
+        isolated_monitor.setattr(argocd_client, "_default_client", ArgoCDClient(api=fake.api, token="token"))
+        isolated_monitor.setattr(slack_notifier, "_default_dispatcher", NotificationDispatcher(webhook_url=slack.url, batch_window=60))
+        isolated_monitor.setattr(monitor, "run_daemon", lambda run_cycle: pytest.fail("--once must not loop"))
+
+        assert monitor.main(["--once", "--no-metrics", "--state-backend", "none"]) == 0
+
+    assert ("GET", "/api/v1/applications/app-1", {"refresh": "true", "fields": REFRESH_FIELDS}) in fake.requests
+    assert len(slack.messages) == 1
+    assert "*Aplicación:* `app-1`" in slack.messages[0]["blocks"][0]["text"]["text"]
+
+
+def test_once_reports_a_failed_cycle_in_the_exit_code(isolated_monitor):
+    closed = []
+    isolated_monitor.setattr(monitor, "close_notifications", lambda: closed.append(True))
+
+    def failing_cycle():
+        raise RuntimeError("ArgoCD no disponible")
+
+    assert monitor.run_once(failing_cycle) == 1
+    assert monitor.run_once(lambda: False) == 0
+    assert closed == [True, True]
+
+
+def test_once_pushes_metrics_before_exiting(isolated_monitor):
+    """With metrics_pushgateway set, --once pushes its metrics grouped by shard: /metrics is gone before any scrape."""
+    pushed = []
+    isolated_monitor.setattr(monitor, "close_notifications", lambda: None)
+    isolated_monitor.setattr(monitor.metrics, "push_metrics", lambda gateway, grouping_key=None: pushed.append((gateway, grouping_key)))
+
+    monitor.run_once(lambda: True)
+    isolated_monitor.setitem(monitor.CONFIG, "metrics_pushgateway", "pushgateway:9091")
+    monitor.run_once(lambda: True)
+
+    assert pushed == [("pushgateway:9091", {"shard": "0"})]
+
+
+def test_stream_mode_renews_the_slack_budget_every_flush_interval(isolated_monitor):
+    """A long-running stream closes a cycle each state_flush_interval, so alerts keep reaching Slack."""
+    apps = [make_app(f"app-{i}", health="Degraded") for i in range(4)]
+    with FakeArgoCD(apps=apps) as fake, FakeSlackWebhook() as slack:
+        dispatcher = NotificationDispatcher(webhook_url=slack.url, batch_size=1, max_messages=1, batch_window=60)
+        isolated_monitor.setattr(argocd_client, "_default_client", ArgoCDClient(api=fake.api, token="token"))
+        isolated_monitor.setattr(slack_notifier, "_default_dispatcher", dispatcher)
+        isolated_monitor.setattr(monitor, "last_flush", 0.0)
+        isolated_monitor.setitem(monitor.CONFIG, "state_flush_interval", 0)
+        isolated_monitor.setitem(monitor.CONFIG, "diagnosis", False)
+
+        for app in apps:
+            monitor.handle_stream_event("MODIFIED", app)
+        dispatcher.flush(wait=True, timeout=5)
+        dispatcher.close(timeout=5)
+
+    assert len(slack.messages) == 4
+    assert dispatcher.stats["suppressed"] == 0
+
+
+def test_alerts_are_deduplicated_across_once_processes(tmp_path):
+    """Each --once run is a new process: the persisted history decides whether to alert again."""
+    cronjob = os.path.join(os.path.dirname(__file__), "../cronjob")
+    with FakeArgoCD(apps=[make_app("app-1", health="Degraded")]) as fake, FakeSlackWebhook() as slack:
+        env = dict(
+            os.environ,
+            PYTHONPATH=cronjob,
+            ARGOCD_API=fake.api,
+            ARGOCD_TOKEN="token",
+            SLACK_WEBHOOK_URL=slack.url,
+            ARGOCD_MONITOR_STATE_PATH=str(tmp_path / "state.db"),
+            ARGOCD_MONITOR_HISTORY_PATH=str(tmp_path / "history.bin"),
+            ARGOCD_MONITOR_HISTORY_ESCALATION_CYCLES="[3]",
+        )
+        delivered = []
+        for _ in range(3):
+            subprocess.run(
+                [sys.executable, "-m", "script_py.monitor", "--once", "--no-metrics", "--state-backend", "sqlite"],
+                cwd=cronjob, env=env, check=True, capture_output=True, timeout=60,
+            )
+            delivered.append(len(slack.messages))
+
+    # Primera alerta, ninguna repetida y la escalada al tercer ciclo
+    assert delivered == [1, 1, 2]
+    texts = [message["blocks"][0]["text"]["text"] for message in slack.messages]
+    assert "*Intentos:* `1`" in texts[0]
+    assert "*Intentos:* `3`" in texts[1] and "Escalada" in texts[1]
@@ -0,0 +1,94 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import sqlite3
+from script_py.incremental import ChangeTracker
+from script_py.persistence import MemoryBackend, SQLiteBackend
+from script_py.state import AppStateStore, HealthStatus
+
+
+class CountingBackend(MemoryBackend):
+    def __init__(self, records=None):
+        super().__init__(records)
+        self.loads = 0
+        self.saves = []
+
+    def load(self):
+        self.loads += 1
+        return super().load()
+
+    def save(self, changed, removed):
+        self.saves.append((set(changed), set(removed)))
+        super().save(changed, removed)
+
+
+def test_sqlite_backend_round_trip(tmp_path):
+    """State written by one run is loaded intact by the next one."""
+    path = str(tmp_path / "state" / "state.db")
+    store = AppStateStore(backend=SQLiteBackend(path))
+    store.observe("app-1", "Degraded", "OutOfSync", "rev-1")
+    store.record_action("app-1", "sync")
+    store.flush()
+
+    restored = AppStateStore(backend=SQLiteBackend(path))
+    state = restored.get("app-1")
+
+    assert (state.health, state.revision, state.sync_attempts, state.last_action) == (HealthStatus.DEGRADED, "rev-1", 1, "sync")
+
+
+
+def test_sqlite_tables_from_older_versions_gain_the_alert_columns(tmp_path):
+    """A table written before alert_status/alert_level existed is migrated on open."""
+    path = str(tmp_path / "state.db")
+    columns = ("name", "health", "sync", "revision", "first_seen", "last_seen", "last_change",
+               "sync_attempts", "refresh_attempts", "last_action", "last_action_at")
+    with sqlite3.connect(path) as connection:
+        connection.execute(f"CREATE TABLE app_state ({', '.join(columns)})")
+        connection.execute(f"INSERT INTO app_state VALUES ({', '.join('?' for _ in columns)})", ("app-1", 3, 1, "rev-1", 0.0, 0.0, 0.0, 0, 0, None, 0.0))
+    connection.close()
+
+    store = AppStateStore(backend=SQLiteBackend(path))
+    assert store.last_alert("app-1") is None
+    store.record_alert("app-1", "Degraded", 1)
+    store.flush()
+
+    assert AppStateStore(backend=SQLiteBackend(path)).last_alert("app-1") == ("Degraded", 1)
+
+def test_state_is_loaded_lazily_and_only_changes_are_saved():
+    """Nothing is read until first access, and unchanged records are not written back."""
+    backend = CountingBackend()
+    seed = AppStateStore(backend=backend)
+    seed.observe("app-1", "Healthy", "Synced", "rev-1")
+    seed.observe("app-2", "Healthy", "Synced", "rev-1")
+    seed.flush()
+
+    store = AppStateStore(backend=backend)
+    assert backend.loads == 1
+    store.observe("app-1", "Healthy", "Synced", "rev-1")
+    store.observe("app-2", "Degraded", "Synced", "rev-1")
+    store.prune(["app-1"])
+    assert backend.loads == 2
+
+    store.flush()
+    assert backend.saves[-1] == (set(), {"app-2"})
+    assert store.flush() == 0
+
+
+def test_incremental_mode_skips_apps_unchanged_since_previous_run():
+    """A ChangeTracker seeded from persisted state skips apps on the first cycle of a new run."""
+    backend = MemoryBackend()
+    previous_run = AppStateStore(backend=backend)
+    previous_run.observe("app-1", "Healthy", "Synced", "rev-1")
+    previous_run.observe("app-2", "Healthy", "Synced", "rev-1")
+    previous_run.flush()
+
+    tracker = ChangeTracker(AppStateStore(backend=backend))
+    apps = [
+        {"metadata": {"name": "app-1", "annotations": {"argocd.argoproj.io/revision": "rev-1"}}, "status": {"health": {"status": "Healthy"}, "sync": {"status": "Synced"}}},
+        {"metadata": {"name": "app-2", "annotations": {"argocd.argoproj.io/revision": "rev-2"}}, "status": {"health": {"status": "Healthy"}, "sync": {"status": "Synced"}}},
+    ]
+
+    assert [app["metadata"]["name"] for app in tracker.filter_changed(apps)] == ["app-2"]
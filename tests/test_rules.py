@@ -0,0 +1,114 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import itertools
+import logging
+import pytest
+from script_py import monitor
+from script_py.rules import DEFAULT_RULES, HEALTH_STATES, SYNC_STATES, RuleEngine
+from script_py.state import AppStateStore
+from tests.fake_argocd import make_app
+
+
+def chain_decision(app_name, health_status, sync_status, excluded_apps):
+    """The if/elif chain that process_application used before the rules engine."""
+    if app_name in excluded_apps:
+        return None
+    actions = []
+    if health_status != "Healthy":
+        actions.append("refresh")
+    if health_status == "Healthy" and sync_status == "Synced":
+        pass
+    elif sync_status == "OutOfSync":
+        actions.append("sync")
+    elif health_status in ["Degraded", "Error"]:
+        actions.append("notify")
+    return actions
+
+
+def test_default_rules_match_the_original_chain():
+    """For every health/sync combination the default rules decide what the if/elif chain did."""
+    engine = RuleEngine.from_config({"excluded_apps": ["excluded"], "rules": DEFAULT_RULES})
+
+    for health, sync in itertools.product(HEALTH_STATES, SYNC_STATES):
+        assert list(engine.evaluate("app", "default", health, sync).actions) == chain_decision("app", health, sync, ["excluded"])
+    assert engine.evaluate("excluded", "default", "Degraded", "OutOfSync").ignored
+
+
+def test_selectors_support_exact_glob_regex_and_projects():
+    """Rules can target exact names, globs, regexes and projects; matching rules add up."""
+    engine = RuleEngine.from_config({"rules": [
+        {"name": "payments", "apps": "payments-api", "health": "Progressing", "actions": ["notify"]},
+        {"name": "team-a", "apps": "team-a-*", "sync": "OutOfSync", "actions": ["sync", "notify"]},
+        {"name": "canary", "apps": "re:^canary-[0-9]+$", "actions": ["ignore"]},
+        {"name": "sandbox", "projects": "sandbox", "actions": ["ignore"]},
+        {"name": "refresh", "health": "!Healthy", "actions": ["refresh"]},
+    ]})
+
+    assert engine.evaluate("payments-api", "default", "Progressing", "Synced").actions == ("refresh", "notify")
+    assert engine.evaluate("payments-api-v2", "default", "Progressing", "Synced").actions == ("refresh",)
+    assert engine.evaluate("team-a-web", "default", "Healthy", "OutOfSync").actions == ("sync", "notify")
+    assert engine.evaluate("canary-12", "default", "Degraded", "Synced").ignored
+    assert not engine.evaluate("canary-x", "default", "Degraded", "Synced").ignored
+    assert engine.evaluate("anything", "sandbox", "Degraded", "Synced").ignored
+
+
+def test_regex_selectors_may_use_inline_flags():
+    """A pattern with global inline flags still combines with the others; its flags stay local to it."""
+    engine = RuleEngine.from_config({"rules": [
+        {"name": "canary", "apps": "re:(?i)^canary-", "actions": ["ignore"]},
+        {"name": "api", "apps": ["re:^api-", "team-*"], "actions": ["notify"]},
+    ]})
+
+    assert engine.evaluate("CANARY-web", "default", "Degraded", "Synced").ignored
+    assert engine.evaluate("api-1", "default", "Degraded", "Synced").actions == ("notify",)
+    assert engine.evaluate("API-1", "default", "Degraded", "Synced").actions == ()
+
+def test_version_changed_condition():
+    """A rule can require that the app's revision changed since the previous cycle."""
+    engine = RuleEngine.from_config({"rules": [
+        {"name": "notify-new-version", "health": ["Degraded", "Error"], "version_changed": True, "actions": ["notify"]},
+    ]})
+
+    assert engine.evaluate("app", None, "Degraded", "Synced", version_changed=True).actions == ("notify",)
+    assert engine.evaluate("app", None, "Degraded", "Synced", version_changed=False).actions == ()
+
+
+def test_evaluation_is_table_lookup_regardless_of_rule_count():
+    """Thousands of exact-name rules do not add decisions: apps sharing a profile share table entries."""
+    rules = [{"name": f"exclude-{i}", "apps": f"excluded-{i}", "actions": ["ignore"]} for i in range(5000)]
+    engine = RuleEngine.from_config({"rules": rules + DEFAULT_RULES})
+    table_size = len(engine._table)
+
+    for i in range(1000):
+        engine.evaluate(f"app-{i}", "default", "Degraded", "Synced")
+
+    assert len(engine._table) == table_size
+    assert len(engine._interned) == 1
+
+
+def test_invalid_rules_are_rejected():
+    """Unknown actions or fields are configuration errors."""
+    with pytest.raises(ValueError):
+        RuleEngine.from_config({"rules": [{"name": "bad", "actions": ["delete"]}]})
+    with pytest.raises(ValueError):
+        RuleEngine.from_config({"rules": [{"name": "bad", "app": "x", "actions": ["sync"]}]})
+
+
+def test_version_change_is_reported_for_degraded_apps(monkeypatch, caplog):
+    """The version-change warning, unreachable in the old chain, now fires for Degraded apps."""
+    monkeypatch.setattr(monitor, "state_store", AppStateStore())
+    monkeypatch.setattr(monitor, "get_dispatcher", lambda: type("Dispatcher", (), {"resolve": staticmethod(lambda app_name: None)}))
+    app = make_app("app-1", health="Degraded")
+    app["metadata"]["annotations"] = {"argocd.argoproj.io/revision": "v1"}
+    monitor.evaluate_application(app)
+    app["metadata"]["annotations"] = {"argocd.argoproj.io/revision": "v2"}
+
+    with caplog.at_level(logging.WARNING):
+        app_name, health, actions = monitor.evaluate_application(app)
+
+    assert actions == ["refresh", "notify"]
+    assert "v1 -> v2" in caplog.text
@@ -0,0 +1,112 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import threading
+from script_py.scheduler import ActionScheduler, TokenBucket
+from script_py.state import AppStateStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_duplicate_requests_are_coalesced_while_queued():
+    """A second sync for an app whose sync is still pending is not queued again."""
+    scheduler = ActionScheduler(lambda app_name, action: None)
+
+    assert scheduler.admit("app-1", "sync") is True
+    assert scheduler.admit("app-1", "sync") is False
+    assert scheduler.admit("app-1", "refresh") is True
+    assert scheduler.stats["coalesced"] == 1
+
+
+def test_attempt_cap_is_enforced_from_the_state_store():
+    """max_sync_attempts stops further syncs until the app recovers."""
+    store = AppStateStore()
+    store.observe("app-1", "Degraded", "OutOfSync", "rev-1")
+    scheduler = ActionScheduler(lambda app_name, action: None, state_store=store, max_attempts={"sync": 2}, backoff=0)
+
+    for _ in range(2):
+        assert scheduler.admit("app-1", "sync")
+        scheduler.complete("app-1", "sync")
+
+    assert scheduler.admit("app-1", "sync") is False
+    scheduler.reset("app-1")
+    assert scheduler.admit("app-1", "sync") is True
+
+
+def test_backoff_grows_exponentially_between_attempts():
+    """After n attempts the next one is allowed only after backoff * 2^(n-1) seconds."""
+    clock = FakeClock()
+    scheduler = ActionScheduler(lambda app_name, action: None, backoff=10, max_backoff=100, clock=clock)
+
+    scheduler.admit("app-1", "refresh")
+    scheduler.complete("app-1", "refresh")
+    clock.now = 9
+    assert scheduler.admit("app-1", "refresh") is False
+    clock.now = 10
+    assert scheduler.admit("app-1", "refresh") is True
+    scheduler.complete("app-1", "refresh")
+    clock.now = 29
+    assert scheduler.admit("app-1", "refresh") is False
+    clock.now = 30
+    assert scheduler.admit("app-1", "refresh") is True
+
+
+
+def test_deleted_apps_are_pruned_from_backoff():
+    """prune() drops the attempts and backoff of apps that left the fleet."""
+    clock = FakeClock()
+    scheduler = ActionScheduler(lambda app_name, action: None, backoff=10, clock=clock)
+    for app_name in ("app-1", "app-2"):
+        scheduler.admit(app_name, "refresh")
+        scheduler.complete(app_name, "refresh")
+
+    scheduler.prune(["app-2"])
+
+    assert set(scheduler._next_allowed) == set(scheduler._attempts) == {"app-2"}
+    assert scheduler.admit("app-1", "refresh") is True
+    assert scheduler.admit("app-2", "refresh") is False
+
+def test_degraded_apps_are_executed_first():
+    """Queued operations run in priority order: Degraded before OutOfSync-only apps."""
+    executed = []
+    started = threading.Event()
+    gate = threading.Event()
+
+    def execute(app_name, action):
+        started.set()
+        gate.wait(2)
+        executed.append(app_name)
+
+    scheduler = ActionScheduler(execute, workers=1, rate=1000, burst=1000)
+    scheduler.submit("blocker", ["refresh"], "Healthy")
+    started.wait(2)
+    scheduler.submit("synced-app", ["sync"], "Healthy")
+    scheduler.submit("degraded-app", ["refresh", "sync"], "Degraded")
+    gate.set()
+
+    assert scheduler.drain(timeout=5)
+    scheduler.close()
+    assert executed == ["blocker", "degraded-app", "degraded-app", "synced-app"]
+
+
+def test_token_bucket_limits_the_global_rate():
+    """Beyond the burst, each operation waits 1/rate seconds."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+
+    for _ in range(7):
+        bucket.acquire()
+
+    assert clock.now == 2.0
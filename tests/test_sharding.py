@@ -0,0 +1,106 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import json
+import socket
+import subprocess
+import pytest
+from script_py import monitor
+from script_py.argocd_client import ArgoCDClient
+from script_py.sharding import HashRing, Shard, shard_index_from_env
+from tests.fake_argocd import FakeArgoCD, make_app, synthesize_apps
+
+CRONJOB_DIR = os.path.join(os.path.dirname(__file__), "../cronjob")
+
+# Proceso independiente de una réplica: imprime las aplicaciones de su partición
+SHARD_PROCESS = """
+import json, sys
+from script_py.argocd_client import ArgoCDClient
+from script_py.sharding import Shard
+shard = Shard(index=int(sys.argv[2]), count=int(sys.argv[3]))
+apps = shard.select(ArgoCDClient(api=sys.argv[1], token="token").get_applications())
+print(json.dumps([app["metadata"]["name"] for app in apps]))
+"""
+
+
+def test_resizing_the_ring_only_moves_keys_to_or_from_the_changed_member():
+    """Going from 3 to 4 replicas only moves apps to the new replica; none move between old ones."""
+    names = [f"app-{i}" for i in range(2000)]
+    before = HashRing(["shard-0", "shard-1", "shard-2"])
+    after = HashRing(["shard-0", "shard-1", "shard-2", "shard-3"])
+
+    moved = [name for name in names if before.owner(name) != after.owner(name)]
+
+    assert all(after.owner(name) == "shard-3" for name in moved)
+    assert 0.15 < len(moved) / len(names) < 0.35
+
+
+def test_shards_partition_the_fleet_across_processes():
+    """Independent processes (different hash seeds) agree on a complete, disjoint partition."""
+    with FakeArgoCD(apps=synthesize_apps(300)) as fake:
+        owned = []
+        for index in range(3):
+            env = dict(os.environ, PYTHONHASHSEED=str(index + 1))
+            result = subprocess.run(
+                [sys.executable, "-c", SHARD_PROCESS, fake.api, str(index), "3"],
+                cwd=CRONJOB_DIR, env=env, capture_output=True, text=True, check=True,
+            )
+            owned.append(set(json.loads(result.stdout.splitlines()[-1])))
+
+    assert all(owned)
+    assert sum(len(names) for names in owned) == 300
+    assert set().union(*owned) == {f"app-{i:05d}" for i in range(300)}
+
+
+def test_project_shards_fetch_only_their_projects():
+    """With shard_by=project each replica asks ArgoCD only for the projects it owns."""
+    apps = synthesize_apps(60, projects=6)
+    with FakeArgoCD(apps=apps) as fake:
+        client = ArgoCDClient(api=fake.api, token="token")
+        fetched = []
+        for index in range(2):
+            shard = Shard(index=index, count=2, key="project")
+            projects = shard.owned_projects(client)
+            fetched.append(client.get_applications(projects=projects))
+
+    list_queries = [query for method, path, query in fake.requests if path.endswith("/applications")]
+    assert all("projects" in query for query in list_queries)
+    assert sorted(app["metadata"]["name"] for shard_apps in fetched for app in shard_apps) == sorted(app["metadata"]["name"] for app in apps)
+
+
+def test_invalid_shard_index_is_rejected():
+    """A replica index outside the shard count is a configuration error."""
+    with pytest.raises(ValueError):
+        Shard(index=3, count=3)
+
+
+
+def test_hostname_ordinal_only_comes_from_statefulset_pods(monkeypatch):
+    """A Deployment pod name ending in digits is not a shard index; without sharding the index is 0."""
+    for variable in ("SHARD_COUNT", "SHARD_INDEX", "JOB_COMPLETION_INDEX"):
+        monkeypatch.delenv(variable, raising=False)
+    monkeypatch.setattr(socket, "gethostname", lambda: "argocd-monitor-7c9d5b8f64-24579")
+    assert Shard.from_config({"shard_count": 1}).index == 0
+    assert shard_index_from_env() == 0
+
+    monkeypatch.setattr(socket, "gethostname", lambda: "argocd-monitor-2")
+    assert shard_index_from_env() == 2
+    assert Shard.from_config({"shard_count": 3}).index == 2
+    assert Shard.from_config({"shard_count": 1}).index == 0
+
+def test_sync_is_skipped_while_an_operation_is_running(monkeypatch):
+    """An OutOfSync app already being synced (e.g. by its previous owner) is not synced again."""
+    submitted = []
+    monkeypatch.setattr(monitor, "get_scheduler", lambda: type("Scheduler", (), {
+        "submit": staticmethod(lambda app_name, actions, health: submitted.append(actions)),
+        "reset": staticmethod(lambda app_name: None),
+    }))
+    app = make_app("app-1", health="Healthy", sync="OutOfSync")
+    app["status"]["operationState"] = {"phase": "Running"}
+
+    monitor.process_application(app)
+
+    assert submitted == []
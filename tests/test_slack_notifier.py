@@ -0,0 +1,117 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+from script_py.slack_notifier import NotificationDispatcher
+from script_py.state import AppStateStore
+from tests.fake_slack import FakeSlackWebhook
+
+
+def test_alerts_of_a_cycle_are_batched_into_one_message():
+    """Several degraded apps produce a single block-kit message at the end of the cycle."""
+    with FakeSlackWebhook() as slack:
+        dispatcher = NotificationDispatcher(webhook_url=slack.url, batch_window=60)
+        for i in range(5):
+            dispatcher.notify(f"app-{i}", "Degraded", 0, "La aplicación requiere atención.")
+        dispatcher.flush(wait=True, timeout=5)
+        dispatcher.close(timeout=5)
+
+    assert len(slack.messages) == 1
+    blocks = slack.messages[0]["blocks"]
+    assert len(blocks) == 5
+    assert "*Aplicación:* `app-0`" in blocks[0]["text"]["text"]
+
+
+def test_repeated_alerts_for_unchanged_state_are_deduplicated():
+    """An app is reported again only after its status changes or it recovers."""
+    dispatcher = NotificationDispatcher(webhook_url="http://127.0.0.1:9/unused")
+
+    assert dispatcher.notify("app-1", "Degraded") is True
+    assert dispatcher.notify("app-1", "Degraded") is False
+    assert dispatcher.notify("app-1", "Missing") is True
+    dispatcher.resolve("app-1")
+    assert dispatcher.notify("app-1", "Missing") is True
+    assert dispatcher.stats["deduplicated"] == 1
+
+
+def test_retry_after_is_honoured_on_429():
+    """A throttled message waits Retry-After seconds and is retried."""
+    waits = []
+    with FakeSlackWebhook(responses=[(429, {"Retry-After": "7"})]) as slack:
+        dispatcher = NotificationDispatcher(webhook_url=slack.url, sleep=waits.append)
+        dispatcher.notify("app-1", "Degraded")
+        dispatcher.flush(wait=True, timeout=5)
+        dispatcher.close(timeout=5)
+
+    assert waits == [7.0]
+    assert slack.attempts == 2
+    assert len(slack.messages) == 1
+
+
+def test_send_budget_per_cycle_is_bounded():
+    """Alerts beyond max_messages * batch_size are summarised instead of sent."""
+    with FakeSlackWebhook() as slack:
+        dispatcher = NotificationDispatcher(webhook_url=slack.url, batch_size=2, max_messages=2)
+        for i in range(7):
+            dispatcher.notify(f"app-{i}", "Degraded")
+        dispatcher.flush(wait=True, timeout=5)
+        dispatcher.close(timeout=5)
+
+    assert len(slack.messages) == 2
+    assert "3 aplicaciones más" in slack.messages[-1]["blocks"][-1]["elements"][0]["text"]
+    assert dispatcher.stats["suppressed"] == 3
+
+
+def test_send_budget_spans_every_window_of_the_cycle():
+    """Windows flushed by batch_window share the cycle's budget; flush() starts a new one."""
+    with FakeSlackWebhook() as slack:
+        dispatcher = NotificationDispatcher(webhook_url=slack.url, batch_size=1, max_messages=2, batch_window=60)
+        dispatcher._send_batch([("app-0", "Degraded", 0, "", None, 0)])
+        dispatcher._send_batch([("app-1", "Degraded", 0, "", None, 0), ("app-2", "Degraded", 0, "", None, 0)])
+        dispatcher.notify("app-3", "Degraded")
+        dispatcher.flush(wait=True, timeout=5)
+        dispatcher.notify("app-4", "Degraded")
+        dispatcher.flush(wait=True, timeout=5)
+        dispatcher.close(timeout=5)
+
+    assert [message["blocks"][0]["text"]["text"].count("app-") for message in slack.messages] == [1, 1, 1]
+    assert "`app-4`" in slack.messages[-1]["blocks"][0]["text"]["text"]
+    assert dispatcher.stats["suppressed"] == 2
+    # Las alertas sin enviar no quedan marcadas como avisadas
+    assert dispatcher.would_notify("app-3", "Degraded")
+
+
+def test_alert_dropped_on_a_full_queue_is_not_deduplicated():
+    """If the queue is full the alert is not remembered, so the next observation retries it."""
+    dispatcher = NotificationDispatcher(webhook_url="http://127.0.0.1:9/unused", max_queue=1)
+    dispatcher._ensure_started = lambda: None
+    dispatcher.notify("app-1", "Degraded")
+
+    assert dispatcher.notify("app-2", "Degraded") is False
+    assert dispatcher.stats["dropped"] == 1
+    assert dispatcher.would_notify("app-2", "Degraded")
+    assert not dispatcher.would_notify("app-1", "Degraded")
+
+
+def test_only_delivered_alerts_are_remembered_across_dispatchers():
+    """The last delivered alert lives in the state store; a failed post is retried by the next run."""
+    store = AppStateStore()
+    store.observe("app-1", "Degraded", "Synced", "rev-1")
+    store.observe("app-2", "Degraded", "Synced", "rev-1")
+    with FakeSlackWebhook(responses=[(200, {}), (500, {})]) as slack:
+        dispatcher = NotificationDispatcher(webhook_url=slack.url, batch_size=1, max_retries=0, state_store=store)
+        dispatcher.notify("app-1", "Degraded")
+        dispatcher.notify("app-2", "Degraded")
+        dispatcher.flush(wait=True, timeout=5)
+        dispatcher.close(timeout=5)
+
+    assert store.last_alert("app-1") == ("Degraded", 0)
+    assert store.last_alert("app-2") is None
+    next_run = NotificationDispatcher(webhook_url="http://127.0.0.1:9/unused", state_store=store)
+    assert not next_run.would_notify("app-1", "Degraded")
+    assert next_run.would_notify("app-1", "Degraded", level=1)
+    assert next_run.would_notify("app-2", "Degraded")
+    next_run.resolve("app-1")
+    assert store.last_alert("app-1") is None
@@ -0,0 +1,57 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+from script_py.state import AppStateStore, HealthStatus, SyncStatus
+
+
+def test_observe_returns_previous_state():
+    """The first observation returns None; later ones return the previous state."""
+    store = AppStateStore(clock=lambda: 100.0)
+
+    assert store.observe("app-1", "Healthy", "Synced", "rev-1") is None
+    previous = store.observe("app-1", "Degraded", "OutOfSync", "rev-2")
+
+    assert (previous.health, previous.sync, previous.revision) == (HealthStatus.HEALTHY, SyncStatus.SYNCED, "rev-1")
+    assert store.get("app-1").health is HealthStatus.DEGRADED
+
+
+def test_unknown_status_strings_map_to_unknown():
+    """Statuses ArgoCD may add in the future do not break the store."""
+    store = AppStateStore()
+    store.observe("app-1", "SomethingNew", None, None)
+
+    assert store.get("app-1").health is HealthStatus.UNKNOWN
+    assert store.get("app-1").sync is SyncStatus.UNKNOWN
+
+
+def test_record_action_counts_attempts():
+    """Sync and refresh attempts are counted and the last action is kept."""
+    store = AppStateStore()
+    store.observe("app-1", "Degraded", "OutOfSync", "rev-1")
+    store.record_action("app-1", "refresh")
+    store.record_action("app-1", "sync")
+    store.record_action("app-1", "sync")
+
+    state = store.get("app-1")
+    assert (state.refresh_attempts, state.sync_attempts, state.last_action) == (1, 2, "sync")
+
+
+def test_snapshot_restore_and_diff():
+    """A snapshot restores an identical store and diffs report added/removed/changed apps."""
+    store = AppStateStore(clock=lambda: 1.0)
+    store.observe("app-1", "Healthy", "Synced", "rev-1")
+    store.observe("app-2", "Healthy", "Synced", "rev-1")
+    before = store.snapshot()
+
+    restored = AppStateStore()
+    restored.restore(before)
+    assert restored.snapshot() == before
+
+    store.observe("app-1", "Degraded", "Synced", "rev-1")
+    store.remove("app-2")
+    store.observe("app-3", "Healthy", "Synced", "rev-1")
+
+    assert AppStateStore.diff(before, store.snapshot()) == ({"app-3"}, {"app-2"}, {"app-1"})
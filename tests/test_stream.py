@@ -0,0 +1,109 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+import itertools
+import threading
+from script_py.argocd_client import ArgoCDClient
+from script_py.stream import ApplicationStream, EventDispatcher, RESYNC
+from tests.fake_argocd import FakeArgoCD, make_app
+
+
+def test_stream_reconnects_and_resumes_from_last_resource_version():
+    """When the server closes the stream, the watcher reconnects with the last resourceVersion."""
+    scripts = [
+        [("ADDED", make_app("app-1", resource_version="2")), ("MODIFIED", make_app("app-2", resource_version="3"))],
+        [("MODIFIED", make_app("app-1", health="Degraded", resource_version="4"))],
+    ]
+    with FakeArgoCD(apps=[make_app("app-1")], stream_scripts=scripts) as fake:
+        client = ArgoCDClient(api=fake.api, token="test-token")
+        stream = ApplicationStream(client, resync_interval=3600)
+
+        events = list(itertools.islice(stream.events(), 4))
+
+    assert [(event_type, app["metadata"]["name"]) for event_type, app in events] == [
+        (RESYNC, "app-1"), ("ADDED", "app-1"), ("MODIFIED", "app-2"), ("MODIFIED", "app-1"),
+    ]
+    stream_queries = [query for _, path, query in fake.requests if path.endswith("/stream/applications")]
+    assert stream_queries[0] == {}
+    assert stream_queries[1] == {"resourceVersion": "3"}
+
+
+def test_stream_backs_off_when_connections_close_without_events():
+    """An empty connection is retried with growing backoff; an event resets it."""
+    scripts = iter([[], [], [("ADDED", make_app("app-1"))], [("MODIFIED", make_app("app-1"))], [], [("MODIFIED", make_app("app-2"))]])
+
+    class ScriptedClient:
+        def get_applications(self):
+            return []
+
+        def watch_applications(self, resource_version=None):
+            return iter(next(scripts))
+
+    sleeps = []
+    stream = ApplicationStream(ScriptedClient(), min_backoff=1, max_backoff=60, sleep=sleeps.append)
+    events = list(itertools.islice(stream.events(), 3))
+
+    assert [app["metadata"]["name"] for _, app in events] == ["app-1", "app-1", "app-2"]
+    assert sleeps == [1, 2, 1]
+
+
+def test_stream_runs_periodic_full_resync():
+    """A full resync is emitted again once resync_interval has elapsed."""
+    now = [0]
+    scripts = [[("MODIFIED", make_app("app-2", resource_version=str(i)))] for i in range(5)]
+    with FakeArgoCD(apps=[make_app("app-1")], stream_scripts=scripts) as fake:
+        client = ArgoCDClient(api=fake.api, token="test-token")
+        stream = ApplicationStream(client, resync_interval=10, clock=lambda: now[0])
+
+        events = stream.events()
+        assert next(events)[0] == RESYNC
+        assert next(events)[0] == "MODIFIED"
+        now[0] = 11
+        assert next(events)[0] == RESYNC
+
+
+def test_dispatcher_coalesces_pending_events_per_app():
+    """Events arriving for an app already being processed collapse into its latest state."""
+    gate = threading.Event()
+    handled = []
+
+    def handler(event_type, app):
+        if app["metadata"]["resourceVersion"] == "1":
+            gate.wait(2)
+        handled.append((app["metadata"]["name"], app["metadata"]["resourceVersion"]))
+
+    def events():
+        yield "MODIFIED", make_app("app-1", resource_version="1")
+        yield "MODIFIED", make_app("app-1", resource_version="2")
+        yield "MODIFIED", make_app("app-1", resource_version="3")
+        gate.set()
+
+    dispatcher = EventDispatcher(handler, max_workers=4)
+    dispatcher.run(events())
+
+    assert handled == [("app-1", "1"), ("app-1", "3")]
+    assert dispatcher.coalesced == 2
+
+
+def test_dispatcher_applies_backpressure():
+    """With max_pending apps in flight, the reader waits instead of queuing more work."""
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def handler(event_type, app):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        threading.Event().wait(0.01)
+        with lock:
+            in_flight[0] -= 1
+
+    events = [("MODIFIED", make_app(f"app-{i}")) for i in range(10)]
+    dispatcher = EventDispatcher(handler, max_workers=4, max_pending=2)
+    dispatcher.run(events)
+
+    assert dispatcher.dispatched == 10
+    assert in_flight[1] <= 2
@@ -0,0 +1,86 @@
+import sys
+import os
+
+# Agregar el directorio 'cronjob' al PYTHONPATH
+sys.path.append(os.path.join(os.path.dirname(__file__), "../cronjob"))
+
+from prometheus_client import REGISTRY
+from script_py.argocd_client import AppStatus, ArgoCDClient
+from script_py.verification import wait_until_converged
+from tests.fake_argocd import FakeArgoCD, make_app
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_statuses_returns_only_the_requested_apps_in_one_request():
+    """A batch status check is a single projected list request, not one GET per app."""
+    apps = [make_app(f"app-{i}", sync="OutOfSync") for i in range(20)]
+    apps[3]["status"]["operationState"] = {"phase": "Running"}
+    labels = {"endpoint": "statuses", "status": "200"}
+    before = REGISTRY.get_sample_value("argocd_monitor_argocd_request_duration_seconds_count", labels) or 0
+    with FakeArgoCD(apps=apps) as fake:
+        statuses = ArgoCDClient(api=fake.api, token="token").get_statuses([f"app-{i}" for i in range(5)])
+
+    assert len(fake.requests) == 1
+    # Con su propia etiqueta, fuera de los endpoints que ajustan la concurrencia
+    assert REGISTRY.get_sample_value("argocd_monitor_argocd_request_duration_seconds_count", labels) == before + 1
+    method, path, query = fake.requests[0]
+    assert path == "/api/v1/applications"
+    assert "resourceVersion" not in query["fields"]
+    assert sorted(statuses) == [f"app-{i}" for i in range(5)]
+    assert statuses["app-3"] == AppStatus("Healthy", "OutOfSync", "Running")
+    assert statuses["app-0"] == AppStatus("Healthy", "OutOfSync", None)
+
+
+def test_single_app_is_filtered_by_name_on_the_server():
+    """Checking one app asks ArgoCD for that name only."""
+    with FakeArgoCD(apps=[make_app("app-1"), make_app("app-2")]) as fake:
+        statuses = ArgoCDClient(api=fake.api, token="token").get_statuses(["app-2"])
+
+    assert fake.requests[0][2]["name"] == "app-2"
+    assert list(statuses) == ["app-2"]
+
+
+def test_wait_until_converged_polls_the_batch_with_backoff():
+    """Sync-then-confirm costs one request per poll for the whole batch, with growing intervals."""
+    apps = [make_app(f"app-{i}", health="Progressing", sync="OutOfSync") for i in range(50)]
+    clock = FakeClock()
+    delays = []
+
+    def sleep(seconds):
+        delays.append(seconds)
+        clock.now += seconds
+        # ArgoCD termina de sincronizar todas salvo app-0 tras la segunda espera
+        if len(delays) == 2:
+            for app in apps[1:]:
+                app["status"] = {"health": {"status": "Healthy"}, "sync": {"status": "Synced"}}
+
+    with FakeArgoCD(apps=apps) as fake:
+        client = ArgoCDClient(api=fake.api, token="token")
+        statuses, unconverged = wait_until_converged(client, [app["metadata"]["name"] for app in apps], timeout=20, interval=2, max_interval=5, clock=clock, sleep=sleep)
+
+    assert unconverged == {"app-0"}
+    assert statuses["app-1"] == AppStatus("Healthy", "Synced", None)
+    assert delays == [2, 4, 5, 5]
+    assert len(fake.requests) == len(delays) + 1
+
+
+def test_failed_and_missing_apps_stop_the_wait():
+    """Apps whose sync failed or that no longer exist are reported without waiting for the timeout."""
+    apps = [make_app("app-1"), make_app("app-2", sync="OutOfSync")]
+    apps[1]["status"]["operationState"] = {"phase": "Failed"}
+    clock = FakeClock()
+
+    with FakeArgoCD(apps=apps) as fake:
+        client = ArgoCDClient(api=fake.api, token="token")
+        statuses, unconverged = wait_until_converged(client, ["app-1", "app-2", "gone"], timeout=60, clock=clock, sleep=lambda seconds: None)
+
+    assert unconverged == {"app-2", "gone"}
+    assert statuses["gone"] is None
+    assert len(fake.requests) == 1